@@ -0,0 +1,499 @@
+#!/usr/bin/env python3
+"""
+Alerts - Envio de alertas (Telegram/Discord) fora do caminho do Selenium
+send_alert só enfileira: uma thread por canal envia com requests.Session
+própria (conexões reaproveitadas), em paralelo entre canais, com limite de
+envios por canal e supressão de alertas repetidos dentro de uma janela.
+Rajadas do mesmo erro na mesma etapa viram um resumo periódico (digest)
+"""
+import os
+import time
+import queue
+import logging
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Logger do linkedin_poster sem importar o módulo (Selenium)
+logger = logging.getLogger("linkedin_poster")
+
+# Alerta igual (tipo + mensagem) repetido dentro da janela é suprimido (segundos)
+ALERT_DEDUPE_WINDOW = float(os.getenv("ALERT_DEDUPE_WINDOW", "300"))
+
+# Janela de agrupamento por tipo de erro + etapa (segundos; 0 = sem resumo):
+# o primeiro alerta sai na hora, os seguintes viram um resumo no fim da janela
+ALERT_DIGEST_WINDOW = float(os.getenv("ALERT_DIGEST_WINDOW", "300"))
+
+# Limite por canal: rajada de ALERT_BURST e depois ALERT_RATE_PER_MINUTE por minuto
+ALERT_RATE_PER_MINUTE = float(os.getenv("ALERT_RATE_PER_MINUTE", "20"))
+ALERT_BURST = int(os.getenv("ALERT_BURST", "5"))
+
+# Timeout de cada requisição e tamanho da fila por canal (excedente é descartado)
+ALERT_TIMEOUT = float(os.getenv("ALERT_TIMEOUT", "10"))
+ALERT_QUEUE_SIZE = int(os.getenv("ALERT_QUEUE_SIZE", "100"))
+
+
+class TokenBucket:
+    """Limite de envios: `capacity` de rajada, reposição de `rate` por segundo"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def wait_time(self) -> float:
+        """Consumir um token; devolve quanto esperar antes de usar (0 = já)"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class AlertChannel(ABC):
+    """Canal de alerta: monta a requisição e diz qual status é sucesso"""
+
+    name = "canal"
+    success_status = (200,)
+
+    @abstractmethod
+    def request(self, message: str) -> Tuple[str, Dict]:
+        """URL e corpo JSON do POST para a mensagem"""
+
+
+class TelegramChannel(AlertChannel):
+    name = "telegram"
+    success_status = (200,)
+
+    def __init__(self, token: str, chat_id: str, base_url: Optional[str] = None):
+        self.chat_id = chat_id
+        base_url = (base_url or "https://api.telegram.org").rstrip("/")
+        self.url = f"{base_url}/bot{token}/sendMessage"
+
+    def request(self, message: str) -> Tuple[str, Dict]:
+        return self.url, {
+            "chat_id": self.chat_id,
+            "text": f"🚨 LinkedIn Bot Alert\n\n{message}",
+            "parse_mode": "Markdown",
+        }
+
+
+class DiscordChannel(AlertChannel):
+    name = "discord"
+    success_status = (200, 204)
+
+    def __init__(self, webhook_url: str):
+        self.url = webhook_url
+
+    def request(self, message: str) -> Tuple[str, Dict]:
+        return self.url, {
+            "content": f"🚨 **LinkedIn Bot Alert**\n\n{message}",
+            "username": "LinkedIn Bot",
+        }
+
+
+def format_alert(
+    error_type: str,
+    error_msg: str,
+    url: str = "",
+    screenshot: str = "",
+    step: str = "",
+    timestamp: Optional[datetime] = None,
+) -> str:
+    """Mensagem de um alerta individual"""
+    timestamp = (timestamp or datetime.now()).strftime("%Y-%m-%d %H:%M:%S")
+    lines = [f"**Erro**: {error_type}"]
+    if step:
+        lines.append(f"**Etapa**: {step}")
+    lines += [
+        f"**Mensagem**: {error_msg}",
+        f"**URL**: {url}",
+        f"**Screenshot**: {screenshot}",
+        f"**Timestamp**: {timestamp}",
+    ]
+    return "\n".join(lines)
+
+
+def format_digest(group: Dict, window: float) -> str:
+    """Resumo de uma rajada: contagem, primeira/última ocorrência, último screenshot"""
+    minutes = window / 60
+    lines = [
+        f"🔁 **Resumo de alertas** (janela de {minutes:g} min)",
+        f"**Erro**: {group['error_type']}",
+    ]
+    if group["step"]:
+        lines.append(f"**Etapa**: {group['step']}")
+    lines += [
+        f"**Ocorrências**: {group['count']} ({group['count'] - 1} agrupadas)",
+        f"**Primeira**: {group['first_at'].strftime('%Y-%m-%d %H:%M:%S')}",
+        f"**Última**: {group['last_at'].strftime('%Y-%m-%d %H:%M:%S')}",
+        f"**Última mensagem**: {group['error_msg']}",
+        f"**URL**: {group['url']}",
+        f"**Screenshot mais recente**: {group['screenshot'] or '-'}",
+    ]
+    return "\n".join(lines)
+
+
+def channels_from_env() -> List[AlertChannel]:
+    """Canais configurados no ambiente (.env)"""
+    channels: List[AlertChannel] = []
+    token = os.getenv("TELEGRAM_BOT_TOKEN")
+    chat_id = os.getenv("TELEGRAM_CHAT_ID")
+    if token and chat_id:
+        channels.append(TelegramChannel(token, chat_id, os.getenv("TELEGRAM_API_BASE_URL")))
+    else:
+        logger.warning("⚠️ Telegram não configurado (TELEGRAM_BOT_TOKEN/TELEGRAM_CHAT_ID)")
+
+    webhook_url = os.getenv("DISCORD_WEBHOOK_URL")
+    if webhook_url:
+        channels.append(DiscordChannel(webhook_url))
+    else:
+        logger.warning("⚠️ Discord não configurado (DISCORD_WEBHOOK_URL)")
+    return channels
+
+
+class _Counter(dict):
+    """dict com zero como padrão (contadores de stats)"""
+
+    def __missing__(self, key):
+        return 0
+
+
+class _ChannelWorker:
+    """Fila + thread + sessão HTTP de um canal"""
+
+    def __init__(self, channel: AlertChannel, dispatcher: "AlertDispatcher"):
+        self.channel = channel
+        self.dispatcher = dispatcher
+        self.queue: "queue.Queue" = queue.Queue(maxsize=dispatcher.queue_size)
+        self.bucket = TokenBucket(dispatcher.rate_per_minute / 60, dispatcher.burst)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.thread = threading.Thread(
+            target=self._run, name=f"alerts-{channel.name}", daemon=True
+        )
+        self.thread.start()
+
+    def _run(self) -> None:
+        count = self.dispatcher.count
+        while True:
+            message = self.queue.get()
+            try:
+                if message is None:
+                    return
+                delay = self.bucket.wait_time()
+                if delay:
+                    count(f"{self.channel.name}_throttled")
+                    time.sleep(delay)
+                if self._send(message):
+                    count(f"{self.channel.name}_sent")
+                else:
+                    count(f"{self.channel.name}_failed")
+            finally:
+                self.queue.task_done()
+
+    def _send(self, message: str) -> bool:
+        url, payload = self.channel.request(message)
+        name = self.channel.name.capitalize()
+        try:
+            response = self.session.post(url, json=payload, timeout=self.dispatcher.timeout)
+            if response.status_code in self.channel.success_status:
+                logger.info(f"✅ Alerta {name} enviado com sucesso")
+                return True
+            logger.error(f"❌ Falha {name}: {response.status_code} - {response.text}")
+        except Exception as e:
+            logger.error(f"❌ Erro ao enviar {name}: {e}")
+        return False
+
+
+class AlertDispatcher:
+    """Entrega assíncrona dos alertas para todos os canais"""
+
+    def __init__(
+        self,
+        channels: Optional[List[AlertChannel]] = None,
+        dedupe_window: float = ALERT_DEDUPE_WINDOW,
+        digest_window: float = ALERT_DIGEST_WINDOW,
+        rate_per_minute: float = ALERT_RATE_PER_MINUTE,
+        burst: int = ALERT_BURST,
+        timeout: float = ALERT_TIMEOUT,
+        queue_size: int = ALERT_QUEUE_SIZE,
+    ):
+        self._channels = channels  # None: lidos do ambiente no primeiro alerta
+        self.dedupe_window = dedupe_window
+        self.digest_window = digest_window
+        self.rate_per_minute = rate_per_minute
+        self.burst = burst
+        self.timeout = timeout
+        self.queue_size = queue_size
+        self._reset()
+
+    def _reset(self) -> None:
+        """Estado por processo (o worker de publicação é um fork do bot)"""
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._workers: Optional[List[_ChannelWorker]] = None
+        self._recent: Dict[Tuple[str, str], float] = {}
+        # (error_type, step) -> rajada em andamento
+        self._groups: Dict[Tuple[str, str], Dict] = {}
+        self._digest_wake = threading.Event()
+        self._digest_thread: Optional[threading.Thread] = None
+        # Contadores atualizados pelas threads dos canais e pelo chamador
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, int] = _Counter()
+
+    def count(self, key: str) -> None:
+        """Incrementar um contador de stats (thread-safe)"""
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _ensure_workers(self) -> List[_ChannelWorker]:
+        if self._workers is None:
+            channels = self._channels if self._channels is not None else channels_from_env()
+            self._workers = [_ChannelWorker(channel, self) for channel in channels]
+        return self._workers
+
+    def submit(
+        self,
+        message: str,
+        dedupe_key: Optional[Tuple[str, str]] = None,
+        channel: Optional[str] = None,
+    ) -> bool:
+        """
+        Enfileirar alerta para todos os canais (ou só `channel`, ex: "telegram");
+        False se suprimido/descartado ou se o canal não está configurado
+        """
+        if self._pid != os.getpid():
+            # Fork: threads do pai não existem aqui e o lock pode ter vindo preso
+            self._reset()
+        with self._lock:
+            workers = self._ensure_workers()
+            now = time.monotonic()
+            if dedupe_key is not None and self.dedupe_window > 0:
+                last = self._recent.get(dedupe_key)
+                if last is not None and now - last < self.dedupe_window:
+                    self.count("suppressed")
+                    return False
+                self._recent[dedupe_key] = now
+                # Esquecer chaves vencidas
+                if len(self._recent) > 256:
+                    self._recent = {
+                        key: at for key, at in self._recent.items()
+                        if now - at < self.dedupe_window
+                    }
+
+        queued = False
+        for worker in workers:
+            if channel is not None and worker.channel.name != channel:
+                continue
+            try:
+                worker.queue.put_nowait(message)
+                queued = True
+            except queue.Full:
+                self.count(f"{worker.channel.name}_dropped")
+        return queued
+
+    def alert(
+        self,
+        error_type: str,
+        error_msg: str,
+        step: str = "",
+        url: str = "",
+        screenshot: str = "",
+    ) -> bool:
+        """
+        Alerta de erro agrupado por (error_type, step): o primeiro da janela é
+        enviado na hora; os seguintes só contam para o resumo do fim da janela
+        Retorna True se foi enfileirado para envio imediato
+        """
+        if self.digest_window <= 0:
+            return self.submit(
+                format_alert(error_type, error_msg, url, screenshot, step),
+                dedupe_key=(error_type, error_msg),
+            )
+
+        if self._pid != os.getpid():
+            self._reset()
+        now = datetime.now()
+        key = (error_type, step)
+        with self._lock:
+            group = self._groups.get(key)
+            if group is not None:
+                group["count"] += 1
+                group["last_at"] = now
+                group["error_msg"] = error_msg
+                group["url"] = url or group["url"]
+                group["screenshot"] = screenshot or group["screenshot"]
+                self.count("aggregated")
+                return False
+
+            self._groups[key] = {
+                "error_type": error_type,
+                "step": step,
+                "count": 1,
+                "first_at": now,
+                "last_at": now,
+                "closes_at": time.monotonic() + self.digest_window,
+                "error_msg": error_msg,
+                "url": url,
+                "screenshot": screenshot,
+            }
+            if self._digest_thread is None:
+                self._digest_thread = threading.Thread(
+                    target=self._run_digests, name="alerts-digest", daemon=True
+                )
+                self._digest_thread.start()
+        self._digest_wake.set()
+
+        return self.submit(format_alert(error_type, error_msg, url, screenshot, step, now))
+
+    def _run_digests(self) -> None:
+        """Thread: fechar as janelas vencidas e enviar os resumos"""
+        while True:
+            with self._lock:
+                closes = [group["closes_at"] for group in self._groups.values()]
+            timeout = max(0.0, min(closes) - time.monotonic()) if closes else None
+            self._digest_wake.wait(timeout)
+            self._digest_wake.clear()
+            self.flush_digests(only_due=True)
+
+    def flush_digests(self, only_due: bool = False) -> int:
+        """Enviar resumos das rajadas (vencidas, ou todas no encerramento)"""
+        now = time.monotonic()
+        with self._lock:
+            due = [
+                key for key, group in self._groups.items()
+                if not only_due or group["closes_at"] <= now
+            ]
+            groups = [self._groups.pop(key) for key in due]
+
+        sent = 0
+        for group in groups:
+            # Só o alerta inicial: nada a resumir
+            if group["count"] > 1:
+                self.submit(format_digest(group, self.digest_window))
+                self.count("digests")
+                sent += 1
+        return sent
+
+    def flush(self, timeout: float = ALERT_TIMEOUT) -> bool:
+        """Esperar a entrega dos alertas enfileirados (até `timeout` segundos)"""
+        if self._pid != os.getpid() or not self._workers:
+            return True
+        deadline = time.monotonic() + timeout
+        for worker in self._workers:
+            while worker.queue.unfinished_tasks:
+                if time.monotonic() >= deadline:
+                    return False
+                time.sleep(0.01)
+        return True
+
+    def close(self, timeout: float = ALERT_TIMEOUT) -> None:
+        """Enviar resumos abertos, entregar o que falta e parar as threads"""
+        if self._pid == os.getpid():
+            self.flush_digests()
+        self.flush(timeout)
+        if self._pid != os.getpid() or not self._workers:
+            return
+        for worker in self._workers:
+            worker.queue.put(None)
+            worker.thread.join(1)
+            worker.session.close()
+        self._workers = None
+
+
+# Teste local
+if __name__ == "__main__":
+    import sys
+    import json
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    RESPONSE_DELAY = 0.3
+    received: Dict[str, List[Dict]] = {"telegram": [], "discord": []}
+
+    class StandIn(BaseHTTPRequestHandler):
+        """Telegram/Discord locais: respondem devagar e guardam o payload"""
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            time.sleep(RESPONSE_DELAY)
+            if self.path.endswith("/sendMessage"):
+                received["telegram"].append(body)
+                self.send_response(200)
+            else:
+                received["discord"].append(body)
+                self.send_response(204)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    dispatcher = AlertDispatcher(
+        [TelegramChannel("TOKEN", "42", base), DiscordChannel(f"{base}/webhook")],
+        dedupe_window=60,
+        rate_per_minute=60,  # 1/s depois da rajada
+        burst=3,
+    )
+
+    start = time.perf_counter()
+    dispatcher.submit("**Erro**: Timeout no Login", ("Timeout no Login", "x"))
+    dispatcher.submit("**Erro**: Timeout no Login", ("Timeout no Login", "x"))  # repetido
+    for i in range(4):
+        dispatcher.submit(f"**Erro**: Falha {i}", ("Falha", str(i)))
+    submit_ms = (time.perf_counter() - start) * 1000
+
+    delivered = dispatcher.flush(timeout=10)
+    total_s = time.perf_counter() - start
+    dispatcher.close()
+    stats = dict(dispatcher.stats)
+    first_counts = (len(received["telegram"]), len(received["discord"]))
+    # 5 mensagens por canal em sequência (~0.3s cada); canais em paralelo
+    sequential_s = 5 * RESPONSE_DELAY * 2
+    print(f"📨 Enfileirar 6 alertas: {submit_ms:.1f}ms | entrega: {total_s:.2f}s | {stats}")
+
+    # Seletor instável: 6 falhas seguidas na mesma etapa + 1 em outra etapa
+    RESPONSE_DELAY = 0.0
+    digests = AlertDispatcher([TelegramChannel("TOKEN", "42", base)], digest_window=0.5)
+    for i in range(6):
+        digests.alert(
+            "Botão Publicar Não Encontrado", f"tentativa {i}", "publish_post",
+            screenshot=f"logs/fail_{i}.png",
+        )
+    digests.alert("Timeout no Login", "timeout", "login")
+    # send_discord_alert sem Discord configurado: nada enfileirado
+    unconfigured = digests.submit("**Erro**: só Discord", channel="discord")
+    time.sleep(1.0)
+    digests.close()
+    server.shutdown()
+
+    texts = [body["text"] for body in received["telegram"][first_counts[0]:]]
+    summaries = [text for text in texts if "Resumo de alertas" in text]
+    print(f"🔁 {len(texts)} mensagens para 7 alertas | {dict(digests.stats)}")
+    checks = [
+        delivered,
+        submit_ms < 100,
+        first_counts == (5, 5),
+        stats.get("suppressed") == 1,
+        stats.get("telegram_throttled", 0) >= 1,
+        total_s < sequential_s,
+        len(texts) == 3 and len(summaries) == 1,
+        not unconfigured,
+        bool(summaries) and "**Ocorrências**: 6" in summaries[0]
+        and "logs/fail_5.png" in summaries[0],
+    ]
+    if not all(checks):
+        print(f"❌ Falhas: {checks}")
+        sys.exit(1)
+    print("✅ Alertas em paralelo, repetido suprimido, limite por canal e rajada resumida")
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Audit Log - Auditoria estruturada dos eventos do LinkedIn em SQLite (WAL)
+Guarda todos os campos sem cortes (o linkedin_audit.csv trunca post_text e
+error_msg) e indexa por execution_id, data e ação, então as consultas leem
+só o intervalo pedido em vez do histórico inteiro
+
+Consulta: python -m app.audit_log show <execution_id>
+          python -m app.audit_log durations [dias]
+          python -m app.audit_log failures [dias]
+          python -m app.audit_log daily [dias]
+          python -m app.audit_log import-csv [linkedin_audit.csv]
+"""
+import os
+import csv
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+try:
+    from .audit_writer import rotated_paths
+except ImportError:  # executado como script (python3 app/audit_log.py)
+    from audit_writer import rotated_paths
+
+AUDIT_DB_FILENAME = "audit.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS audit_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    day TEXT NOT NULL,
+    execution_id TEXT,
+    action TEXT NOT NULL,
+    success INTEGER NOT NULL,
+    post_text TEXT,
+    current_url TEXT,
+    error_type TEXT,
+    error_msg TEXT,
+    screenshot_path TEXT,
+    duration_ms INTEGER,
+    pid INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_audit_execution ON audit_events(execution_id);
+CREATE INDEX IF NOT EXISTS idx_audit_day_action
+    ON audit_events(day, action, success, duration_ms);
+"""
+
+
+def _since_day(days: int) -> str:
+    """Primeiro dia (YYYY-MM-DD) de uma janela de `days` dias até hoje"""
+    return (datetime.now() - timedelta(days=max(days, 1) - 1)).strftime("%Y-%m-%d")
+
+
+def _percentile(values: List[int], fraction: float) -> int:
+    """Percentil por posição (values já ordenados)"""
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class AuditLog:
+    """Eventos de auditoria em SQLite (uma conexão por thread e por processo)"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._local = threading.local()
+        self.connection.executescript(SCHEMA)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """
+        Conexão da thread atual; o worker de publicação é um fork do bot e
+        não pode reaproveitar a conexão herdada do pai
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def record(self, event: Dict) -> None:
+        """Gravar um evento"""
+        self.record_many([event])
+
+    def record_many(self, events: Iterable[Dict]) -> int:
+        """Gravar vários eventos em uma transação"""
+        pid = os.getpid()
+        rows = []
+        for event in events:
+            timestamp = event.get("timestamp") or datetime.now().isoformat()
+            rows.append(
+                (
+                    timestamp,
+                    timestamp[:10],
+                    event.get("execution_id"),
+                    event["action"],
+                    int(bool(event.get("success"))),
+                    event.get("post_text", ""),
+                    event.get("current_url", ""),
+                    event.get("error_type", ""),
+                    event.get("error_msg", ""),
+                    event.get("screenshot_path", ""),
+                    int(event.get("duration_ms") or 0),
+                    event.get("pid", pid),
+                )
+            )
+        if not rows:
+            return 0
+
+        conn = self.connection
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                """
+                INSERT INTO audit_events (timestamp, day, execution_id, action, success,
+                                          post_text, current_url, error_type, error_msg,
+                                          screenshot_path, duration_ms, pid)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return len(rows)
+
+    def events_for(self, execution_id: str) -> List[Dict]:
+        """Todos os eventos de uma execução, em ordem"""
+        rows = self.connection.execute(
+            "SELECT * FROM audit_events WHERE execution_id = ? ORDER BY id",
+            (execution_id,),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def successful(self, execution_ids: Iterable[str], action: str) -> set:
+        """Execuções (dentre execution_ids) com evento de sucesso da ação (índice por execution_id)"""
+        wanted = sorted(set(execution_ids))
+        found = set()
+        # Lotes abaixo do limite de parâmetros do SQLite
+        for start in range(0, len(wanted), 500):
+            chunk = wanted[start : start + 500]
+            rows = self.connection.execute(
+                f"""
+                SELECT DISTINCT execution_id FROM audit_events
+                WHERE execution_id IN ({", ".join("?" * len(chunk))})
+                  AND action = ? AND success = 1
+                """,
+                (*chunk, action),
+            )
+            found.update(row["execution_id"] for row in rows)
+        return found
+
+    def duration_stats(self, days: int = 7, action: Optional[str] = None) -> Dict[str, Dict]:
+        """p50/p95/máx de duration_ms por ação na janela (só eventos com duração)"""
+        query = (
+            "SELECT action, duration_ms FROM audit_events "
+            "WHERE day >= ? AND duration_ms > 0"
+        )
+        params: list = [_since_day(days)]
+        if action:
+            query += " AND action = ?"
+            params.append(action)
+        query += " ORDER BY action, duration_ms"
+
+        durations: Dict[str, List[int]] = {}
+        for row in self.connection.execute(query, params):
+            durations.setdefault(row["action"], []).append(row["duration_ms"])
+
+        return {
+            name: {
+                "count": len(values),
+                "p50_ms": _percentile(values, 0.50),
+                "p95_ms": _percentile(values, 0.95),
+                "max_ms": values[-1],
+            }
+            for name, values in durations.items()
+        }
+
+    def failure_breakdown(self, days: int = 7) -> List[Dict]:
+        """Falhas agrupadas por ação e tipo de erro (mais frequentes primeiro)"""
+        rows = self.connection.execute(
+            """
+            SELECT action, error_type, COUNT(*) AS total,
+                   MIN(timestamp) AS first_at, MAX(timestamp) AS last_at
+            FROM audit_events
+            WHERE day >= ? AND success = 0
+            GROUP BY action, error_type
+            ORDER BY total DESC, last_at DESC
+            """,
+            (_since_day(days),),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def daily_counts(self, days: int = 7) -> List[Dict]:
+        """Eventos por dia e ação (só o índice day/action/success é lido)"""
+        rows = self.connection.execute(
+            """
+            SELECT day, action, COUNT(*) AS total, SUM(success) AS successes
+            FROM audit_events
+            WHERE day >= ?
+            GROUP BY day, action
+            ORDER BY day, action
+            """,
+            (_since_day(days),),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def import_csv(self, csv_path: str) -> int:
+        """
+        Importar o histórico do linkedin_audit.csv e dos rotacionados (.N, do
+        mais antigo ao atual; campos já truncados no CSV). Eventos já
+        presentes no banco (timestamp, execution_id, ação) são ignorados
+        """
+        paths = rotated_paths(csv_path)
+        if os.path.exists(csv_path):
+            paths.append(csv_path)
+
+        events = []
+        for path in paths:
+            with open(path, "r", newline="", encoding="utf-8", errors="replace") as f:
+                events.extend(
+                    {
+                        **row,
+                        "success": row["success"] == "True",
+                        "duration_ms": int(row["duration_ms"] or 0),
+                        "pid": None,
+                    }
+                    for row in csv.DictReader(f)
+                    if row.get("action")
+                )
+        if not events:
+            return 0
+
+        timestamps = [event["timestamp"] for event in events]
+        existing = {
+            tuple(row)
+            for row in self.connection.execute(
+                """
+                SELECT timestamp, COALESCE(execution_id, ''), action FROM audit_events
+                WHERE timestamp BETWEEN ? AND ?
+                """,
+                (min(timestamps), max(timestamps)),
+            )
+        }
+        return self.record_many(
+            event
+            for event in events
+            if (event["timestamp"], event.get("execution_id") or "", event["action"])
+            not in existing
+        )
+
+
+if __name__ == "__main__":
+    import sys
+
+    log_dir = "/logs" if os.path.exists("/.dockerenv") else "logs"
+    audit = AuditLog(os.getenv("AUDIT_DB_PATH", os.path.join(log_dir, AUDIT_DB_FILENAME)))
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    days = int(sys.argv[2]) if len(sys.argv) > 2 and sys.argv[2].isdigit() else 7
+
+    if command == "show" and len(sys.argv) > 2:
+        events = audit.events_for(sys.argv[2])
+        if not events:
+            print(f"❌ Nenhum evento para {sys.argv[2]}")
+        for event in events:
+            mark = "✅" if event["success"] else "❌"
+            print(f"{event['timestamp']} {mark} {event['action']} ({event['duration_ms']}ms)")
+            if event["error_type"]:
+                print(f"    {event['error_type']}: {event['error_msg']}")
+            if event["screenshot_path"]:
+                print(f"    📸 {event['screenshot_path']}")
+    elif command == "durations":
+        print(f"⏱️ Durações por ação (últimos {days} dias)")
+        print(f"{'ação':<24} {'n':>6} {'p50':>10} {'p95':>10} {'máx':>10}")
+        for action, stats in sorted(audit.duration_stats(days).items()):
+            print(
+                f"{action:<24} {stats['count']:>6} {stats['p50_ms']:>8}ms "
+                f"{stats['p95_ms']:>8}ms {stats['max_ms']:>8}ms"
+            )
+    elif command == "failures":
+        print(f"❌ Falhas por ação e tipo de erro (últimos {days} dias)")
+        for row in audit.failure_breakdown(days):
+            print(
+                f"{row['total']:>5}x {row['action']:<24} {row['error_type'] or '-':<28} "
+                f"última: {row['last_at'][:19]}"
+            )
+    elif command == "daily":
+        print(f"📅 Eventos por dia (últimos {days} dias)")
+        for row in audit.daily_counts(days):
+            print(
+                f"{row['day']} {row['action']:<24} {row['total']:>5} "
+                f"(✅ {row['successes']} / ❌ {row['total'] - row['successes']})"
+            )
+    elif command == "import-csv":
+        csv_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(log_dir, "linkedin_audit.csv")
+        imported = audit.import_csv(csv_path)
+        print(f"✅ {imported} eventos importados de {csv_path}")
+    else:
+        print("Uso: python -m app.audit_log show <execution_id>")
+        print("     python -m app.audit_log durations|failures|daily [dias]")
+        print("     python -m app.audit_log import-csv [linkedin_audit.csv]")
+        sys.exit(1)
+    print(f"📦 Banco: {audit.db_path}")
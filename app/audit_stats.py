@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Audit Stats - Contadores incrementais do linkedin_audit.csv
+Lê apenas as linhas novas a partir de um checkpoint (offset em bytes),
+para que o /stats não precise reler o CSV inteiro a cada chamada.
+Após uma rotação (linkedin_audit.csv.1, ...) termina de ler o arquivo
+rotacionado antes de passar ao novo
+"""
+import io
+import os
+import csv
+import json
+import threading
+from typing import Dict
+
+from .audit_writer import rotated_paths
+
+CHECKPOINT_FILENAME = "audit_stats.json"
+
+
+def _empty_counters() -> Dict:
+    return {
+        "offset": 0,
+        "inode": None,
+        "total_records": 0,
+        "successes": 0,
+        "failures": 0,
+        "actions": {},
+    }
+
+
+def _complete_prefix(chunk: bytes) -> int:
+    """
+    Tamanho do trecho que termina em um registro CSV completo: último "\\n"
+    fora de aspas (post_text/error_msg podem conter quebras de linha)
+    """
+    quotes = chunk.count(b'"')
+    end = len(chunk)
+    while True:
+        newline = chunk.rfind(b"\n", 0, end)
+        if newline < 0:
+            return 0
+        quotes -= chunk.count(b'"', newline + 1, end)
+        if quotes % 2 == 0:
+            return newline + 1
+        end = newline
+
+
+class AuditStats:
+    """Contadores por ação e resultado, atualizados lendo só o final do CSV"""
+
+    def __init__(self, csv_path: str, checkpoint_path: str = None):
+        self.csv_path = csv_path
+        self.checkpoint_path = checkpoint_path or os.path.join(
+            os.path.dirname(csv_path), CHECKPOINT_FILENAME
+        )
+        self._lock = threading.Lock()
+        self.counters = self._load_checkpoint()
+
+    def _load_checkpoint(self) -> Dict:
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                return {**_empty_counters(), **json.load(f)}
+        except (FileNotFoundError, json.JSONDecodeError):
+            return _empty_counters()
+
+    def _save_checkpoint(self) -> None:
+        temp_path = f"{self.checkpoint_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.counters, f)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def refresh(self) -> Dict:
+        """Processar linhas novas desde o checkpoint e devolver os contadores"""
+        with self._lock:
+            try:
+                stat = os.stat(self.csv_path)
+            except FileNotFoundError:
+                return self.snapshot()
+
+            counters = self.counters
+            # Arquivo rotacionado, recriado ou truncado: recomeçar do início do novo
+            if counters["inode"] != stat.st_ino or stat.st_size < counters["offset"]:
+                if counters["inode"] not in (None, stat.st_ino):
+                    self._catch_up_rotated()
+                counters["inode"] = stat.st_ino
+                counters["offset"] = 0
+
+            if stat.st_size == counters["offset"]:
+                return self.snapshot()
+
+            with open(self.csv_path, "rb") as f:
+                f.seek(counters["offset"])
+                chunk = f.read(stat.st_size - counters["offset"])
+
+            complete = _complete_prefix(chunk)
+            if complete:
+                self._count_rows(chunk[:complete])
+                counters["offset"] += complete
+                self._save_checkpoint()
+
+            return self.snapshot()
+
+    def _count_file(self, path: str, offset: int = 0) -> None:
+        """Contar os registros completos de um arquivo a partir do offset"""
+        with open(path, "rb") as f:
+            f.seek(offset)
+            chunk = f.read()
+        self._count_rows(chunk[: _complete_prefix(chunk)])
+
+    def _catch_up_rotated(self) -> None:
+        """
+        Terminar o arquivo do checkpoint (agora um .N rotacionado) e contar
+        os rotacionados depois dele; se já foi descartado, segue só com o novo
+        """
+        backups = rotated_paths(self.csv_path)
+        inodes = []
+        for path in backups:
+            try:
+                inodes.append(os.stat(path).st_ino)
+            except FileNotFoundError:
+                inodes.append(None)
+
+        if self.counters["inode"] not in inodes:
+            return
+        start = inodes.index(self.counters["inode"])
+        self._count_file(backups[start], self.counters["offset"])
+        for path in backups[start + 1 :]:
+            self._count_file(path)
+
+    def _count_rows(self, data: bytes) -> None:
+        counters = self.counters
+        text = io.StringIO(data.decode("utf-8", errors="replace"), newline="")
+        for row in csv.reader(text):
+            if len(row) < 4 or row[0] == "timestamp":
+                continue
+            counters["total_records"] += 1
+            action = row[2]
+            counters["actions"][action] = counters["actions"].get(action, 0) + 1
+            if row[3] == "True":
+                counters["successes"] += 1
+            elif row[3] == "False":
+                counters["failures"] += 1
+
+    def rebuild(self) -> Dict:
+        """Zerar o checkpoint e recontar o CSV inteiro e os rotacionados (recuperação)"""
+        with self._lock:
+            self.counters = _empty_counters()
+            for path in rotated_paths(self.csv_path):
+                self._count_file(path)
+        return self.refresh()
+
+    def snapshot(self) -> Dict:
+        """Cópia dos contadores atuais"""
+        counters = dict(self.counters)
+        counters["actions"] = dict(self.counters["actions"])
+        return counters
+
+
+# Teste local
+if __name__ == "__main__":
+    import sys
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "linkedin_audit.csv")
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["timestamp", "execution_id", "action", "success"])
+            writer.writerow(["t1", "e1", "telegram_start", True])
+            writer.writerow(["t2", "e1", "login", False, "texto com\nquebra"])
+
+        stats = AuditStats(path)
+        first = stats.refresh()
+
+        # Linha incompleta (escrita em andamento) não é contada
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('t3,e2,publish,True,"começo sem fim')
+        partial = stats.refresh()
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('\nde texto"\n')
+
+        second = AuditStats(path).refresh()  # retoma do checkpoint salvo
+        rebuilt = AuditStats(path).rebuild()
+
+        # Linha escrita antes da rotação e ainda não lida + arquivo novo
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("t4,e3,login,True\n")
+        os.replace(path, f"{path}.1")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("timestamp,execution_id,action,success\nt5,e4,login,False\n")
+        rotated = AuditStats(path).refresh()
+        rebuilt_rotated = AuditStats(path).rebuild()
+
+        checks = [
+            first["total_records"] == 2 and first["failures"] == 1,
+            partial["total_records"] == 2,
+            second["total_records"] == 3 and second["actions"].get("publish") == 1,
+            rebuilt == second,
+            rotated["total_records"] == 5 and rotated["actions"].get("login") == 3,
+            rebuilt_rotated == rotated,
+        ]
+        print(f"📈 {second}")
+        if not all(checks):
+            print(f"❌ Falhas: {checks}")
+            sys.exit(1)
+        print("✅ Contadores incrementais consistentes")
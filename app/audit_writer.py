@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Audit Writer - Escrita em lote da auditoria (linkedin_audit.csv + audit.db)
+log_csv_event só enfileira o evento; uma thread grava o lote por intervalo,
+por tamanho do buffer ou no encerramento. O CSV é escrito com um único
+write em modo append sob flock, então bot e worker de publicação podem
+escrever juntos, e é rotacionado por tamanho (linkedin_audit.csv.1, .2, ...)
+"""
+import io
+import os
+import csv
+import fcntl
+import atexit
+import logging
+import threading
+from typing import Dict, List, Optional, Sequence
+
+# Logger do linkedin_poster sem importar o módulo (Selenium)
+logger = logging.getLogger("linkedin_poster")
+
+# Intervalo máximo entre gravações do buffer (segundos)
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1.0"))
+
+# Eventos no buffer que disparam gravação imediata
+AUDIT_FLUSH_EVENTS = int(os.getenv("AUDIT_FLUSH_EVENTS", "100"))
+
+# fsync: never (só write), batch (um fsync por lote), always (cada evento
+# gravado e sincronizado antes de log_csv_event retornar)
+AUDIT_FSYNC = os.getenv("AUDIT_FSYNC", "batch").lower()
+FSYNC_POLICIES = ("never", "batch", "always")
+
+# Rotação do CSV por tamanho
+AUDIT_MAX_BYTES = int(os.getenv("AUDIT_MAX_BYTES", str(10 * 1024 * 1024)))
+AUDIT_BACKUP_COUNT = int(os.getenv("AUDIT_BACKUP_COUNT", "5"))
+
+
+def rotated_paths(csv_path: str, backup_count: int = AUDIT_BACKUP_COUNT) -> List[str]:
+    """Arquivos rotacionados existentes, do mais antigo para o mais novo"""
+    paths = [f"{csv_path}.{i}" for i in range(backup_count, 0, -1)]
+    return [path for path in paths if os.path.exists(path)]
+
+
+class AuditWriter:
+    """Buffer de eventos de auditoria com thread de gravação"""
+
+    def __init__(
+        self,
+        csv_path: str,
+        header: Sequence[str],
+        audit=None,
+        flush_interval: float = AUDIT_FLUSH_INTERVAL,
+        flush_events: int = AUDIT_FLUSH_EVENTS,
+        fsync: str = AUDIT_FSYNC,
+        max_bytes: int = AUDIT_MAX_BYTES,
+        backup_count: int = AUDIT_BACKUP_COUNT,
+    ):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"AUDIT_FSYNC inválido: {fsync} (use {', '.join(FSYNC_POLICIES)})")
+        self.csv_path = csv_path
+        self.header = list(header)
+        self.audit = audit  # AuditLog (opcional)
+        self.flush_interval = flush_interval
+        self.flush_events = flush_events
+        self.fsync = fsync
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.lock_path = f"{csv_path}.lock"
+        os.makedirs(os.path.dirname(csv_path) or ".", exist_ok=True)
+        self.stats = {"events": 0, "flushes": 0, "rotations": 0, "errors": 0}
+        self._reset()
+        atexit.register(self.close)
+
+    def _reset(self) -> None:
+        """Estado por processo (também usado no filho após fork)"""
+        self._pid = os.getpid()
+        self._buffer: List[tuple] = []
+        self._buffer_lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._fd: Optional[int] = None
+
+    def _ensure_thread(self) -> None:
+        if self._pid != os.getpid():
+            # Fork: o buffer herdado é do pai (ele grava), locks podem estar presos
+            self._reset()
+        if self._thread is None and self.fsync != "always":
+            self._thread = threading.Thread(
+                target=self._run, name="audit-writer", daemon=True
+            )
+            self._thread.start()
+
+    def append(self, row: Sequence, event: Optional[Dict] = None) -> None:
+        """Enfileirar uma linha do CSV (e o evento completo para o audit.db)"""
+        self._ensure_thread()
+        with self._buffer_lock:
+            self._buffer.append((row, event))
+            pending = len(self._buffer)
+
+        if self.fsync == "always":
+            self.flush()
+        elif pending >= self.flush_events:
+            self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """Gravar o buffer (CSV em um write, audit.db em uma transação)"""
+        if self._pid != os.getpid():
+            self._reset()
+        with self._io_lock:
+            with self._buffer_lock:
+                batch, self._buffer = self._buffer, []
+            if not batch:
+                return 0
+
+            try:
+                self._write_csv([row for row, _ in batch])
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"❌ Erro ao escrever log CSV: {e}")
+
+            events = [event for _, event in batch if event is not None]
+            if self.audit is not None and events:
+                try:
+                    self.audit.record_many(events)
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    logger.error(f"❌ Erro ao gravar auditoria: {e}")
+
+            self.stats["events"] += len(batch)
+            self.stats["flushes"] += 1
+            return len(batch)
+
+    def _write_csv(self, rows: List[Sequence]) -> None:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows(rows)
+        data = buffer.getvalue().encode("utf-8")
+
+        # flock em arquivo separado: rotação renomeia o CSV
+        with open(self.lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                fd = self._open()
+                size = os.fstat(fd).st_size
+                if self.max_bytes and size > len(self._header_bytes()) and (
+                    size + len(data) > self.max_bytes
+                ):
+                    self._rotate()
+                    fd = self._open()
+                os.write(fd, data)
+                if self.fsync != "never":
+                    os.fsync(fd)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _header_bytes(self) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(self.header)
+        return buffer.getvalue().encode("utf-8")
+
+    def _open(self) -> int:
+        """
+        Descritor do CSV atual (O_APPEND); reabre se outro processo rotacionou
+        o arquivo. Arquivo novo recebe o cabeçalho (chamado com o flock)
+        """
+        if self._fd is not None:
+            try:
+                if os.stat(self.csv_path).st_ino == os.fstat(self._fd).st_ino:
+                    return self._fd
+            except FileNotFoundError:
+                pass
+            os.close(self._fd)
+            self._fd = None
+
+        fd = os.open(self.csv_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        if os.fstat(fd).st_size == 0:
+            os.write(fd, self._header_bytes())
+        self._fd = fd
+        return fd
+
+    def _rotate(self) -> None:
+        """linkedin_audit.csv → .1 → .2 ... (o mais antigo é apagado)"""
+        os.close(self._fd)
+        self._fd = None
+        for i in range(self.backup_count - 1, 0, -1):
+            source = f"{self.csv_path}.{i}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.csv_path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.csv_path, f"{self.csv_path}.1")
+        else:
+            os.remove(self.csv_path)
+        self.stats["rotations"] += 1
+        logger.info(f"🔄 Auditoria CSV rotacionada: {self.csv_path}")
+
+    def close(self) -> None:
+        """Parar a thread e gravar o que falta (encerramento)"""
+        if self._pid == os.getpid() and self._thread is not None:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join(5)
+            self._thread = None
+        self.flush()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+# Teste local
+if __name__ == "__main__":
+    import sys
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "linkedin_audit.csv")
+        writer = AuditWriter(
+            path, ["timestamp", "execution_id", "action", "success"],
+            flush_interval=0.05, max_bytes=2048, backup_count=2,
+        )
+        for i in range(200):
+            writer.append([f"t{i}", f"e{i}", "login", True])
+            if i % 20 == 19:
+                writer.flush()  # lotes menores que o limite do arquivo
+        writer.close()
+
+        files = [path] + rotated_paths(path, 2)
+        rows = []
+        for name in files:
+            with open(name, newline="", encoding="utf-8") as f:
+                content = list(csv.reader(f))
+            if content[0][0] != "timestamp":
+                print(f"❌ Sem cabeçalho: {name}")
+                sys.exit(1)
+            rows.extend(content[1:])
+
+        print(f"📝 {writer.stats} | arquivos: {[os.path.basename(f) for f in files]}")
+        # Rotação com 2 backups descarta os mais antigos; os restantes são os últimos
+        kept = sorted(int(row[1][1:]) for row in rows)
+        if writer.stats["rotations"] == 0 or kept != list(range(200 - len(kept), 200)):
+            print("❌ Rotação perdeu ou duplicou eventos recentes")
+            sys.exit(1)
+    print("✅ Buffer gravado e rotacionado sem perder os eventos recentes")
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Batch Upload - Recebimento de lotes de HTML pelo Telegram
+Um .zip ou um álbum (media group) de arquivos .html vira um lote: os
+arquivos são extraídos/validados em paralelo no pool de processos e todos
+os válidos entram na fila de pendentes em uma única transação
+"""
+import io
+import os
+import asyncio
+import zipfile
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+# Máximo de arquivos HTML por lote
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "50"))
+
+# Tamanho máximo descompactado do .zip (proteção contra zip bomb)
+BATCH_MAX_BYTES = int(os.getenv("BATCH_MAX_BYTES", str(50 * 1024 * 1024)))
+
+# Espera após o último arquivo de um álbum antes de processar o lote (segundos)
+MEDIA_GROUP_WAIT = float(os.getenv("MEDIA_GROUP_WAIT", "1.5"))
+
+# Limite por arquivo (mesmo do upload individual)
+MAX_HTML_BYTES = 10 * 1024 * 1024
+
+
+def extract_html_from_zip(data: bytes) -> Tuple[List[Tuple[str, bytes]], List[Dict]]:
+    """
+    Extrair os .html de um .zip em memória (picklable, roda no pool de processos)
+    Retorna (arquivos [(nome, bytes)], ignorados [{"name", "issues"}])
+    """
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(data))
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"Arquivo .zip inválido: {e}")
+
+    files: List[Tuple[str, bytes]] = []
+    skipped: List[Dict] = []
+    total = 0
+
+    with archive:
+        for info in archive.infolist():
+            name = os.path.basename(info.filename)
+            if info.is_dir() or not name or name.startswith(".") or "__MACOSX" in info.filename:
+                continue
+            if not name.lower().endswith(".html"):
+                skipped.append({"name": name, "issues": ["Não é um arquivo .html"]})
+                continue
+            if info.file_size > MAX_HTML_BYTES:
+                skipped.append(
+                    {
+                        "name": name,
+                        "issues": [f"Arquivo muito grande: {info.file_size/1024/1024:.1f}MB"],
+                    }
+                )
+                continue
+            if len(files) >= BATCH_MAX_FILES:
+                skipped.append(
+                    {"name": name, "issues": [f"Limite de {BATCH_MAX_FILES} arquivos por lote"]}
+                )
+                continue
+
+            total += info.file_size
+            if total > BATCH_MAX_BYTES:
+                raise ValueError(
+                    f"Conteúdo descompactado excede {BATCH_MAX_BYTES // (1024 * 1024)}MB"
+                )
+            files.append((name, archive.read(info)))
+
+    return files, skipped
+
+
+class MediaGroupCollector:
+    """
+    Junta os documentos de um álbum do Telegram (cada um chega como update
+    separado) e entrega o grupo inteiro quando param de chegar arquivos
+    """
+
+    def __init__(self, wait: float = MEDIA_GROUP_WAIT):
+        self.wait = wait
+        self._groups: Dict[Tuple[int, str], Dict] = {}
+
+    def add(
+        self,
+        user_id: int,
+        media_group_id: str,
+        item,
+        on_complete: Callable[[int, List], Awaitable[None]],
+    ) -> bool:
+        """Adicionar item ao grupo; retorna True se for o primeiro do grupo"""
+        key = (user_id, media_group_id)
+        loop = asyncio.get_running_loop()
+        group = self._groups.get(key)
+        first = group is None
+        if first:
+            group = {"items": [], "last_at": 0.0}
+            self._groups[key] = group
+            group["task"] = loop.create_task(self._flush(key, on_complete))
+        group["items"].append(item)
+        group["last_at"] = loop.time()
+        return first
+
+    async def _flush(self, key: Tuple[int, str], on_complete) -> None:
+        loop = asyncio.get_running_loop()
+        # Esperar o álbum parar de crescer
+        while True:
+            remaining = self._groups[key]["last_at"] + self.wait - loop.time()
+            if remaining <= 0:
+                break
+            await asyncio.sleep(remaining)
+
+        group = self._groups.pop(key)
+        await on_complete(key[0], group["items"])
+
+    def pending(self) -> int:
+        """Álbuns ainda sendo recebidos"""
+        return len(self._groups)
+
+
+# Teste local
+if __name__ == "__main__":
+    import sys
+
+    html = b"<html><head><title>Post %d</title></head><body>%s</body></html>"
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for i in range(3):
+            archive.writestr(f"lote/post_{i}.html", html % (i, b"texto " * 30))
+        archive.writestr("lote/imagem.png", b"\x89PNG")
+        archive.writestr("__MACOSX/lote/._post_0.html", b"lixo")
+
+    files, skipped = extract_html_from_zip(buffer.getvalue())
+    print(f"📦 Extraídos: {[name for name, _ in files]} | ignorados: {skipped}")
+
+    async def scenario() -> List:
+        collector = MediaGroupCollector(wait=0.1)
+        delivered = []
+
+        async def on_complete(user_id: int, items: List) -> None:
+            delivered.append((user_id, items))
+
+        for i in range(4):
+            collector.add(7, "album", i, on_complete)
+            await asyncio.sleep(0.02)
+        await asyncio.sleep(0.3)
+        return delivered
+
+    delivered = asyncio.run(scenario())
+    ok = (
+        len(files) == 3
+        and [item["name"] for item in skipped] == ["imagem.png"]
+        and delivered == [(7, [0, 1, 2, 3])]
+    )
+    if not ok:
+        print(f"❌ Resultado inesperado: {delivered}")
+        sys.exit(1)
+    print("✅ Zip extraído e álbum entregue como um lote")
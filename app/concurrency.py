@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Concurrency - Processamento concorrente de updates do Telegram
+Updates de usuários diferentes rodam em paralelo; os comandos de um mesmo
+usuário são serializados. Uploads não ocupam o lock do usuário durante
+download, parsing e GPT: só a gravação na fila e a passagem para aprovação
+o tomam (o /approve não corre junto com essas mudanças).
+Etapas pesadas (GPT, navegador) têm semáforos globais
+"""
+import os
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Dict, Optional
+
+from telegram.ext import BaseUpdateProcessor
+
+# Updates processados ao mesmo tempo (todos os usuários)
+TELEGRAM_CONCURRENT_UPDATES = int(os.getenv("TELEGRAM_CONCURRENT_UPDATES", "64"))
+
+# Chamadas GPT simultâneas (processamento + revisão)
+GPT_CONCURRENCY = int(os.getenv("GPT_CONCURRENCY", "4"))
+
+# Publicações simultâneas no navegador (o worker Selenium é um só)
+BROWSER_CONCURRENCY = int(os.getenv("BROWSER_CONCURRENCY", "1"))
+
+
+class UserLocks:
+    """Lock por usuário, compartilhado entre comandos e mudanças de fila"""
+
+    def __init__(self):
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._waiting: Dict[int, int] = {}
+
+    @asynccontextmanager
+    async def hold(self, user_id: int) -> AsyncIterator[None]:
+        lock = self._locks.setdefault(user_id, asyncio.Lock())
+        self._waiting[user_id] = self._waiting.get(user_id, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            # Remover o lock quando não há mais ninguém do usuário
+            self._waiting[user_id] -= 1
+            if not self._waiting[user_id]:
+                del self._waiting[user_id]
+                del self._locks[user_id]
+
+    def active(self) -> int:
+        """Usuários com lock em uso ou aguardando"""
+        return len(self._locks)
+
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """Concorrência entre usuários com ordem preservada por usuário"""
+
+    def __init__(
+        self,
+        max_concurrent_updates: int = TELEGRAM_CONCURRENT_UPDATES,
+        locks: Optional[UserLocks] = None,
+    ):
+        super().__init__(max_concurrent_updates)
+        self.locks = locks or UserLocks()
+
+    def _user_id(self, update: object) -> Optional[int]:
+        user = getattr(update, "effective_user", None)
+        return user.id if user else None
+
+    def _is_upload(self, update: object) -> bool:
+        message = getattr(update, "message", None)
+        return getattr(message, "document", None) is not None
+
+    async def do_process_update(self, update: object, coroutine: Awaitable) -> None:
+        user_id = self._user_id(update)
+        # Upload: o handler toma o lock só ao mexer na fila (UserLocks.hold)
+        if user_id is None or self._is_upload(update):
+            await coroutine
+            return
+
+        async with self.locks.hold(user_id):
+            await coroutine
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    def active_users(self) -> int:
+        """Usuários com updates em andamento ou aguardando"""
+        return self.locks.active()
+
+
+class StageLimits:
+    """Semáforos globais das etapas pesadas do pipeline"""
+
+    def __init__(
+        self, gpt: int = GPT_CONCURRENCY, browser: int = BROWSER_CONCURRENCY
+    ):
+        self.gpt_limit = max(1, gpt)
+        self.browser_limit = max(1, browser)
+        self.gpt = asyncio.Semaphore(self.gpt_limit)
+        self.browser = asyncio.Semaphore(self.browser_limit)
+
+    def stats(self) -> Dict[str, str]:
+        """Ocupação atual (em uso/limite)"""
+        return {
+            "gpt": f"{self.gpt_limit - self.gpt._value}/{self.gpt_limit}",
+            "browser": f"{self.browser_limit - self.browser._value}/{self.browser_limit}",
+        }
+
+
+# Teste local - 10 usuários em paralelo, ordem preservada por usuário, e
+# upload lento que não segura os comandos do próprio usuário
+if __name__ == "__main__":
+    import sys
+    import time
+    from types import SimpleNamespace
+
+    async def scenario() -> bool:
+        processor = PerUserUpdateProcessor(32)
+        order = []
+
+        async def handle(user_id: int, step: int) -> None:
+            await asyncio.sleep(0.1 if step == 0 else 0.01)
+            order.append((user_id, step))
+
+        def update(user_id: int):
+            return SimpleNamespace(effective_user=SimpleNamespace(id=user_id))
+
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(
+                processor.process_update(update(user_id), handle(user_id, step))
+                for user_id in range(10)
+                for step in range(2)
+            )
+        )
+        elapsed = time.perf_counter() - start
+
+        per_user_ordered = all(
+            [step for uid, step in order if uid == user_id] == [0, 1]
+            for user_id in range(10)
+        )
+        print(f"⏱️ 20 updates de 10 usuários em {elapsed * 1000:.0f}ms")
+        return per_user_ordered and elapsed < 0.5 and processor.active_users() == 0
+
+    async def upload_scenario() -> bool:
+        processor = PerUserUpdateProcessor(32)
+        events = []
+
+        async def upload() -> None:
+            await asyncio.sleep(0.3)  # download + parsing + GPT, sem lock
+            async with processor.locks.hold(1):
+                events.append("upload_queued")
+
+        async def command() -> None:
+            events.append("command")
+
+        upload_update = SimpleNamespace(
+            effective_user=SimpleNamespace(id=1),
+            message=SimpleNamespace(document=object()),
+        )
+        command_update = SimpleNamespace(
+            effective_user=SimpleNamespace(id=1), message=SimpleNamespace(document=None)
+        )
+        start = time.perf_counter()
+        upload_task = asyncio.ensure_future(processor.process_update(upload_update, upload()))
+        await asyncio.sleep(0.01)
+        await processor.process_update(command_update, command())
+        command_ms = (time.perf_counter() - start) * 1000
+        await upload_task
+
+        print(f"⏱️ Comando durante upload lento do mesmo usuário em {command_ms:.0f}ms")
+        return events == ["command", "upload_queued"] and command_ms < 100
+
+    if not asyncio.run(scenario()):
+        print("❌ Ordem por usuário ou paralelismo incorretos")
+        sys.exit(1)
+    if not asyncio.run(upload_scenario()):
+        print("❌ Upload segurou o lock do usuário fora da gravação na fila")
+        sys.exit(1)
+    print("✅ Usuários em paralelo, ordem preservada por usuário")
@@ -4,19 +4,255 @@ Content Reviewer - Revisão de conteúdo pré-publicação
 Valida e revisa sem alterar o estilo original
 """
 import os
+import re
 import json
+import asyncio
+import hashlib
+import difflib
+import threading
+import contextlib
 import openai
-from typing import Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
 from datetime import datetime
 
+try:
+    from .metrics import record_cache
+except ImportError:  # executado como script (python3 app/content_reviewer.py)
+    from metrics import record_cache
+
 # Configurar OpenAI
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
+# Modelos que aceitam response_format={"type": "json_object"}
+JSON_MODE_MODELS = ("gpt-4o", "gpt-4-turbo", "gpt-4-1106", "gpt-3.5-turbo-1106")
+
+VALID_RECOMMENDATIONS = ("APPROVE", "REVIEW_NEEDED", "REJECT")
+
+# Valores padrão do schema de revisão (campos ausentes na resposta da IA)
+REVIEW_SCHEMA_DEFAULTS = {
+    "approved": False,
+    "issues": [],
+    "suggestions": [],
+    "compliance_check": {
+        "appropriate_tone": True,
+        "professional_content": True,
+        "no_offensive_language": True,
+        "linkedin_appropriate": True,
+    },
+    "quality_metrics": {
+        "character_count": 0,
+        "hashtag_count": 0,
+        "emoji_count": 0,
+        "readability": "medium",
+    },
+    "final_recommendation": "REVIEW_NEEDED",
+    "confidence_score": 0.0,
+}
+
+# Revisão em lote (review_many)
+BATCH_TOKEN_BUDGET = 6000
+BATCH_MAX_DRAFTS = 8
+BATCH_MAX_CONCURRENCY = 4
+REVIEW_OUTPUT_TOKENS = 350
+
+REVIEW_INSTRUCTIONS = """INSTRUÇÕES DE REVISÃO:
+1. NÃO REESCREVER - apenas revisar e apontar problemas
+2. Verificar gramática e ortografia
+3. Avaliar adequação para LinkedIn profissional
+4. Verificar se hashtags são relevantes
+5. Avaliar tamanho (ideal 1300 caracteres)
+6. Verificar tom profissional
+7. Identificar possíveis problemas de compliance"""
+
+REVIEW_RESPONSE_FORMAT = """{
+  "approved": true/false,
+  "issues": ["lista de problemas encontrados"],
+  "suggestions": ["sugestões específicas sem reescrever"],
+  "compliance_check": {
+    "appropriate_tone": true/false,
+    "professional_content": true/false,
+    "no_offensive_language": true/false,
+    "linkedin_appropriate": true/false
+  },
+  "quality_metrics": {
+    "character_count": número,
+    "hashtag_count": número,
+    "emoji_count": número,
+    "readability": "high/medium/low"
+  },
+  "flagged_sentences": [{"sentence": "trecho exato com problema", "issue": "problema"}],
+  "final_recommendation": "APPROVE/REVIEW_NEEDED/REJECT",
+  "confidence_score": 0.0-1.0
+}"""
+
+# Limite de vereditos por sentença mantidos em memória
+SENTENCE_CACHE_LIMIT = 5000
+
+_SENTENCE_SPLIT_PATTERN = re.compile(r"(?<=[.!?…])\s+|\n+")
+_FENCE_PATTERN = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.DOTALL)
+_TRAILING_COMMA_PATTERN = re.compile(r",\s*([}\]])")
+
+
+def _iter_json_candidates(text: str):
+    """Gerar trechos candidatos a objeto JSON, do mais provável ao menos"""
+    yield text
+
+    # Blocos cercados por ```json ... ```
+    for match in _FENCE_PATTERN.finditer(text):
+        yield match.group(1).strip()
+
+    # Varredura com balanceamento de chaves (ignorando chaves dentro de strings)
+    depth = 0
+    start = None
+    in_string = False
+    escaped = False
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == '"':
+            in_string = depth > 0
+        elif char == "{":
+            if depth == 0:
+                start = i
+            depth += 1
+        elif char == "}" and depth > 0:
+            depth -= 1
+            if depth == 0:
+                yield text[start : i + 1]
+
+
+def extract_json_object(text: str) -> Optional[Dict]:
+    """
+    Extrair o primeiro objeto JSON válido de uma resposta do modelo
+    Tolera cercas de código, texto antes/depois e vírgulas finais
+    """
+    if not text:
+        return None
+
+    for candidate in _iter_json_candidates(text.strip()):
+        for attempt in (candidate, _TRAILING_COMMA_PATTERN.sub(r"\1", candidate)):
+            try:
+                data = json.loads(attempt)
+            except (json.JSONDecodeError, ValueError):
+                continue
+            if isinstance(data, dict):
+                return data
+
+    return None
+
+
+def _coerce_bool(value: Any, default: bool) -> bool:
+    """Converter valores como "true"/"sim"/1 para bool"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return bool(value)
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in ("true", "yes", "sim", "1"):
+            return True
+        if lowered in ("false", "no", "não", "nao", "0"):
+            return False
+    return default
+
+
+def _coerce_str_list(value: Any) -> List[str]:
+    """Normalizar listas de strings (aceita string única)"""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value] if value.strip() else []
+    if isinstance(value, (list, tuple)):
+        return [str(item) for item in value if str(item).strip()]
+    return [str(value)]
+
+
+def validate_review_schema(data: Dict) -> Dict:
+    """Validar resposta da revisão aplicando defaults e tipos esperados"""
+    review = dict(data)
+
+    review["approved"] = _coerce_bool(
+        data.get("approved"), REVIEW_SCHEMA_DEFAULTS["approved"]
+    )
+    review["issues"] = _coerce_str_list(data.get("issues"))
+    review["suggestions"] = _coerce_str_list(data.get("suggestions"))
+
+    for section in ("compliance_check", "quality_metrics"):
+        defaults = REVIEW_SCHEMA_DEFAULTS[section]
+        values = data.get(section)
+        values = values if isinstance(values, dict) else {}
+        merged = dict(defaults)
+        for key, default in defaults.items():
+            if key not in values:
+                continue
+            if isinstance(default, bool):
+                merged[key] = _coerce_bool(values[key], default)
+            elif isinstance(default, int):
+                try:
+                    merged[key] = int(values[key])
+                except (TypeError, ValueError):
+                    pass
+            else:
+                merged[key] = str(values[key])
+        review[section] = merged
+
+    recommendation = str(data.get("final_recommendation", "")).strip().upper()
+    if recommendation not in VALID_RECOMMENDATIONS:
+        recommendation = "APPROVE" if review["approved"] else "REVIEW_NEEDED"
+    review["final_recommendation"] = recommendation
+
+    flagged = data.get("flagged_sentences")
+    review["flagged_sentences"] = [
+        {"sentence": str(item.get("sentence", "")), "issue": str(item.get("issue", ""))}
+        for item in (flagged if isinstance(flagged, list) else [])
+        if isinstance(item, dict) and str(item.get("sentence", "")).strip()
+    ]
+
+    try:
+        confidence = float(data.get("confidence_score", 0.0))
+    except (TypeError, ValueError):
+        confidence = REVIEW_SCHEMA_DEFAULTS["confidence_score"]
+    review["confidence_score"] = min(max(confidence, 0.0), 1.0)
+
+    return review
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa grosseira de tokens (~4 caracteres por token)"""
+    return len(text or "") // 4 + 1
+
+
+def split_sentences(content: str) -> List[str]:
+    """Dividir conteúdo em sentenças (pontuação final ou quebra de linha)"""
+    return [
+        sentence.strip()
+        for sentence in _SENTENCE_SPLIT_PATTERN.split(content or "")
+        if sentence.strip()
+    ]
+
+
+def _normalize_sentence(sentence: str) -> str:
+    return " ".join(sentence.split()).lower()
+
+
+def sentence_key(sentence: str) -> str:
+    """Chave estável do veredito de uma sentença"""
+    return hashlib.sha1(_normalize_sentence(sentence).encode("utf-8")).hexdigest()
+
 
 class ContentReviewer:
     """Revisor de conteúdo para validação pré-publicação"""
 
     def __init__(self):
+        self.model = "gpt-4o-mini"
+
         # Configurar cliente OpenAI apenas se API key estiver disponível
         api_key = os.getenv("OPENAI_API_KEY")
         if api_key:
@@ -27,6 +263,11 @@ class ContentReviewer:
                 "⚠️ OPENAI_API_KEY não configurado - funcionalidades de revisão IA desabilitadas"
             )
 
+        # Cache de vereditos por sentença {sentence_key: {issues, compliance, source}}
+        # source "ai" ou "local"; review_many revisa em várias threads
+        self.sentence_verdicts: Dict[str, Dict] = {}
+        self._verdicts_lock = threading.Lock()
+
     def review_content(self, content: str, original_title: str = "") -> Dict:
         """
         Revisar conteúdo sem alterar estilo
@@ -46,39 +287,14 @@ CONTEÚDO PARA REVISÃO:
 
 TÍTULO ORIGINAL: {original_title}
 
-INSTRUÇÕES DE REVISÃO:
-1. NÃO REESCREVER - apenas revisar e apontar problemas
-2. Verificar gramática e ortografia
-3. Avaliar adequação para LinkedIn profissional
-4. Verificar se hashtags são relevantes
-5. Avaliar tamanho (ideal 1300 caracteres)
-6. Verificar tom profissional
-7. Identificar possíveis problemas de compliance
+{REVIEW_INSTRUCTIONS}
 
 RESPONDER APENAS EM JSON:
-{{
-  "approved": true/false,
-  "issues": ["lista de problemas encontrados"],
-  "suggestions": ["sugestões específicas sem reescrever"],
-  "compliance_check": {{
-    "appropriate_tone": true/false,
-    "professional_content": true/false,
-    "no_offensive_language": true/false,
-    "linkedin_appropriate": true/false
-  }},
-  "quality_metrics": {{
-    "character_count": número,
-    "hashtag_count": número,
-    "emoji_count": número,
-    "readability": "high/medium/low"
-  }},
-  "final_recommendation": "APPROVE/REVIEW_NEEDED/REJECT",
-  "confidence_score": 0.0-1.0
-}}
+{REVIEW_RESPONSE_FORMAT}
 """
 
             response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
+                model=self.model,
                 messages=[
                     {
                         "role": "system",
@@ -88,21 +304,18 @@ RESPONDER APENAS EM JSON:
                 ],
                 max_tokens=800,
                 temperature=0.1,
+                **self._json_response_kwargs(),
             )
 
-            result = response.choices[0].message.content.strip()
+            result = response.choices[0].message.content or ""
 
-            # Parse JSON response
-            review_data = json.loads(result)
-
-            # Adicionar metadata
-            review_data["reviewed_at"] = datetime.now().isoformat()
-            review_data["original_content"] = content
-            review_data["word_count"] = len(content.split())
-            review_data["char_count"] = len(content)
-            review_data["review_type"] = "ai"
-
-            return review_data
+            # Parse tolerante (cercas ```json, texto extra, vírgulas finais)
+            parsed = extract_json_object(result)
+            if parsed is None:
+                raise json.JSONDecodeError(
+                    "Nenhum objeto JSON encontrado na resposta", result, 0
+                )
+            return self._finalize_ai_review(parsed, content, "ai")
 
         except json.JSONDecodeError as e:
             return {
@@ -123,6 +336,441 @@ RESPONDER APENAS EM JSON:
                 "review_type": "error",
             }
 
+    def _finalize_ai_review(self, parsed: Dict, content: str, review_type: str) -> Dict:
+        """Validar schema e anexar metadata a uma revisão da IA"""
+        review_data = validate_review_schema(parsed)
+
+        # Adicionar metadata
+        review_data["reviewed_at"] = datetime.now().isoformat()
+        review_data["original_content"] = content
+        review_data["word_count"] = len(content.split())
+        review_data["char_count"] = len(content)
+        review_data["review_type"] = review_type
+
+        self._seed_sentence_verdicts(content, review_data, "ai")
+
+        return review_data
+
+    async def review_many(
+        self,
+        drafts: Dict[str, str],
+        titles: Optional[Dict[str, str]] = None,
+        token_budget: int = BATCH_TOKEN_BUDGET,
+        max_concurrency: int = BATCH_MAX_CONCURRENCY,
+        run_io: Optional[Callable[..., Awaitable]] = None,
+        limit: Optional[asyncio.Semaphore] = None,
+    ) -> Dict[str, Dict]:
+        """
+        Revisar vários rascunhos {id: conteúdo} com instruções enviadas uma vez
+        Agrupa em requisições limitadas por token_budget e separa o resultado por ID;
+        rascunhos que não couberem num lote (ou sem resposta) são revisados
+        individualmente com concorrência limitada
+        run_io: executor das chamadas bloqueantes (ex: PipelineExecutor.run_io)
+        limit: semáforo compartilhado das chamadas à OpenAI (ex: StageLimits.gpt)
+        """
+        titles = titles or {}
+        reviews: Dict[str, Dict] = {}
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        if run_io is None:
+            loop = asyncio.get_running_loop()
+
+            def run_io(func, *args):
+                return loop.run_in_executor(None, func, *args)
+
+        async def call(func, *args):
+            async with semaphore, limit or contextlib.nullcontext():
+                return await run_io(func, *args)
+
+        async def review_single(draft_id: str) -> None:
+            reviews[draft_id] = await call(
+                self.review_content, drafts[draft_id], titles.get(draft_id, "")
+            )
+
+        async def review_batch(batch: List[str]) -> None:
+            reviews.update(await call(self._review_batch, batch, drafts, titles))
+
+        if not self.client:
+            batches = [[draft_id] for draft_id in drafts]
+        else:
+            batches = self._pack_batches(drafts, titles, token_budget)
+
+        await asyncio.gather(
+            *(
+                review_batch(batch) if len(batch) > 1 else review_single(batch[0])
+                for batch in batches
+            )
+        )
+
+        # Fallback: IDs ausentes na resposta do lote
+        missing = [draft_id for draft_id in drafts if draft_id not in reviews]
+        if missing:
+            await asyncio.gather(*(review_single(draft_id) for draft_id in missing))
+
+        return {draft_id: reviews[draft_id] for draft_id in drafts}
+
+    def _pack_batches(
+        self, drafts: Dict[str, str], titles: Dict[str, str], token_budget: int
+    ) -> List[List[str]]:
+        """Agrupar rascunhos em lotes cujo custo estimado cabe no orçamento"""
+        overhead = estimate_tokens(REVIEW_INSTRUCTIONS + REVIEW_RESPONSE_FORMAT)
+        batches: List[List[str]] = []
+        current: List[str] = []
+        current_cost = overhead
+
+        for draft_id, content in drafts.items():
+            cost = (
+                estimate_tokens(content)
+                + estimate_tokens(titles.get(draft_id, ""))
+                + REVIEW_OUTPUT_TOKENS
+            )
+            if current and (
+                current_cost + cost > token_budget or len(current) >= BATCH_MAX_DRAFTS
+            ):
+                batches.append(current)
+                current, current_cost = [], overhead
+            current.append(draft_id)
+            current_cost += cost
+
+        if current:
+            batches.append(current)
+        return batches
+
+    def _review_batch(
+        self, batch: List[str], drafts: Dict[str, str], titles: Dict[str, str]
+    ) -> Dict[str, Dict]:
+        """Revisar um lote em uma única requisição (IDs ausentes ficam de fora)"""
+        sections = "\n\n".join(
+            f"### ID: {draft_id}\nTÍTULO ORIGINAL: {titles.get(draft_id, '')}\n"
+            f"{drafts[draft_id]}"
+            for draft_id in batch
+        )
+        batch_prompt = f"""
+MISSÃO: Revisar {len(batch)} conteúdos para LinkedIn sem alterar o estilo dos autores.
+Cada conteúdo é revisado de forma independente.
+
+{REVIEW_INSTRUCTIONS}
+
+CONTEÚDOS PARA REVISÃO:
+{sections}
+
+RESPONDER APENAS EM JSON, uma revisão por ID:
+{{"reviews": [{{"id": "ID do conteúdo", ...campos abaixo}}]}}
+
+Campos de cada revisão:
+{REVIEW_RESPONSE_FORMAT}
+"""
+
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "Você é um revisor de conteúdo LinkedIn. Revise sem alterar o estilo original.",
+                    },
+                    {"role": "user", "content": batch_prompt},
+                ],
+                max_tokens=min(4000, REVIEW_OUTPUT_TOKENS * len(batch) + 200),
+                temperature=0.1,
+                **self._json_response_kwargs(),
+            )
+            parsed = extract_json_object(response.choices[0].message.content or "")
+        except Exception as e:
+            print(f"Erro na revisão em lote ({len(batch)} rascunhos): {e}")
+            return {}
+
+        items = parsed.get("reviews") if parsed else None
+        if not isinstance(items, list):
+            return {}
+
+        results = {}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            draft_id = str(item.get("id", ""))
+            if draft_id in batch and draft_id not in results:
+                results[draft_id] = self._finalize_ai_review(
+                    item, drafts[draft_id], "ai_batch"
+                )
+        return results
+
+    def _seed_sentence_verdicts(self, content: str, review: Dict, source: str) -> None:
+        """
+        Popular cache por sentença a partir de uma revisão completa
+        source: "ai" ou "local" (vereditos locais são revisados de novo pela IA)
+        """
+        flagged = review.get("flagged_sentences", [])
+        compliance = review.get("compliance_check", {})
+        failed_compliance = {k: v for k, v in compliance.items() if v is False}
+
+        sentences = split_sentences(content)
+        attributed = False
+        verdicts = {}
+        for sentence in sentences:
+            normalized = _normalize_sentence(sentence)
+            issues = [
+                item["issue"]
+                for item in flagged
+                if _normalize_sentence(item["sentence"]) in normalized
+                or normalized in _normalize_sentence(item["sentence"])
+            ]
+            verdicts[sentence_key(sentence)] = {
+                "issues": issues,
+                "compliance": dict(failed_compliance) if issues else {},
+                "source": source,
+            }
+            attributed = attributed or bool(issues)
+
+        # Falha de compliance sem sentença identificada vale para todo o texto
+        if failed_compliance and not attributed:
+            for verdict in verdicts.values():
+                verdict["compliance"] = dict(failed_compliance)
+
+        for key, verdict in verdicts.items():
+            self._remember_verdict(key, verdict)
+
+    def _remember_verdict(self, key: str, verdict: Dict) -> None:
+        """Guardar veredito respeitando o limite do cache"""
+        with self._verdicts_lock:
+            self.sentence_verdicts.pop(key, None)
+            self.sentence_verdicts[key] = verdict
+            while len(self.sentence_verdicts) > SENTENCE_CACHE_LIMIT:
+                self.sentence_verdicts.pop(next(iter(self.sentence_verdicts)))
+
+    def _cached_verdict(self, sentence: str) -> Optional[Dict]:
+        """
+        Veredito reaproveitável da sentença; com a IA disponível, vereditos
+        das regras locais (sem IA ou IA fora do ar) não contam
+        """
+        with self._verdicts_lock:
+            verdict = self.sentence_verdicts.get(sentence_key(sentence))
+        if verdict and self.client and verdict.get("source") != "ai":
+            return None
+        return verdict
+
+    @staticmethod
+    def _review_source(review: Dict) -> str:
+        """Origem dos vereditos de uma revisão salva ("ai" só se toda ela veio da IA)"""
+        if review.get("review_type") in ("ai", "ai_batch"):
+            return "ai"
+        if review.get("review_type") == "incremental" and review.get("ai_reviewed"):
+            return "ai"
+        return "local"
+
+    def review_revision(
+        self, revised_content: str, previous_review: Dict, original_title: str = ""
+    ) -> Dict:
+        """
+        Revisão incremental para /edit
+        Compara com a versão revisada e só revisa as sentenças alteradas
+        """
+        previous_content = previous_review.get("original_content", "")
+        old_sentences = split_sentences(previous_content)
+        new_sentences = split_sentences(revised_content)
+
+        # Cache perdido (ex: restart) - reconstruir a partir da revisão anterior
+        if any(self._cached_verdict(s) is None for s in old_sentences):
+            self._seed_sentence_verdicts(
+                previous_content, previous_review, self._review_source(previous_review)
+            )
+
+        # Diff por sentença: só inserções/substituições vão para a revisão (a
+        # não ser que a sentença já tenha veredito em cache); trechos iguais
+        # mantêm o veredito da revisão anterior, mesmo que local
+        matcher = difflib.SequenceMatcher(
+            a=[sentence_key(s) for s in old_sentences],
+            b=[sentence_key(s) for s in new_sentences],
+            autojunk=False,
+        )
+        changed = []
+        for tag, _, _, j1, j2 in matcher.get_opcodes():
+            if tag in ("replace", "insert"):
+                changed.extend(
+                    s for s in new_sentences[j1:j2] if self._cached_verdict(s) is None
+                )
+
+        # Remover duplicatas mantendo ordem
+        changed = list(dict.fromkeys(changed))
+        reused = len(new_sentences) - len(changed)
+        record_cache("review_sentence", hits=reused, misses=len(changed))
+
+        if changed:
+            for sentence, verdict in zip(
+                changed, self._review_sentences(changed, original_title)
+            ):
+                self._remember_verdict(sentence_key(sentence), verdict)
+
+        return self._compose_incremental_review(
+            revised_content, new_sentences, previous_review, len(changed), reused
+        )
+
+    def _review_sentences(self, sentences: List[str], original_title: str) -> List[Dict]:
+        """Revisar apenas as sentenças informadas (IA ou regras locais)"""
+        if not self.client:
+            return [self._local_sentence_verdict(s) for s in sentences]
+
+        numbered = "\n".join(f"{i}. {s}" for i, s in enumerate(sentences, 1))
+        prompt = f"""
+MISSÃO: Revisar APENAS as sentenças abaixo, editadas em um post LinkedIn.
+NÃO REESCREVER - apenas apontar problemas (gramática, tom, compliance).
+
+TÍTULO ORIGINAL: {original_title}
+
+SENTENÇAS:
+{numbered}
+
+RESPONDER APENAS EM JSON:
+{{
+  "sentences": [
+    {{
+      "index": número,
+      "issues": ["problemas encontrados, vazio se ok"],
+      "compliance_check": {{
+        "appropriate_tone": true/false,
+        "professional_content": true/false,
+        "no_offensive_language": true/false
+      }}
+    }}
+  ]
+}}
+"""
+
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "Você é um revisor de conteúdo LinkedIn. Revise sem alterar o estilo original.",
+                    },
+                    {"role": "user", "content": prompt},
+                ],
+                max_tokens=min(800, 60 + 80 * len(sentences)),
+                temperature=0.1,
+                **self._json_response_kwargs(),
+            )
+            parsed = extract_json_object(response.choices[0].message.content or "")
+        except Exception as e:
+            print(f"Erro na revisão incremental: {e}")
+            parsed = None
+
+        if not parsed or not isinstance(parsed.get("sentences"), list):
+            # Sem resposta utilizável: regras locais, sem cachear como aprovado pela IA
+            return [self._local_sentence_verdict(s) for s in sentences]
+
+        by_index = {}
+        for item in parsed["sentences"]:
+            if isinstance(item, dict):
+                try:
+                    by_index[int(item.get("index"))] = item
+                except (TypeError, ValueError):
+                    continue
+
+        verdicts = []
+        for i, sentence in enumerate(sentences, 1):
+            item = by_index.get(i)
+            if item is None:
+                verdicts.append(self._local_sentence_verdict(sentence))
+                continue
+            compliance = item.get("compliance_check")
+            compliance = compliance if isinstance(compliance, dict) else {}
+            verdicts.append(
+                {
+                    "issues": _coerce_str_list(item.get("issues")),
+                    "compliance": {
+                        k: False
+                        for k, v in compliance.items()
+                        if not _coerce_bool(v, True)
+                    },
+                    "source": "ai",
+                }
+            )
+        return verdicts
+
+    def _local_sentence_verdict(self, sentence: str) -> Dict:
+        """Veredito local de uma sentença (palavras não recomendadas)"""
+        inappropriate_words = ["spam", "click here", "buy now", "urgent"]
+        found = [w for w in inappropriate_words if w in sentence.lower()]
+        issues = [f"Palavras não recomendadas: {', '.join(found)}"] if found else []
+        return {"issues": issues, "compliance": {}, "source": "local"}
+
+    def _compose_incremental_review(
+        self,
+        content: str,
+        sentences: List[str],
+        previous_review: Dict,
+        changed_count: int,
+        reused_count: int,
+    ) -> Dict:
+        """Montar revisão completa combinando vereditos por sentença"""
+        validation = self.validate_for_linkedin(content)
+
+        issues = []
+        flagged = []
+        compliance = dict(REVIEW_SCHEMA_DEFAULTS["compliance_check"])
+        ai_reviewed = True
+        for sentence in sentences:
+            with self._verdicts_lock:
+                verdict = self.sentence_verdicts.get(sentence_key(sentence), {})
+            ai_reviewed = ai_reviewed and verdict.get("source") == "ai"
+            for issue in verdict.get("issues", []):
+                flagged.append({"sentence": sentence, "issue": issue})
+                if issue not in issues:
+                    issues.append(issue)
+            for key in verdict.get("compliance", {}):
+                compliance[key] = False
+        compliance["linkedin_appropriate"] = (
+            compliance["linkedin_appropriate"] and validation["valid"]
+        )
+
+        issues.extend(validation["errors"] + validation["warnings"])
+        approved = validation["valid"] and not flagged and all(compliance.values())
+
+        char_count = len(content)
+        hashtag_count = content.count("#")
+        suggestions = []
+        if char_count > 1300:
+            suggestions.append(f"Reduza o conteúdo em {char_count - 1300} caracteres")
+        if hashtag_count == 0:
+            suggestions.append("Adicione 3-5 hashtags relevantes")
+
+        return {
+            "approved": approved,
+            "issues": issues,
+            "suggestions": suggestions,
+            "compliance_check": compliance,
+            "quality_metrics": {
+                "character_count": char_count,
+                "hashtag_count": hashtag_count,
+                "emoji_count": sum(1 for char in content if ord(char) > 127),
+                "readability": previous_review.get("quality_metrics", {}).get(
+                    "readability", "medium"
+                ),
+            },
+            "flagged_sentences": flagged,
+            "final_recommendation": "APPROVE" if approved else "REVIEW_NEEDED",
+            "confidence_score": previous_review.get("confidence_score", 0.7)
+            if approved
+            else 0.5,
+            "incremental": {
+                "changed_sentences": changed_count,
+                "reused_sentences": reused_count,
+                "total_sentences": len(sentences),
+            },
+            "reviewed_at": datetime.now().isoformat(),
+            "original_content": content,
+            "word_count": len(content.split()),
+            "char_count": char_count,
+            "review_type": "incremental",
+            "ai_reviewed": ai_reviewed,
+        }
+
+    def _json_response_kwargs(self) -> Dict:
+        """Ativar JSON mode quando o modelo suporta"""
+        if self.model.startswith(JSON_MODE_MODELS):
+            return {"response_format": {"type": "json_object"}}
+        return {}
+
     def _local_review(self, content: str, original_title: str = "") -> Dict:
         """Revisão local sem IA quando OpenAI não está disponível"""
         validation = self.validate_for_linkedin(content)
@@ -148,6 +796,9 @@ RESPONDER APENAS EM JSON:
 
         recommendation = "APPROVE" if approved else "REVIEW_NEEDED"
 
+        # Regras locais: reaproveitadas só enquanto a IA estiver indisponível
+        self._seed_sentence_verdicts(content, {}, "local")
+
         return {
             "approved": approved,
             "issues": issues,
@@ -229,12 +880,20 @@ RESPONDER APENAS EM JSON:
         if compliance_items:
             message += f"\n**🚨 COMPLIANCE:** {', '.join(compliance_items)}\n"
 
+        # Revisão incremental (/edit)
+        incremental = review.get("incremental")
+        if incremental:
+            message += (
+                f"\n**🔁 Revisão incremental:** {incremental['changed_sentences']} "
+                f"sentença(s) revisada(s), {incremental['reused_sentences']} reaproveitada(s)\n"
+            )
+
         # Instruções
         if review["final_recommendation"] == "APPROVE":
             message += "\n**✅ Aprovar publicação:** /approve"
             message += "\n**❌ Cancelar:** /cancel"
         else:
-            message += "\n**📝 Revisar manualmente:** /edit"
+            message += "\n**📝 Revisar manualmente:** /edit <texto revisado>"
             message += "\n**❌ Cancelar:** /cancel"
             message += "\n**🔄 Tentar novamente:** /retry"
 
@@ -302,3 +961,87 @@ RESPONDER APENAS EM JSON:
         except Exception as e:
             print(f"Erro ao salvar review: {e}")
             return ""
+
+
+# Teste local - corpus de respostas malformadas do modelo
+class ReviewBatch:
+    """
+    Junta os rascunhos de um lote de uploads numa única chamada a review_many
+    Cada item entrega o rascunho (review) ou desiste (discard) ao falhar antes
+    da revisão; o lote é revisado quando todos os IDs esperados responderam
+    """
+
+    def __init__(self, reviewer: ContentReviewer, expected: Iterable[str], **options):
+        self.reviewer = reviewer
+        self.options = options  # repassadas a review_many (run_io, limit...)
+        self.waiting = set(expected)
+        self.drafts: Dict[str, str] = {}
+        self.titles: Dict[str, str] = {}
+        self.reviews = asyncio.get_running_loop().create_future()
+        self._task: Optional[asyncio.Task] = None
+
+    async def review(self, draft_id: str, content: str, title: str = "") -> Dict:
+        """Entregar o rascunho e aguardar a revisão do lote"""
+        self.drafts[draft_id] = content
+        self.titles[draft_id] = title
+        self._settle(draft_id)
+        reviews = await asyncio.shield(self.reviews)
+        return reviews[draft_id]
+
+    def discard(self, draft_id: str) -> None:
+        """Item que não chega à revisão (sem efeito depois de review)"""
+        self._settle(draft_id)
+
+    def _settle(self, draft_id: str) -> None:
+        self.waiting.discard(draft_id)
+        if not self.waiting and self.drafts and self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self) -> None:
+        try:
+            reviews = await self.reviewer.review_many(
+                self.drafts, self.titles, **self.options
+            )
+        except Exception as e:
+            self.reviews.set_exception(e)
+        else:
+            self.reviews.set_result(reviews)
+
+
+if __name__ == "__main__":
+    import sys
+
+    malformed_corpus = [
+        '{"approved": true, "issues": [], "final_recommendation": "APPROVE"}',
+        '```json\n{"approved": true, "final_recommendation": "APPROVE"}\n```',
+        '```\n{"approved": false, "issues": ["Tom informal"]}\n```\nEspero ter ajudado!',
+        'Aqui está a revisão:\n{"approved": true, "confidence_score": "0.9"}',
+        '{"approved": "true", "issues": "Hashtag repetida",}',
+        '{"approved": false, "issues": ["Uso de {chaves} no texto"], "suggestions": ["Trocar \\"}\\""]} fim',
+        '{"approved": true, "final_recommendation": "aprovar", "confidence_score": 7}',
+        '{"compliance_check": "ok", "quality_metrics": {"hashtag_count": "4"}}',
+    ]
+    without_json = ["Sem JSON nesta resposta", "```\n```", "{incompleto: "]
+
+    failures = 0
+    for raw in without_json:
+        if extract_json_object(raw) is not None:
+            print(f"❌ JSON inesperado extraído de {raw!r}")
+            failures += 1
+
+    for i, raw in enumerate(malformed_corpus, 1):
+        parsed = extract_json_object(raw)
+        if parsed is None:
+            print(f"{i}. ❌ Nenhum JSON extraído: {raw[:40]!r}")
+            failures += 1
+            continue
+        review = validate_review_schema(parsed)
+        print(
+            f"{i}. ✅ approved={review['approved']} "
+            f"recommendation={review['final_recommendation']} "
+            f"confidence={review['confidence_score']:.2f} issues={review['issues']}"
+        )
+
+    total = len(malformed_corpus) + len(without_json)
+    print(f"\n📊 {total - failures}/{total} casos corretos")
+    sys.exit(1 if failures else 0)
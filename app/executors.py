@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Executors - Execução de trabalho bloqueante fora do event loop
+Pools de threads (I/O, chamadas OpenAI) e processos (parsing BeautifulSoup)
+e monitor de lag do event loop
+"""
+import os
+import time
+import asyncio
+import logging
+import functools
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from .profiler import current_session
+
+# Configurações (variáveis de ambiente)
+PIPELINE_THREAD_WORKERS = int(os.getenv("PIPELINE_THREAD_WORKERS", "8"))
+PIPELINE_PROCESS_WORKERS = int(os.getenv("PIPELINE_PROCESS_WORKERS", "2"))
+EVENT_LOOP_LAG_TARGET_MS = float(os.getenv("EVENT_LOOP_LAG_TARGET_MS", "50"))
+
+# Início dos processos filhos (pool de parsing e worker de publicação)
+# spawn: o bot tem threads (listeners de log, exportador de traces, pools) e um
+# fork copiaria locks presos por elas; "fork" só para scripts de teste
+PROCESS_START_METHOD = os.getenv("PROCESS_START_METHOD", "spawn")
+
+
+def process_context():
+    """Contexto de multiprocessing dos processos filhos do bot"""
+    return multiprocessing.get_context(PROCESS_START_METHOD)
+
+
+class PipelineExecutor:
+    """Camada de execução do pipeline: threads para I/O, processos para CPU"""
+
+    def __init__(
+        self,
+        thread_workers: Optional[int] = None,
+        process_workers: Optional[int] = None,
+    ):
+        self.thread_workers = thread_workers or PIPELINE_THREAD_WORKERS
+        self.process_workers = (
+            PIPELINE_PROCESS_WORKERS if process_workers is None else process_workers
+        )
+
+        self.thread_pool = ThreadPoolExecutor(
+            max_workers=self.thread_workers, thread_name_prefix="pipeline-io"
+        )
+
+        # process_workers=0 desativa o pool de processos (CPU vai para threads)
+        self.process_pool = None
+        if self.process_workers > 0:
+            self.process_pool = ProcessPoolExecutor(
+                max_workers=self.process_workers, mp_context=process_context()
+            )
+            # Criar os workers já na inicialização (o primeiro upload não espera o spawn)
+            for _ in range(self.process_workers):
+                self.process_pool.submit(int)
+
+    async def run_io(self, func: Callable, *args, **kwargs) -> Any:
+        """Executar função bloqueante de I/O (arquivos, HTTP, OpenAI) em thread"""
+        loop = asyncio.get_running_loop()
+        call = functools.partial(func, *args, **kwargs)
+        session = current_session()
+        if session:
+            # Execução armada pelo /profile: cProfile também na thread do pool
+            call = session.wrap(call)
+        return await loop.run_in_executor(self.thread_pool, call)
+
+    async def run_cpu(self, func: Callable, *args) -> Any:
+        """
+        Executar função CPU-bound (parsing HTML) no pool de processos
+        A função e os argumentos precisam ser picklable (funções de módulo)
+        """
+        if not self.process_pool:
+            return await self.run_io(func, *args)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.process_pool, func, *args)
+
+    def process_pids(self) -> List[int]:
+        """PIDs dos workers do pool de processos (instrumentação de memória)"""
+        if not self.process_pool:
+            return []
+        # _processes não é API pública, mas é o único registro dos workers vivos
+        return list(getattr(self.process_pool, "_processes", None) or {})
+
+    def shutdown(self) -> None:
+        """Encerrar pools"""
+        self.thread_pool.shutdown(wait=False, cancel_futures=True)
+        if self.process_pool:
+            self.process_pool.shutdown(wait=False, cancel_futures=True)
+
+
+class EventLoopLagMonitor:
+    """Mede o atraso do event loop (tempo extra até um sleep acordar)"""
+
+    def __init__(
+        self,
+        interval: float = 0.1,
+        target_ms: float = EVENT_LOOP_LAG_TARGET_MS,
+        logger: Optional[logging.Logger] = None,
+        window: int = 600,
+    ):
+        self.interval = interval
+        self.target_ms = target_ms
+        self.logger = logger
+        self.window = window
+        self.samples: List[float] = []
+        self.max_lag_ms = 0.0
+        self.over_target = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Iniciar monitor no event loop atual"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Parar monitor"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (loop.time() - expected) * 1000)
+            self.record(lag_ms)
+
+    def record(self, lag_ms: float) -> None:
+        """Registrar uma amostra de lag"""
+        self.samples.append(lag_ms)
+        if len(self.samples) > self.window:
+            del self.samples[: len(self.samples) - self.window]
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+
+        if lag_ms > self.target_ms:
+            self.over_target += 1
+            if self.logger:
+                self.logger.warning(
+                    f"🐢 Event loop atrasado: {lag_ms:.0f}ms (alvo {self.target_ms:.0f}ms)"
+                )
+
+    def stats(self) -> Dict:
+        """Resumo das amostras recentes"""
+        ordered = sorted(self.samples)
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] if ordered else 0
+        return {
+            "samples": len(ordered),
+            "p99_ms": round(p99, 1),
+            "max_ms": round(self.max_lag_ms, 1),
+            "over_target": self.over_target,
+            "target_ms": self.target_ms,
+        }
+
+
+# Teste local - lag do event loop durante upload de ~10MB
+if __name__ == "__main__":
+    import sys
+    import tempfile
+
+    from app.html_parser import validate_html_file, extract_html_metadata
+
+    paragraph = "<p>" + "Conteúdo de teste para o pipeline do LinkedIn. " * 20 + "</p>\n"
+    body = paragraph * ((9_500_000) // len(paragraph))
+    html = f"<html><head><title>Upload grande</title></head><body><article>{body}</article></body></html>"
+
+    with tempfile.NamedTemporaryFile("w", suffix=".html", delete=False) as f:
+        f.write(html)
+        path = f.name
+
+    async def benchmark() -> Dict:
+        executor = PipelineExecutor()
+        monitor = EventLoopLagMonitor(interval=0.01)
+        monitor.start()
+        await asyncio.sleep(0.1)
+
+        start = time.perf_counter()
+        validation = await executor.run_cpu(validate_html_file, path)
+        metadata = await executor.run_cpu(extract_html_metadata, path)
+        elapsed = time.perf_counter() - start
+
+        await monitor.stop()
+        executor.shutdown()
+
+        print(f"📄 Arquivo: {len(html) / 1024 / 1024:.1f}MB valid={validation['valid']}")
+        print(f"📝 Palavras: {metadata['word_count']} em {elapsed:.1f}s")
+        return monitor.stats()
+
+    try:
+        stats = asyncio.run(benchmark())
+    finally:
+        os.remove(path)
+
+    print(f"⏱️ Lag do event loop: {stats}")
+    if stats["max_ms"] > EVENT_LOOP_LAG_TARGET_MS:
+        print(f"❌ Lag acima do alvo de {EVENT_LOOP_LAG_TARGET_MS:.0f}ms")
+        sys.exit(1)
+    print(f"✅ Lag abaixo do alvo de {EVENT_LOOP_LAG_TARGET_MS:.0f}ms")
@@ -64,109 +64,121 @@ class HTMLParser:
             with open(file_path, "r", encoding="utf-8") as f:
                 html_content = f.read()
 
-            soup = BeautifulSoup(html_content, "html.parser")
-
-            metadata = {
-                "file_path": file_path,
-                "file_size": os.path.getsize(file_path),
-                "extracted_at": datetime.now().isoformat(),
-                "title": "",
-                "description": "",
-                "author": "",
-                "keywords": [],
-                "word_count": 0,
-                "char_count": 0,
-                "images": [],
-                "links": [],
-            }
-
-            # Título
-            title_tag = soup.find("title")
-            if title_tag:
-                metadata["title"] = title_tag.get_text().strip()
-
-            # Meta description
-            desc_tag = soup.find("meta", attrs={"name": "description"})
-            if desc_tag:
-                metadata["description"] = desc_tag.get("content", "").strip()
-
-            # Meta author
-            author_tag = soup.find("meta", attrs={"name": "author"})
-            if author_tag:
-                metadata["author"] = author_tag.get("content", "").strip()
-
-            # Meta keywords
-            keywords_tag = soup.find("meta", attrs={"name": "keywords"})
-            if keywords_tag:
-                keywords = keywords_tag.get("content", "").strip()
-                metadata["keywords"] = [k.strip() for k in keywords.split(",")]
-
-            # H1 como título alternativo
-            if not metadata["title"]:
-                h1_tag = soup.find("h1")
-                if h1_tag:
-                    metadata["title"] = h1_tag.get_text().strip()
-
-            # Contagem básica de texto
-            text = self.extract_text_from_html(file_path)
-            metadata["char_count"] = len(text)
-            metadata["word_count"] = len(text.split())
-
-            # Imagens
-            for img in soup.find_all("img"):
-                img_data = {
-                    "src": img.get("src", ""),
-                    "alt": img.get("alt", ""),
-                    "title": img.get("title", ""),
-                }
-                metadata["images"].append(img_data)
-
-            # Links
-            for link in soup.find_all("a", href=True):
-                link_data = {
-                    "href": link.get("href"),
-                    "text": link.get_text().strip()[:100],  # Limitar texto
-                    "title": link.get("title", ""),
-                }
-                metadata["links"].append(link_data)
-
-            return metadata
+            return self.extract_metadata_from_string(
+                html_content, file_path, os.path.getsize(file_path)
+            )
 
         except Exception as e:
             raise Exception(f"Erro ao extrair metadados: {e}")
 
+    def extract_metadata_from_string(
+        self, html_content: str, file_path: str = "", file_size: int = 0
+    ) -> Dict:
+        """Extrair metadados de HTML em memória (um único parse)"""
+        soup = BeautifulSoup(html_content, "html.parser")
+        metadata = self._metadata_from_soup(soup, file_path, file_size)
+
+        # Contagem básica de texto (depois dos metadados: a extração altera o soup)
+        text = self._text_from_soup(soup)
+        metadata["char_count"] = len(text)
+        metadata["word_count"] = len(text.split())
+        return metadata
+
+    def _metadata_from_soup(
+        self, soup: BeautifulSoup, file_path: str, file_size: int
+    ) -> Dict:
+        metadata = {
+            "file_path": file_path,
+            "file_size": file_size,
+            "extracted_at": datetime.now().isoformat(),
+            "title": "",
+            "description": "",
+            "author": "",
+            "keywords": [],
+            "word_count": 0,
+            "char_count": 0,
+            "images": [],
+            "links": [],
+        }
+
+        # Título
+        title_tag = soup.find("title")
+        if title_tag:
+            metadata["title"] = title_tag.get_text().strip()
+
+        # Meta description
+        desc_tag = soup.find("meta", attrs={"name": "description"})
+        if desc_tag:
+            metadata["description"] = desc_tag.get("content", "").strip()
+
+        # Meta author
+        author_tag = soup.find("meta", attrs={"name": "author"})
+        if author_tag:
+            metadata["author"] = author_tag.get("content", "").strip()
+
+        # Meta keywords
+        keywords_tag = soup.find("meta", attrs={"name": "keywords"})
+        if keywords_tag:
+            keywords = keywords_tag.get("content", "").strip()
+            metadata["keywords"] = [k.strip() for k in keywords.split(",")]
+
+        # H1 como título alternativo
+        if not metadata["title"]:
+            h1_tag = soup.find("h1")
+            if h1_tag:
+                metadata["title"] = h1_tag.get_text().strip()
+
+        # Imagens
+        for img in soup.find_all("img"):
+            img_data = {
+                "src": img.get("src", ""),
+                "alt": img.get("alt", ""),
+                "title": img.get("title", ""),
+            }
+            metadata["images"].append(img_data)
+
+        # Links
+        for link in soup.find_all("a", href=True):
+            link_data = {
+                "href": link.get("href"),
+                "text": link.get_text().strip()[:100],  # Limitar texto
+                "title": link.get("title", ""),
+            }
+            metadata["links"].append(link_data)
+
+        return metadata
+
     def extract_text_from_html(self, file_path: str) -> str:
         """Extrair texto limpo de arquivo HTML"""
         try:
             with open(file_path, "r", encoding="utf-8") as f:
                 html_content = f.read()
 
-            # Parse com BeautifulSoup
-            soup = BeautifulSoup(html_content, "html.parser")
-
-            # Remover elementos indesejados
-            for element in soup(self.exclude_tags):
-                element.decompose()
+            return self._text_from_soup(BeautifulSoup(html_content, "html.parser"))
 
-            # Remover comentários
-            for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
-                comment.extract()
+        except Exception as e:
+            raise Exception(f"Erro ao extrair texto do HTML: {e}")
 
-            # Extrair texto principal - priorizar content areas
-            main_content = self._find_main_content(soup)
+    def _text_from_soup(self, soup: BeautifulSoup) -> str:
+        """Texto limpo a partir do soup (remove elementos do próprio soup)"""
+        # Remover elementos indesejados
+        for element in soup(self.exclude_tags):
+            element.decompose()
 
-            if main_content:
-                text = main_content.get_text()
-            else:
-                text = soup.get_text()
+        # Remover comentários
+        for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
+            comment.extract()
 
-            # Limpar texto
-            text = self._clean_text(text)
+        # Extrair texto principal - priorizar content areas
+        main_content = self._find_main_content(soup)
 
-            return text
+        if main_content:
+            text = main_content.get_text()
+        else:
+            text = soup.get_text()
 
-        except Exception as e:
-            raise Exception(f"Erro ao extrair texto do HTML: {e}")
+        # Limpar texto
+        return self._clean_text(text)
 
     def _find_main_content(self, soup: BeautifulSoup) -> Optional:
         """Encontrar a área principal de conteúdo"""
@@ -287,62 +299,79 @@ class HTMLParser:
                 validation["issues"].append("Arquivo não encontrado")
                 return validation
 
-            # Verificar tamanho do arquivo
-            file_size = os.path.getsize(file_path)
-            validation["stats"]["file_size_bytes"] = file_size
-
-            if file_size == 0:
-                validation["valid"] = False
-                validation["issues"].append("Arquivo vazio")
-                return validation
-
-            if file_size > 10 * 1024 * 1024:  # 10MB
-                validation["valid"] = False
-                validation["issues"].append(
-                    f"Arquivo muito grande: {file_size/1024/1024:.1f}MB"
-                )
-                return validation
+            with open(file_path, "r", encoding="utf-8") as f:
+                content = f.read()
 
-            # Extrair texto e metadados
-            text = self.extract_text_from_html(file_path)
-            metadata = self.extract_metadata(file_path)
-
-            validation["stats"].update(
-                {
-                    "char_count": len(text),
-                    "word_count": len(text.split()),
-                    "title": metadata.get("title", ""),
-                    "has_title": bool(metadata.get("title")),
-                    "images_count": len(metadata.get("images", [])),
-                    "links_count": len(metadata.get("links", [])),
-                }
+            validation, _ = self.analyze_html(
+                content, os.path.getsize(file_path), file_path
             )
 
-            # Validações de conteúdo
-            if len(text.strip()) < 50:
-                validation["valid"] = False
-                validation["issues"].append(
-                    f"Conteúdo muito curto: {len(text)} caracteres"
-                )
+        except Exception as e:
+            validation["valid"] = False
+            validation["issues"].append(f"Erro na validação: {e}")
 
-            if len(text.split()) < 10:
-                validation["warnings"].append(f"Poucas palavras: {len(text.split())}")
+        return validation
 
-            if not metadata.get("title"):
-                validation["warnings"].append("Título não encontrado")
+    def analyze_html(
+        self, content: str, file_size: int, file_path: str = ""
+    ) -> Tuple[Dict, Dict]:
+        """
+        Validar e extrair metadados de HTML em memória com um único parse
+        Retorna (validation, metadata)
+        """
+        validation = {"valid": True, "issues": [], "warnings": [], "stats": {}}
+        validation["stats"]["file_size_bytes"] = file_size
 
-            # Verificar se é HTML válido
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
+        if file_size == 0:
+            validation["valid"] = False
+            validation["issues"].append("Arquivo vazio")
+            return validation, {}
 
-            if "<html" not in content.lower() and "<body" not in content.lower():
-                validation["warnings"].append("Estrutura HTML básica não detectada")
+        if file_size > 10 * 1024 * 1024:  # 10MB
+            validation["valid"] = False
+            validation["issues"].append(
+                f"Arquivo muito grande: {file_size/1024/1024:.1f}MB"
+            )
+            return validation, {}
 
+        try:
+            # Extrair metadados e texto
+            metadata = self.extract_metadata_from_string(content, file_path, file_size)
         except Exception as e:
             validation["valid"] = False
             validation["issues"].append(f"Erro na validação: {e}")
+            return validation, {}
+
+        char_count = metadata["char_count"]
+        word_count = metadata["word_count"]
+        validation["stats"].update(
+            {
+                "char_count": char_count,
+                "word_count": word_count,
+                "title": metadata.get("title", ""),
+                "has_title": bool(metadata.get("title")),
+                "images_count": len(metadata.get("images", [])),
+                "links_count": len(metadata.get("links", [])),
+            }
+        )
 
-        return validation
+        # Validações de conteúdo
+        if char_count < 50:
+            validation["valid"] = False
+            validation["issues"].append(f"Conteúdo muito curto: {char_count} caracteres")
+
+        if word_count < 10:
+            validation["warnings"].append(f"Poucas palavras: {word_count}")
+
+        if not metadata.get("title"):
+            validation["warnings"].append("Título não encontrado")
+
+        # Verificar se é HTML válido
+        lowered = content.lower()
+        if "<html" not in lowered and "<body" not in lowered:
+            validation["warnings"].append("Estrutura HTML básica não detectada")
+
+        return validation, metadata
 
 
 # Funções de conveniência
@@ -360,6 +389,31 @@ def validate_html_file(file_path: str) -> Dict:
     return parser.validate_html_content(file_path)
 
 
+def extract_html_metadata(file_path: str) -> Dict:
+    """Função helper para extrair metadados (picklable, usada no pool de processos)"""
+    parser = HTMLParser()
+    return parser.extract_metadata(file_path)
+
+
+def analyze_html_bytes(data: bytes, file_path: str = "") -> Tuple[Dict, Dict]:
+    """
+    Função helper para validar e extrair metadados de um upload em memória
+    (picklable, usada no pool de processos); retorna (validation, metadata)
+    """
+    parser = HTMLParser()
+    try:
+        content = data.decode("utf-8")
+    except UnicodeDecodeError as e:
+        validation = {
+            "valid": False,
+            "issues": [f"Arquivo não está em UTF-8: {e}"],
+            "warnings": [],
+            "stats": {"file_size_bytes": len(data)},
+        }
+        return validation, {}
+    return parser.analyze_html(content, len(data), file_path)
+
+
 def create_filename_slug(title: str) -> str:
     """Função helper para criar slug de arquivo"""
     parser = HTMLParser()
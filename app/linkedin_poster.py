@@ -5,14 +5,20 @@ Funciona tanto localmente quanto no Docker com observabilidade completa
 """
 import os
 import time
+import queue
 import uuid
 import logging
 import csv
 import json
-import requests
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
-from logging.handlers import RotatingFileHandler
+from logging.handlers import (
+    BaseRotatingHandler,
+    QueueHandler,
+    QueueListener,
+    TimedRotatingFileHandler,
+)
+import atexit
 
 from dotenv import load_dotenv
 from selenium import webdriver
@@ -29,16 +35,46 @@ from selenium.common.exceptions import (
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
 
+try:
+    from .audit_log import AUDIT_DB_FILENAME, AuditLog
+    from .audit_writer import AuditWriter
+    from .alerts import AlertDispatcher
+except ImportError:  # executado como script (python3 app/linkedin_poster.py)
+    from audit_log import AUDIT_DB_FILENAME, AuditLog
+    from audit_writer import AuditWriter
+    from alerts import AlertDispatcher
+
 
 # === Configurações de Observabilidade ===
 class ObservabilityManager:
     """Gerenciador de observabilidade com logs CSV e alertas"""
 
+    CSV_HEADERS = [
+        "timestamp",
+        "execution_id",
+        "action",
+        "success",
+        "post_text",
+        "current_url",
+        "error_type",
+        "error_msg",
+        "screenshot_path",
+        "duration_ms",
+    ]
+
     def __init__(self, log_dir: str):
         self.log_dir = log_dir
         self.csv_log_file = os.path.join(log_dir, "linkedin_audit.csv")
         self.ensure_log_directory()
         self.ensure_csv_headers()
+        # Auditoria completa e indexada (o CSV fica como resumo legível)
+        self.audit = AuditLog(
+            os.getenv("AUDIT_DB_PATH", os.path.join(log_dir, AUDIT_DB_FILENAME))
+        )
+        # Eventos gravados em lote por uma thread (fora de login/publish_post)
+        self.writer = AuditWriter(self.csv_log_file, self.CSV_HEADERS, self.audit)
+        # Alertas em segundo plano (canais lidos do .env no primeiro alerta)
+        self.alerts = AlertDispatcher()
 
     def ensure_log_directory(self) -> None:
         """Garante que o diretório de logs existe"""
@@ -49,20 +85,7 @@ class ObservabilityManager:
         if not os.path.exists(self.csv_log_file):
             with open(self.csv_log_file, "w", newline="", encoding="utf-8") as f:
                 writer = csv.writer(f)
-                writer.writerow(
-                    [
-                        "timestamp",
-                        "execution_id",
-                        "action",
-                        "success",
-                        "post_text",
-                        "current_url",
-                        "error_type",
-                        "error_msg",
-                        "screenshot_path",
-                        "duration_ms",
-                    ]
-                )
+                writer.writerow(self.CSV_HEADERS)
 
     def log_csv_event(
         self,
@@ -76,110 +99,184 @@ class ObservabilityManager:
         screenshot_path: str = "",
         duration_ms: int = 0,
     ) -> None:
-        """Registra evento no log CSV para auditoria"""
+        """
+        Registra evento no log CSV e na auditoria estruturada
+        Só enfileira: a gravação acontece em lote na thread do AuditWriter
+        """
+        timestamp = datetime.now().isoformat()
+        row = [
+            timestamp,
+            execution_id,
+            action,
+            success,
+            post_text[:100] + "..." if len(post_text) > 100 else post_text,
+            current_url,
+            error_type,
+            error_msg[:200] + "..." if len(error_msg) > 200 else error_msg,
+            screenshot_path,
+            duration_ms,
+        ]
+        event = {
+            "timestamp": timestamp,
+            "execution_id": execution_id,
+            "action": action,
+            "success": success,
+            "post_text": post_text,
+            "current_url": current_url,
+            "error_type": error_type,
+            "error_msg": error_msg,
+            "screenshot_path": screenshot_path,
+            "duration_ms": duration_ms,
+        }
         try:
-            with open(self.csv_log_file, "a", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerow(
-                    [
-                        datetime.now().isoformat(),
-                        execution_id,
-                        action,
-                        success,
-                        post_text[:100] + "..." if len(post_text) > 100 else post_text,
-                        current_url,
-                        error_type,
-                        error_msg[:200] + "..." if len(error_msg) > 200 else error_msg,
-                        screenshot_path,
-                        duration_ms,
-                    ]
-                )
+            self.writer.append(row, event)
         except Exception as e:
-            logger.error(f"❌ Erro ao escrever log CSV: {e}")
+            logger.error(f"❌ Erro ao enfileirar evento de auditoria: {e}")
+
+    def flush_audit(self) -> None:
+        """Gravar agora os eventos pendentes (ex: antes de responder ao bot)"""
+        self.writer.flush()
 
     def send_telegram_alert(self, message: str) -> bool:
-        """Envia alerta para Telegram"""
-        token = os.getenv("TELEGRAM_BOT_TOKEN")
-        chat_id = os.getenv("TELEGRAM_CHAT_ID")
+        """Envia alerta para Telegram (só enfileira no AlertDispatcher)"""
+        return self.alerts.submit(message, channel="telegram")
 
-        if not token or not chat_id:
-            logger.warning(
-                "⚠️ Telegram não configurado (TELEGRAM_BOT_TOKEN/TELEGRAM_CHAT_ID)"
-            )
-            return False
+    def send_discord_alert(self, message: str) -> bool:
+        """Envia alerta para Discord (só enfileira no AlertDispatcher)"""
+        return self.alerts.submit(message, channel="discord")
 
-        try:
-            url = f"https://api.telegram.org/bot{token}/sendMessage"
-            payload = {
-                "chat_id": chat_id,
-                "text": f"🚨 LinkedIn Bot Alert\n\n{message}",
-                "parse_mode": "Markdown",
-            }
-
-            response = requests.post(url, json=payload, timeout=10)
-            if response.status_code == 200:
-                logger.info("✅ Alerta Telegram enviado com sucesso")
-                return True
-            else:
-                logger.error(
-                    f"❌ Falha Telegram: {response.status_code} - {response.text}"
-                )
-                return False
+    def send_alert(
+        self,
+        error_type: str,
+        error_msg: str,
+        url: str = "",
+        screenshot: str = "",
+        step: str = "",
+    ) -> None:
+        """
+        Envia alertas para todos os canais configurados
+        Só enfileira: o envio (paralelo entre canais) roda nas threads do
+        AlertDispatcher, sem atrasar a limpeza/retry de login e publish_post.
+        Repetições do mesmo erro na mesma etapa (step) viram um resumo
+        """
+        self.alerts.alert(error_type, error_msg, step, url, screenshot)
 
-        except Exception as e:
-            logger.error(f"❌ Erro ao enviar Telegram: {e}")
-            return False
+    def shutdown(self) -> None:
+        """Gravar auditoria pendente e entregar alertas na fila (fim do processo)"""
+        self.writer.close()
+        self.alerts.close()
 
-    def send_discord_alert(self, message: str) -> bool:
-        """Envia alerta para Discord"""
-        webhook_url = os.getenv("DISCORD_WEBHOOK_URL")
 
-        if not webhook_url:
-            logger.warning("⚠️ Discord não configurado (DISCORD_WEBHOOK_URL)")
-            return False
+# === Configuração de Logging ===
+# Dias de logs rotacionados mantidos (poster.log.YYYY-MM-DD)
+LOG_BACKUP_DAYS = int(os.getenv("LOG_BACKUP_DAYS", "14"))
 
-        try:
-            payload = {
-                "content": f"🚨 **LinkedIn Bot Alert**\n\n{message}",
-                "username": "LinkedIn Bot",
-            }
-
-            response = requests.post(webhook_url, json=payload, timeout=10)
-            if response.status_code == 204:
-                logger.info("✅ Alerta Discord enviado com sucesso")
-                return True
-            else:
-                logger.error(
-                    f"❌ Falha Discord: {response.status_code} - {response.text}"
-                )
-                return False
+# Loggers servidos por QueueListener: [(logger, queue_handler, listener, handlers, pid)]
+_queue_loggers: List[tuple] = []
 
-        except Exception as e:
-            logger.error(f"❌ Erro ao enviar Discord: {e}")
-            return False
 
-    def send_alert(
-        self, error_type: str, error_msg: str, url: str = "", screenshot: str = ""
-    ) -> None:
-        """Envia alertas para todos os canais configurados"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+class DailyFileHandler(BaseRotatingHandler):
+    """
+    Arquivo por data (diretório/YYYY-MM-DD.log) trocado à meia-noite sem
+    renomear nada, então vários processos podem escrever no mesmo diretório
+    """
 
-        message = f"""
-**Erro**: {error_type}
-**Mensagem**: {error_msg}
-**URL**: {url}
-**Screenshot**: {screenshot}
-**Timestamp**: {timestamp}
-        """.strip()
+    def __init__(self, directory: str, encoding: str = "utf-8"):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        super().__init__(self._path(), "a", encoding=encoding, delay=True)
+        self.rollover_at = self._next_midnight()
 
-        # Tentar Telegram
-        self.send_telegram_alert(message)
+    def _today(self) -> str:
+        return datetime.now().strftime("%Y-%m-%d")
 
-        # Tentar Discord
-        self.send_discord_alert(message)
+    def _path(self) -> str:
+        return os.path.abspath(os.path.join(self.directory, f"{self._today()}.log"))
+
+    def _next_midnight(self) -> float:
+        tomorrow = datetime.now() + timedelta(days=1)
+        return tomorrow.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        return record.created >= self.rollover_at
+
+    def doRollover(self) -> None:
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        self.baseFilename = self._path()
+        self.rollover_at = self._next_midnight()
+
+
+class MidnightRotatingFileHandler(TimedRotatingFileHandler):
+    """
+    Rotação à meia-noite tolerante a outro processo (worker de publicação)
+    já ter rotacionado o mesmo arquivo: nesse caso só reabre
+    """
+
+    def __init__(self, filename: str, backup_count: int = LOG_BACKUP_DAYS):
+        super().__init__(
+            filename, when="midnight", backupCount=backup_count, encoding="utf-8", delay=True
+        )
+
+    def doRollover(self) -> None:
+        t = self.rolloverAt - self.interval
+        rotated = self.rotation_filename(
+            self.baseFilename + "." + time.strftime(self.suffix, time.localtime(t))
+        )
+        if os.path.exists(rotated):
+            # Já rotacionado por outro processo: não apagar, só reabrir
+            if self.stream:
+                self.stream.close()
+                self.stream = None
+            self.rolloverAt = self.computeRollover(time.time())
+            return
+        super().doRollover()
+
+
+def start_queue_logging(logger: logging.Logger, *handlers: logging.Handler) -> QueueListener:
+    """
+    Trocar os handlers do logger por um QueueHandler: a chamada de log só
+    enfileira o registro e a escrita em arquivo/console acontece na thread
+    do QueueListener (fora do event loop)
+    """
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    logger.addHandler(queue_handler)
+    listener.start()
+    _queue_loggers.append((logger, queue_handler, listener, handlers, os.getpid()))
+    return listener
+
+
+def stop_queue_logging(logger: Optional[logging.Logger] = None) -> None:
+    """Esvaziar as filas de log e parar os listeners (todos, ou só os do logger)"""
+    for entry in list(_queue_loggers):
+        if logger is None or entry[0] is logger:
+            _queue_loggers.remove(entry)
+            entry[0].removeHandler(entry[1])
+            entry[2].stop()
+
+
+def use_direct_logging() -> None:
+    """
+    Voltar a escrever direto nos handlers, sem a thread do listener
+    Processos filhos: no fork a thread não é herdada, e no worker de publicação
+    (sem event loop) a saída via os._exit perderia registros ainda na fila
+    """
+    for logger, queue_handler, listener, handlers, pid in _queue_loggers:
+        logger.removeHandler(queue_handler)
+        if pid == os.getpid():
+            listener.stop()  # thread deste processo: esvaziar a fila antes
+        for handler in handlers:
+            logger.addHandler(handler)
+    _queue_loggers.clear()
+
+
+atexit.register(stop_queue_logging)
+os.register_at_fork(after_in_child=use_direct_logging)
 
 
-# === Configuração de Logging ===
 def setup_logging() -> logging.Logger:
     """Configura sistema de logging profissional"""
     # Criar diretório de logs
@@ -194,10 +291,8 @@ def setup_logging() -> logging.Logger:
     if logger.handlers:
         return logger
 
-    # Handler para arquivo com rotação
-    file_handler = RotatingFileHandler(
-        f"{log_dir}/poster.log", maxBytes=5 * 1024 * 1024, backupCount=3  # 5MB
-    )
+    # Handler para arquivo com rotação à meia-noite
+    file_handler = MidnightRotatingFileHandler(f"{log_dir}/poster.log")
     file_handler.setLevel(logging.INFO)
 
     # Handler para console
@@ -215,8 +310,8 @@ def setup_logging() -> logging.Logger:
     file_handler.setFormatter(file_formatter)
     console_handler.setFormatter(console_formatter)
 
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # Escrita em thread dedicada
+    start_queue_logging(logger, file_handler, console_handler)
 
     return logger
 
@@ -579,7 +674,11 @@ def login(driver: webdriver.Remote, execution_id: str) -> None:
 
             # Enviar alerta
             observability.send_alert(
-                "Verificação Adicional", error_msg, current_url, screenshot_path
+                "Verificação Adicional",
+                error_msg,
+                current_url,
+                screenshot_path,
+                step="login",
             )
 
             raise Exception(error_msg)
@@ -628,7 +727,11 @@ def login(driver: webdriver.Remote, execution_id: str) -> None:
 
                 # Enviar alerta
                 observability.send_alert(
-                    "Falha no Login", error_msg, current_url, screenshot_path
+                    "Falha no Login",
+                    error_msg,
+                    current_url,
+                    screenshot_path,
+                    step="login",
                 )
 
                 raise Exception(error_msg)
@@ -654,7 +757,11 @@ def login(driver: webdriver.Remote, execution_id: str) -> None:
 
         # Enviar alerta
         observability.send_alert(
-            "Timeout no Login", str(e), driver.current_url, screenshot_path
+            "Timeout no Login",
+            str(e),
+            driver.current_url,
+            screenshot_path,
+            step="login",
         )
 
         raise
@@ -679,7 +786,11 @@ def login(driver: webdriver.Remote, execution_id: str) -> None:
 
         # Enviar alerta
         observability.send_alert(
-            "Elemento Não Encontrado", str(e), driver.current_url, screenshot_path
+            "Elemento Não Encontrado",
+            str(e),
+            driver.current_url,
+            screenshot_path,
+            step="login",
         )
 
         raise
@@ -704,7 +815,7 @@ def login(driver: webdriver.Remote, execution_id: str) -> None:
 
         # Enviar alerta
         observability.send_alert(
-            "Erro WebDriver", str(e), driver.current_url, screenshot_path
+            "Erro WebDriver", str(e), driver.current_url, screenshot_path, step="login"
         )
 
         raise
@@ -808,6 +919,7 @@ def publish_post(driver: webdriver.Remote, text: str, execution_id: str) -> None
                     error_msg,
                     driver.current_url,
                     screenshot_path,
+                    step="publish_post",
                 )
 
                 raise NoSuchElementException(error_msg)
@@ -833,7 +945,11 @@ def publish_post(driver: webdriver.Remote, text: str, execution_id: str) -> None
 
             # Enviar alerta
             observability.send_alert(
-                "Erro ao Clicar", error_msg, driver.current_url, screenshot_path
+                "Erro ao Clicar",
+                error_msg,
+                driver.current_url,
+                screenshot_path,
+                step="publish_post",
             )
 
             raise WebDriverException(error_msg)
@@ -891,6 +1007,7 @@ def publish_post(driver: webdriver.Remote, text: str, execution_id: str) -> None
                 error_msg,
                 driver.current_url,
                 screenshot_path,
+                step="publish_post",
             )
 
             raise NoSuchElementException(error_msg)
@@ -973,6 +1090,7 @@ def publish_post(driver: webdriver.Remote, text: str, execution_id: str) -> None
                 error_msg,
                 driver.current_url,
                 screenshot_path,
+                step="publish_post",
             )
 
             raise NoSuchElementException(error_msg)
@@ -1001,7 +1119,11 @@ def publish_post(driver: webdriver.Remote, text: str, execution_id: str) -> None
 
             # Enviar alerta
             observability.send_alert(
-                "Erro ao Publicar", error_msg, driver.current_url, screenshot_path
+                "Erro ao Publicar",
+                error_msg,
+                driver.current_url,
+                screenshot_path,
+                step="publish_post",
             )
 
             raise WebDriverException(error_msg)
@@ -1073,7 +1195,11 @@ def publish_post(driver: webdriver.Remote, text: str, execution_id: str) -> None
 
         # Enviar alerta
         observability.send_alert(
-            "Timeout na Publicação", str(e), driver.current_url, screenshot_path
+            "Timeout na Publicação",
+            str(e),
+            driver.current_url,
+            screenshot_path,
+            step="publish_post",
         )
 
         raise
@@ -1098,7 +1224,11 @@ def publish_post(driver: webdriver.Remote, text: str, execution_id: str) -> None
 
         # Enviar alerta
         observability.send_alert(
-            "Elemento Não Encontrado", str(e), driver.current_url, screenshot_path
+            "Elemento Não Encontrado",
+            str(e),
+            driver.current_url,
+            screenshot_path,
+            step="publish_post",
         )
 
         raise
@@ -1123,7 +1253,11 @@ def publish_post(driver: webdriver.Remote, text: str, execution_id: str) -> None
 
         # Enviar alerta
         observability.send_alert(
-            "Erro WebDriver", str(e), driver.current_url, screenshot_path
+            "Erro WebDriver",
+            str(e),
+            driver.current_url,
+            screenshot_path,
+            step="publish_post",
         )
 
         raise
@@ -1197,9 +1331,10 @@ if __name__ == "__main__":
         )
 
         # Enviar alerta de erro geral
-        observability.send_alert("Erro Geral", str(e), current_url)
+        observability.send_alert("Erro Geral", str(e), current_url, step="main")
 
     finally:
         if driver:
             driver.quit()
+        observability.shutdown()
         logger.info("🏁 Execução finalizada")
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Memory - Instrumentação de memória do bot (processo de longa duração)
+Uma thread tira amostras periódicas: RSS do bot e de toda a árvore de
+processos filhos (worker de publicação, chromedriver/Chromium, pool de
+parsing) lido de /proc, contagem de objetos por tipo e, com tracemalloc
+ligado, o top de crescimento por linha de código entre amostras. Cada
+amostra vai para logs/memory.jsonl, então dá para comparar semanas de uptime
+
+Consulta: /memory no bot
+          python -m app.memory [dias]   # crescimento registrado em memory.jsonl
+"""
+import gc
+import os
+import json
+import time
+import logging
+import threading
+import tracemalloc
+from collections import Counter, deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Logger do linkedin_poster sem importar o módulo (Selenium)
+logger = logging.getLogger("linkedin_poster")
+
+# Mesmo diretório dos logs do linkedin_poster
+LOG_DIR = "/logs" if os.path.exists("/.dockerenv") else "logs"
+MEMORY_LOG_FILE = os.getenv("MEMORY_LOG_FILE", os.path.join(LOG_DIR, "memory.jsonl"))
+
+# Intervalo entre amostras (segundos; 0 desliga a thread)
+MEMORY_MONITOR_INTERVAL = float(os.getenv("MEMORY_MONITOR_INTERVAL", "300"))
+
+# tracemalloc desde a inicialização (custo em toda alocação; também via /memory trace on)
+MEMORY_TRACEMALLOC = os.getenv("MEMORY_TRACEMALLOC", "false").lower() == "true"
+MEMORY_TRACEMALLOC_FRAMES = int(os.getenv("MEMORY_TRACEMALLOC_FRAMES", "1"))
+
+# Linhas no top de crescimento
+MEMORY_TOP_N = int(os.getenv("MEMORY_TOP_N", "10"))
+
+# Aviso no log a cada MEMORY_GROWTH_WARN_MB de crescimento do RSS do bot
+MEMORY_GROWTH_WARN_MB = float(os.getenv("MEMORY_GROWTH_WARN_MB", "100"))
+
+# Amostras mantidas em memória para o /memory (1 dia com o intervalo padrão)
+HISTORY_SIZE = 288
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# Alocações do próprio tracemalloc, deste monitor e de imports não são vazamento
+TRACE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+Growth = Tuple[str, int, int]  # (local/tipo, Δ bytes ou Δ objetos, total)
+
+
+def _read_stat(pid: int) -> Optional[Tuple[str, int, int]]:
+    """(comm, ppid, rss em bytes) de /proc/<pid>; None se o processo sumiu"""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read().decode("utf-8", "replace")
+        with open(f"/proc/{pid}/statm", "rb") as f:
+            rss_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    # comm fica entre parênteses e pode conter espaços
+    comm = stat[stat.index("(") + 1 : stat.rindex(")")]
+    ppid = int(stat[stat.rindex(")") + 2 :].split()[1])
+    return comm, ppid, rss_pages * PAGE_SIZE
+
+
+def process_tree(
+    root: Optional[int] = None, roles: Optional[Dict[int, str]] = None
+) -> List[Dict]:
+    """
+    Processo `root` e todos os descendentes com RSS (Linux, via /proc)
+    roles: papéis conhecidos por pid; descendentes sem papel do worker de
+    publicação são o navegador (chromedriver, Chromium e seus filhos)
+    """
+    root = root or os.getpid()
+    roles = dict(roles or {})
+    roles.setdefault(root, "bot")
+    if not os.path.isdir("/proc"):
+        return []
+
+    stats: Dict[int, Tuple[str, int, int]] = {}
+    children: Dict[int, List[int]] = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        stat = _read_stat(int(name))
+        if stat:
+            stats[int(name)] = stat
+            children.setdefault(stat[1], []).append(int(name))
+
+    if root not in stats:
+        return []
+
+    tree = []
+    pending = [(root, None)]
+    while pending:
+        pid, parent_role = pending.pop()
+        comm, ppid, rss = stats[pid]
+        role = roles.get(pid)
+        if role is None:
+            browser = parent_role in ("publisher_worker", "browser")
+            role = "browser" if browser else comm
+        tree.append({"pid": pid, "ppid": ppid, "name": comm, "role": role, "rss": rss})
+        pending.extend((child, role) for child in children.get(pid, []))
+    return tree
+
+
+def rss_by_role(tree: List[Dict]) -> Dict[str, int]:
+    """RSS somado por papel (bot, publisher_worker, browser, parser_pool, ...)"""
+    totals: Dict[str, int] = {}
+    for process in tree:
+        totals[process["role"]] = totals.get(process["role"], 0) + process["rss"]
+    return totals
+
+
+def type_counts() -> Counter:
+    """Objetos rastreados pelo gc por tipo (BeautifulSoup, Tag, dict, ...)"""
+    return Counter(type(obj).__name__ for obj in gc.get_objects())
+
+
+def format_bytes(size: float) -> str:
+    sign = "-" if size < 0 else ""
+    size = abs(size)
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{sign}{size:.0f}{unit}" if unit == "B" else f"{sign}{size:.1f}{unit}"
+        size /= 1024
+    return f"{sign}{size:.2f}GB"
+
+
+class MemoryMonitor:
+    """Amostras periódicas de RSS, tipos de objeto e tracemalloc"""
+
+    def __init__(
+        self,
+        interval: float = MEMORY_MONITOR_INTERVAL,
+        roles: Optional[Callable[[], Dict[int, str]]] = None,
+        log_file: Optional[str] = MEMORY_LOG_FILE,
+        top_n: int = MEMORY_TOP_N,
+        trace: bool = MEMORY_TRACEMALLOC,
+        warn_mb: float = MEMORY_GROWTH_WARN_MB,
+    ):
+        self.interval = interval
+        self.roles = roles or dict
+        self.log_file = log_file
+        self.top_n = top_n
+        self.warn_mb = warn_mb
+        self.history: deque = deque(maxlen=HISTORY_SIZE)
+        self.baseline: Optional[Dict] = None
+        self.last_growth: List[Growth] = []  # tracemalloc: vs. amostra anterior
+        self.total_growth: List[Growth] = []  # tracemalloc: vs. início do trace
+        self.type_growth: List[Growth] = []
+        self._warned = 0
+        self._types: Optional[Counter] = None
+        self._trace_baseline: Optional[tracemalloc.Snapshot] = None
+        self._trace_previous: Optional[tracemalloc.Snapshot] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if trace:
+            self.start_tracing()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start_tracing(self, frames: int = MEMORY_TRACEMALLOC_FRAMES) -> None:
+        """Ligar tracemalloc; o crescimento conta a partir daqui"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            logger.info(f"🔍 tracemalloc ligado ({frames} frame(s) por alocação)")
+        with self._lock:
+            self._trace_baseline = self._trace_previous = self._take_trace()
+
+    def stop_tracing(self) -> None:
+        with self._lock:
+            self._trace_baseline = self._trace_previous = None
+            self.last_growth, self.total_growth = [], []
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            logger.info("🔍 tracemalloc desligado")
+
+    def start(self) -> None:
+        """Iniciar thread de amostragem (primeira amostra é a linha de base)"""
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="memory-monitor", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.sample()
+            except Exception as e:
+                logger.warning(f"⚠️ Falha na amostra de memória: {e}")
+            if self._stop.wait(self.interval):
+                break
+
+    def _take_trace(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(TRACE_FILTERS)
+
+    def _trace_growth(self, snapshot, previous) -> List[Growth]:
+        growth = []
+        for stat in snapshot.compare_to(previous, "lineno")[: self.top_n * 2]:
+            if stat.size_diff <= 0:
+                continue
+            frame = stat.traceback[0]
+            growth.append((f"{frame.filename}:{frame.lineno}", stat.size_diff, stat.size))
+        return growth[: self.top_n]
+
+    def rss(self) -> Dict[str, int]:
+        """RSS atual por papel (lido na hora; usado pelo /metrics)"""
+        return rss_by_role(process_tree(roles=self.roles()))
+
+    def sample(self) -> Dict:
+        """Tirar uma amostra agora (thread do monitor ou /memory diff)"""
+        with self._lock:
+            tree = process_tree(roles=self.roles())
+            totals = rss_by_role(tree)
+
+            types = type_counts()
+            if self._types is not None:
+                self.type_growth = [
+                    (name, delta, types[name])
+                    for name, delta in (types - self._types).most_common(self.top_n)
+                ]
+            self._types = types
+
+            traced = None
+            if tracemalloc.is_tracing() and self._trace_baseline is not None:
+                snapshot = self._take_trace()
+                self.last_growth = self._trace_growth(snapshot, self._trace_previous)
+                self.total_growth = self._trace_growth(snapshot, self._trace_baseline)
+                self._trace_previous = snapshot
+                traced = tracemalloc.get_traced_memory()[0]
+
+            sample = {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "rss": totals,
+                "processes": len(tree),
+                "objects": sum(types.values()),
+                "traced": traced,
+                "type_growth": self.type_growth,
+                "trace_growth": self.last_growth,
+            }
+            self.history.append(sample)
+            if self.baseline is None:
+                self.baseline = sample
+
+        self._report(sample)
+        return sample
+
+    def _report(self, sample: Dict) -> None:
+        bot = sample["rss"].get("bot", 0)
+        total = sum(sample["rss"].values())
+        grown = bot - self.baseline["rss"].get("bot", 0)
+        logger.info(
+            f"🧠 Memória: bot {format_bytes(bot)} ({format_bytes(grown)} desde o início), "
+            f"árvore {format_bytes(total)} em {sample['processes']} processos"
+        )
+
+        # Um aviso por faixa de crescimento, não a cada amostra
+        if self.warn_mb > 0:
+            level = int(grown / (self.warn_mb * 1024 * 1024))
+            if level > self._warned:
+                self._warned = level
+                top = ", ".join(
+                    f"{name} +{delta}" for name, delta, _ in sample["type_growth"][:3]
+                )
+                logger.warning(
+                    f"📈 RSS do bot cresceu {format_bytes(grown)} desde o início"
+                    + (f" (objetos: {top})" if top else "")
+                )
+
+        if self.log_file:
+            try:
+                os.makedirs(os.path.dirname(self.log_file) or ".", exist_ok=True)
+                with open(self.log_file, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(sample, ensure_ascii=False) + "\n")
+            except OSError as e:
+                logger.warning(f"⚠️ Falha ao gravar {self.log_file}: {e}")
+
+    def summary(self) -> Dict:
+        """Estado para o /memory: RSS atual, crescimento e tops"""
+        tree = process_tree(roles=self.roles())
+        with self._lock:
+            baseline = self.baseline
+            history = list(self.history)
+            return {
+                "tree": tree,
+                "rss": rss_by_role(tree),
+                "baseline": baseline,
+                "samples": len(history),
+                "peak_bot": max((s["rss"].get("bot", 0) for s in history), default=0),
+                "type_growth": list(self.type_growth),
+                "trace_growth": list(self.last_growth),
+                "trace_total_growth": list(self.total_growth),
+                "traced": tracemalloc.get_traced_memory() if self.tracing else None,
+            }
+
+
+def load_samples(path: str = MEMORY_LOG_FILE, days: float = 7) -> List[Dict]:
+    """Amostras de memory.jsonl nos últimos `days` dias"""
+    if not os.path.exists(path):
+        return []
+    since = datetime.fromtimestamp(time.time() - days * 86400).isoformat()
+    samples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                sample = json.loads(line)
+            except ValueError:
+                continue
+            if sample.get("timestamp", "") >= since:
+                samples.append(sample)
+    return samples
+
+
+# Teste local
+if __name__ == "__main__":
+    import sys
+    import subprocess
+    import tempfile
+
+    if len(sys.argv) > 1:
+        days = float(sys.argv[1])
+        samples = load_samples(days=days)
+        if not samples:
+            print(f"❌ Nenhuma amostra em {MEMORY_LOG_FILE}")
+            sys.exit(1)
+        first, last = samples[0], samples[-1]
+        print(f"🧠 {len(samples)} amostras ({first['timestamp']} → {last['timestamp']})")
+        for role in sorted(set(first["rss"]) | set(last["rss"])):
+            before, after = first["rss"].get(role, 0), last["rss"].get(role, 0)
+            print(
+                f"  {role:<18} {format_bytes(before):>10} → {format_bytes(after):>10} "
+                f"({format_bytes(after - before)})"
+            )
+        sys.exit(0)
+
+    NODE = json.dumps("x" * 1024)
+
+    class FakeSoup:
+        """Árvore por upload que ninguém libera"""
+
+        def __init__(self):
+            # Alocado dentro de uma biblioteca (como o parser do BeautifulSoup)
+            self.nodes = [json.loads(NODE) for _ in range(50)]
+
+    leaked = []
+    # Filho com ~30MB residentes no papel do worker de publicação
+    child = subprocess.Popen(
+        [sys.executable, "-c", "import time; x = bytearray(30 * 2**20); time.sleep(30)"]
+    )
+    time.sleep(0.5)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            log_file = os.path.join(tmp, "memory.jsonl")
+            monitor = MemoryMonitor(
+                interval=0,
+                roles=lambda: {child.pid: "publisher_worker"},
+                log_file=log_file,
+                trace=True,
+            )
+            monitor.sample()
+            for _ in range(200):
+                leaked.append(FakeSoup())  # ~10MB
+            sample = monitor.sample()
+            summary = monitor.summary()
+            monitor.stop_tracing()
+
+            rss = {role: format_bytes(size) for role, size in sample["rss"].items()}
+            print(f"🧠 RSS por papel: {rss}")
+            print(f"🧩 Tipos: {sample['type_growth'][:3]}")
+            for location, delta, size in sample["trace_growth"][:3]:
+                print(f"🔍 {location}: +{format_bytes(delta)}")
+            lines = open(log_file, encoding="utf-8").read().splitlines()
+
+        ok = (
+            sample["rss"].get("publisher_worker", 0) > 30 * 2**20
+            and ("FakeSoup", 200, 200) in sample["type_growth"]
+            and sample["trace_growth"]
+            and os.path.join("json", "decoder.py") in sample["trace_growth"][0][0]
+            and summary["baseline"] is not None
+            and len(lines) == 2
+        )
+    finally:
+        child.kill()
+    if not ok:
+        print("❌ Crescimento ou processo filho não detectado")
+        sys.exit(1)
+    print("✅ Crescimento localizado (tipo e linha) e RSS dos filhos medido")
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Metrics - Métricas do pipeline no formato texto do Prometheus
+Registro próprio e leve (sem prometheus_client): histogramas por etapa,
+contadores e gauges lidos na hora do scrape, servidos em /metrics por um
+ThreadingHTTPServer em thread daemon
+"""
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from . import tracing
+except ImportError:  # executado como script (python3 app/metrics.py)
+    import tracing
+
+# Logger do linkedin_poster sem importar o módulo (Selenium)
+logger = logging.getLogger("linkedin_poster")
+
+# Servidor /metrics (sobe junto com o bot)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9464"))
+
+# Limites dos buckets de duração (segundos): de parsing (ms) a publicação (minutos)
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Contador monotônico"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        if not items and not self.labelnames:
+            items = [((), 0)]
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """Valor instantâneo; com `collect`, lido na hora do scrape"""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        collect: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self.collect = collect
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def render(self) -> List[str]:
+        if self.collect:
+            try:
+                values = self.collect()
+            except Exception as e:
+                logger.warning(f"⚠️ Falha ao coletar {self.name}: {e}")
+                values = {}
+        else:
+            with self._lock:
+                values = dict(self._values)
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram(_Metric):
+    """Histograma cumulativo (buckets, _sum, _count)"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DURATION_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # labels -> [contagens por bucket (não cumulativas), soma, total]
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = [[0] * len(self.buckets), 0.0, 0]
+                self._series[key] = series
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        """Quantil aproximado pelo limite do bucket (diagnóstico e testes)"""
+        series = self._series.get(self._key(labels))
+        if not series or not series[2]:
+            return None
+        target = q * series[2]
+        running = 0
+        for bound, count in zip(self.buckets, series[0]):
+            running += count
+            if running >= target:
+                return bound
+        return self.buckets[-1]
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(
+                (key, (list(series[0]), series[1], series[2]))
+                for key, series in self._series.items()
+            )
+        lines = self.header()
+        names = self.labelnames + ("le",)
+        for key, (counts, total_sum, total_count) in items:
+            running = 0
+            for bound, count in zip(self.buckets, counts):
+                running += count
+                labels = _format_labels(names, key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {running}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total_sum)}")
+            lines.append(f"{self.name}_count{labels} {total_count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Conjunto de métricas renderizado no formato de exposição texto"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        collect: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+    ) -> Gauge:
+        gauge = self.register(Gauge(name, documentation, labelnames))
+        if collect:
+            gauge.collect = collect
+        return gauge
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DURATION_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Registro global e métricas do pipeline
+registry = MetricsRegistry()
+
+STAGE_DURATION = registry.histogram(
+    "pipeline_stage_duration_seconds",
+    "Duração de cada etapa do pipeline (parse, gpt, review, driver_start, login, publish)",
+    ("stage",),
+)
+STAGE_ERRORS = registry.counter(
+    "pipeline_stage_errors_total", "Falhas por etapa do pipeline", ("stage",)
+)
+CACHE_LOOKUPS = registry.counter(
+    "pipeline_cache_lookups_total",
+    "Consultas a caches (gpt_result, review_sentence) por resultado hit/miss",
+    ("cache", "result"),
+)
+BROWSER_LAUNCHES = registry.counter(
+    "browser_launches_total", "Navegadores iniciados pelo worker de publicação"
+)
+PUBLISH_RESULTS = registry.counter(
+    "publish_results_total", "Resultados das publicações por status", ("status",)
+)
+WORKER_RESTARTS = registry.counter(
+    "publisher_worker_restarts_total", "Reinícios do processo worker de publicação"
+)
+QUEUE_DEPTH = registry.gauge(
+    "pipeline_queue_depth", "Itens por estado da fila (lido no scrape)", ("status",)
+)
+PROCESS_RSS = registry.gauge(
+    "pipeline_process_rss_bytes",
+    "RSS por papel: bot, publisher_worker, browser, parser_pool (lido no scrape)",
+    ("role",),
+)
+
+
+def observe_stage(stage: str, seconds: float, error: bool = False) -> None:
+    """Registrar duração (e falha) de uma etapa"""
+    STAGE_DURATION.observe(seconds, stage=stage)
+    if error:
+        STAGE_ERRORS.inc(stage=stage)
+
+
+@contextmanager
+def stage_timer(stage: str, parent: tracing.ParentType = None):
+    """
+    Medir uma etapa do pipeline; exceções contam como falha da etapa
+    Dentro de um trace (span atual ou `parent`), a etapa vira também um span
+    """
+    if parent is None and tracing.get_current_span() is None:
+        span = nullcontext()
+    else:
+        span = tracing.get_tracer(__name__).start_as_current_span(stage, parent)
+
+    start = time.perf_counter()
+    with span:
+        try:
+            yield
+        except BaseException:
+            observe_stage(stage, time.perf_counter() - start, error=True)
+            raise
+    observe_stage(stage, time.perf_counter() - start)
+
+
+def record_cache(cache: str, hits: int = 0, misses: int = 0) -> None:
+    """Registrar acertos/faltas de cache"""
+    if hits:
+        CACHE_LOOKUPS.inc(hits, cache=cache, result="hit")
+    if misses:
+        CACHE_LOOKUPS.inc(misses, cache=cache, result="miss")
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = registry
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        payload = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetricsServer:
+    """Servidor HTTP de /metrics em thread daemon"""
+
+    def __init__(
+        self,
+        host: str = METRICS_HOST,
+        port: int = METRICS_PORT,
+        metrics_registry: MetricsRegistry = registry,
+    ):
+        self.host = host
+        self.port = port
+        self.registry = metrics_registry
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def start(self) -> None:
+        handler = type("MetricsHandler", (_MetricsHandler,), {"registry": self.registry})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(
+            target=self._server.serve_forever, name="metrics-http", daemon=True
+        ).start()
+        logger.info(f"📈 Métricas em http://{self.host}:{self.port}/metrics")
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+# Teste local - servidor em porta livre e leitura do /metrics
+if __name__ == "__main__":
+    import sys
+    import urllib.request
+
+    for seconds in (0.02, 0.03, 0.4, 3.0):
+        observe_stage("gpt", seconds)
+    with stage_timer("parse"):
+        time.sleep(0.01)
+    try:
+        with stage_timer("login"):
+            raise RuntimeError("senha errada")
+    except RuntimeError:
+        pass
+    record_cache("review_sentence", hits=8, misses=2)
+    BROWSER_LAUNCHES.inc()
+    QUEUE_DEPTH.collect = lambda: {("pendente",): 3, ("aguardando_aprovacao",): 1}
+
+    server = MetricsServer(port=0)
+    server.start()
+    with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics") as response:
+        body = response.read().decode()
+    server.stop()
+
+    print(body)
+    checks = [
+        'pipeline_stage_duration_seconds_bucket{stage="gpt",le="0.05"} 2' in body,
+        'pipeline_stage_duration_seconds_count{stage="gpt"} 4' in body,
+        'pipeline_stage_errors_total{stage="login"} 1' in body,
+        'pipeline_cache_lookups_total{cache="review_sentence",result="hit"} 8' in body,
+        'pipeline_queue_depth{status="pendente"} 3' in body,
+        "browser_launches_total 1" in body,
+        STAGE_DURATION.quantile(0.5, stage="gpt") == 0.05,
+    ]
+    if not all(checks):
+        print(f"❌ Falhas: {checks}")
+        sys.exit(1)
+    print("✅ /metrics no formato Prometheus")
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Outbound - Agendador das mensagens enviadas ao Telegram
+Plugado como rate limiter do python-telegram-bot: toda chamada da Bot API
+passa por aqui. Respeita limites global e por chat, junta edições seguidas
+da mesma mensagem (só a última é enviada) e repete RetryAfter sem que o
+handler perceba
+"""
+import os
+import time
+import asyncio
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Tuple, Union
+
+from telegram.error import BadRequest, RetryAfter
+from telegram.ext import BaseRateLimiter
+
+from .linkedin_poster import logger
+
+# Limites da Bot API: ~30 mensagens/s no total, ~1/s por chat, 20/min em grupos
+OUTBOUND_GLOBAL_RATE = float(os.getenv("OUTBOUND_GLOBAL_RATE", "30"))
+OUTBOUND_CHAT_RATE = float(os.getenv("OUTBOUND_CHAT_RATE", "1"))
+OUTBOUND_GROUP_RATE = float(os.getenv("OUTBOUND_GROUP_RATE", str(20 / 60)))
+OUTBOUND_CHAT_BURST = int(os.getenv("OUTBOUND_CHAT_BURST", "3"))
+OUTBOUND_MAX_RETRIES = int(os.getenv("OUTBOUND_MAX_RETRIES", "3"))
+
+# Edições que podem ser juntadas (a última substitui as anteriores ainda não enviadas)
+COALESCE_ENDPOINTS = ("editMessageText", "editMessageCaption", "editMessageReplyMarkup")
+
+JSONResult = Union[bool, Dict[str, Any], List[Dict[str, Any]]]
+
+
+class TokenBucket:
+    """Balde de tokens assíncrono (rate por segundo, capacidade = rajada)"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> float:
+        """Consumir um token; devolve o tempo esperado (segundos)"""
+        waited = 0.0
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        """Zerar o balde por `seconds` (após RetryAfter)"""
+        self.tokens = -seconds * self.rate
+        self.updated = time.monotonic()
+
+
+class OutboundScheduler(BaseRateLimiter):
+    """Rate limiter com coalescência de edições e retry de RetryAfter"""
+
+    def __init__(
+        self,
+        global_rate: float = OUTBOUND_GLOBAL_RATE,
+        chat_rate: float = OUTBOUND_CHAT_RATE,
+        group_rate: float = OUTBOUND_GROUP_RATE,
+        chat_burst: int = OUTBOUND_CHAT_BURST,
+        max_retries: int = OUTBOUND_MAX_RETRIES,
+    ):
+        self.global_rate = global_rate
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self._global: Optional[TokenBucket] = None
+        self._chats: Dict[Any, TokenBucket] = {}
+        # (chat_id, message_id) -> edição aguardando vez: [callback, args, kwargs, future]
+        self._pending_edits: Dict[Tuple[Any, Any], list] = {}
+        self.counters = {
+            "sent": 0,
+            "coalesced": 0,
+            "dropped": 0,
+            "retried": 0,
+            "throttled_ms": 0,
+        }
+
+    async def initialize(self) -> None:
+        self._global = TokenBucket(self.global_rate, self.global_rate)
+
+    async def shutdown(self) -> None:
+        for entry in self._pending_edits.values():
+            if not entry[3].done():
+                entry[3].cancel()
+        self._pending_edits.clear()
+
+    def _chat_bucket(self, chat_id: Any) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            # IDs negativos são grupos/canais (limite por minuto)
+            is_group = str(chat_id).startswith("-")
+            rate = self.group_rate if is_group else self.chat_rate
+            bucket = TokenBucket(rate, self.chat_burst)
+            self._chats[chat_id] = bucket
+        return bucket
+
+    async def process_request(
+        self,
+        callback: Callable[..., Coroutine[Any, Any, JSONResult]],
+        args: Any,
+        kwargs: Dict[str, Any],
+        endpoint: str,
+        data: Dict[str, Any],
+        rate_limit_args: Optional[Any],
+    ) -> JSONResult:
+        chat_id = data.get("chat_id")
+        if chat_id is None:
+            # getMe, setWebhook, answerCallbackQuery...: sem limite por chat
+            return await self._send(callback, args, kwargs, endpoint, None)
+
+        if endpoint in COALESCE_ENDPOINTS and data.get("message_id") is not None:
+            return await self._send_edit(
+                callback, args, kwargs, endpoint, chat_id, data["message_id"]
+            )
+
+        await self._throttle(chat_id)
+        return await self._send(callback, args, kwargs, endpoint, chat_id)
+
+    async def _throttle(self, chat_id: Any) -> None:
+        waited = await self._chat_bucket(chat_id).acquire()
+        waited += await self._global.acquire()
+        self.counters["throttled_ms"] += int(waited * 1000)
+
+    async def _send_edit(
+        self, callback, args, kwargs, endpoint: str, chat_id: Any, message_id: Any
+    ) -> JSONResult:
+        """Edições da mesma mensagem esperando vez viram uma só (a mais recente)"""
+        key = (chat_id, message_id)
+        entry = self._pending_edits.get(key)
+        if entry is not None:
+            entry[0], entry[1], entry[2] = callback, args, kwargs
+            self.counters["coalesced"] += 1
+            return await asyncio.shield(entry[3])
+
+        future = asyncio.get_running_loop().create_future()
+        entry = [callback, args, kwargs, future]
+        self._pending_edits[key] = entry
+        try:
+            await self._throttle(chat_id)
+        except BaseException:
+            # Cancelada na espera: quem juntou a edição nesta entrada não pode
+            # ficar aguardando um resultado que não vai chegar
+            future.cancel()
+            raise
+        finally:
+            # A partir daqui novas edições formam outra entrada
+            self._pending_edits.pop(key, None)
+
+        try:
+            result = await self._send(entry[0], entry[1], entry[2], endpoint, chat_id)
+        except BadRequest as e:
+            if "not modified" not in str(e).lower():
+                future.set_exception(e)
+                future.exception()  # evitar aviso de exceção não lida
+                raise
+            # Texto igual ao atual (comum após juntar edições): nada a enviar
+            self.counters["dropped"] += 1
+            result = True
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+
+        future.set_result(result)
+        return result
+
+    async def _send(
+        self, callback, args, kwargs, endpoint: str, chat_id: Any
+    ) -> JSONResult:
+        """Executar a chamada repetindo RetryAfter de forma transparente"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                result = await callback(*args, **kwargs)
+                self.counters["sent"] += 1
+                return result
+            except RetryAfter as e:
+                if attempt >= self.max_retries:
+                    self.counters["dropped"] += 1
+                    raise
+                self.counters["retried"] += 1
+                logger.warning(
+                    f"🚦 Flood limit em {endpoint} (chat {chat_id}): "
+                    f"aguardando {e.retry_after}s"
+                )
+                if chat_id is not None:
+                    self._chat_bucket(chat_id).pause(e.retry_after)
+                await asyncio.sleep(e.retry_after)
+                if chat_id is not None:
+                    await self._throttle(chat_id)
+
+    def stats(self) -> Dict[str, int]:
+        """Contadores de envio"""
+        return dict(self.counters)
+
+
+# Teste local - rajada de edições com flood limit simulado
+if __name__ == "__main__":
+    import sys
+
+    async def scenario() -> Dict[str, int]:
+        scheduler = OutboundScheduler(chat_rate=5, chat_burst=1, global_rate=30)
+        await scheduler.initialize()
+        sent_texts = []
+        flood = {"remaining": 1}
+
+        async def do_post(endpoint: str, data: Dict) -> JSONResult:
+            if flood["remaining"]:
+                flood["remaining"] -= 1
+                raise RetryAfter(1)
+            sent_texts.append(data["text"])
+            return {"message_id": data.get("message_id", 1), "text": data["text"]}
+
+        def request(endpoint: str, **data):
+            return scheduler.process_request(
+                do_post, (endpoint, data), {}, endpoint, data, None
+            )
+
+        # 1 mensagem + 10 edições da mesma mensagem + 1 mensagem em outro chat
+        results = await asyncio.gather(
+            request("sendMessage", chat_id=1, text="recebido"),
+            *(
+                request("editMessageText", chat_id=1, message_id=7, text=f"etapa {i}")
+                for i in range(10)
+            ),
+            request("sendMessage", chat_id=2, text="outro chat"),
+        )
+        print(f"📨 Enviados: {sent_texts}")
+
+        # Edição cancelada esperando a vez: a edição que se juntou a ela não trava
+        first = asyncio.ensure_future(
+            request("editMessageText", chat_id=1, message_id=8, text="cancelada")
+        )
+        await asyncio.sleep(0)
+        joined = asyncio.ensure_future(
+            request("editMessageText", chat_id=1, message_id=8, text="junto")
+        )
+        await asyncio.sleep(0)
+        first.cancel()
+        try:
+            await asyncio.wait_for(joined, timeout=2)
+            released = False
+        except asyncio.CancelledError:
+            released = True
+        except asyncio.TimeoutError:
+            released = False
+        print(f"🛑 Edição junto de uma cancelada liberada: {released}")
+
+        stats = scheduler.stats()
+        ok = (
+            released
+            and all(results)
+            and "etapa 9" in sent_texts
+            and len(sent_texts) < 12
+            and stats["retried"] == 1
+            and stats["coalesced"] > 0
+        )
+        return stats if ok else {}
+
+    stats = asyncio.run(scenario())
+    if not stats:
+        print("❌ Coalescência/retry incorretos")
+        sys.exit(1)
+    print(f"✅ {stats}")
@@ -14,6 +14,7 @@ import openai
 
 # Importar nosso parser HTML
 from .html_parser import HTMLParser, parse_html_file
+from .metrics import stage_timer
 
 # Carregar configurações
 load_dotenv()
@@ -25,11 +26,20 @@ openai.api_key = os.getenv("OPENAI_API_KEY")
 class PostProcessor:
     """Processador inteligente de conteúdo com GPT-4o-mini"""
 
-    def __init__(self):
+    def __init__(self, executor=None):
         self.model = "gpt-4o-mini"
         self.max_tokens = 2000
         self.temperature = 0.7
         self.html_parser = HTMLParser()
+        # PipelineExecutor opcional (parsing em processo, OpenAI em thread)
+        self.executor = executor
+
+    async def _run_blocking(self, func, *args, **kwargs):
+        """Executar chamada bloqueante fora do event loop"""
+        if self.executor:
+            return await self.executor.run_io(func, *args, **kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: func(*args, **kwargs))
 
     def create_optimization_prompt(self, content: str, metadata: Dict = None) -> str:
         """Criar prompt otimizado para GPT-4o-mini com contexto"""
@@ -73,7 +83,8 @@ RESPOSTA: (apenas o post otimizado, sem explicações)
         try:
             client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-            response = client.chat.completions.create(
+            response = await self._run_blocking(
+                client.chat.completions.create,
                 model=self.model,
                 messages=[
                     {
@@ -162,13 +173,20 @@ RESPOSTA: (apenas o post otimizado, sem explicações)
         """Processar arquivo HTML completo"""
         try:
             # 1. Extrair texto e metadados usando html_parser
-            text, metadata = parse_html_file(file_path)
+            with stage_timer("parse"):
+                if self.executor:
+                    text, metadata = await self.executor.run_cpu(
+                        parse_html_file, file_path
+                    )
+                else:
+                    text, metadata = parse_html_file(file_path)
 
             if not text or len(text.strip()) < 20:
                 raise Exception("Texto extraído muito curto ou vazio")
 
             # 2. Processar com GPT
-            processed_content = await self.process_with_gpt(text, metadata)
+            with stage_timer("gpt"):
+                processed_content = await self.process_with_gpt(text, metadata)
 
             if not processed_content:
                 raise Exception("GPT retornou conteúdo vazio")
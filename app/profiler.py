@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Profiler - Perfil sob demanda de uma execução do pipeline
+Desligado por padrão; `/profile next` (ou PROFILE_NEXT) arma as próximas
+execuções. A execução armada roda com cProfile (thread do event loop e cada
+chamada do pool de I/O feita por ela) e com um amostrador de pilhas de todas
+as threads; a publicação no worker é perfilada do mesmo jeito. Arquivos em
+logs/profiles/:
+  <execution_id>_<etapa>.prof       pstats (snakeviz, python -m pstats)
+  <execution_id>_<etapa>.collapsed  pilhas colapsadas (flamegraph.pl, speedscope)
+  <execution_id>_<etapa>.txt        resumo por tempo acumulado
+
+Consulta: python -m app.profiler list [n]
+          python -m app.profiler show <arquivo.prof> [linhas]
+"""
+import io
+import os
+import sys
+import time
+import pstats
+import cProfile
+import logging
+import threading
+import contextvars
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+# Logger do linkedin_poster sem importar o módulo (Selenium)
+logger = logging.getLogger("linkedin_poster")
+
+# Mesmo diretório dos logs do linkedin_poster
+LOG_DIR = "/logs" if os.path.exists("/.dockerenv") else "logs"
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(LOG_DIR, "profiles"))
+
+# Execuções perfiladas a partir da inicialização (além do /profile next)
+PROFILE_NEXT = int(os.getenv("PROFILE_NEXT", "0"))
+
+# Intervalo do amostrador de pilhas (ms)
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+
+# Linhas do resumo .txt
+PROFILE_SUMMARY_LINES = 40
+
+# Folhas de pilha de threads ociosas (pool esperando trabalho, select do loop)
+IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("threading.py", "wait"),
+}
+
+# Sessão da execução atual (propaga para run_io via contexto do asyncio)
+_current_session: contextvars.ContextVar = contextvars.ContextVar(
+    "profile_session", default=None
+)
+
+
+def current_session() -> Optional["ProfileSession"]:
+    """Sessão de perfil da execução atual (None fora de uma execução armada)"""
+    return _current_session.get()
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Thread que amostra a pilha de todas as threads (sys._current_frames) e
+    acumula no formato colapsado: "thread;raiz;...;folha contagem"
+    """
+
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL_MS / 1000):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.idle = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="profile-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                self.samples += 1
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAVES:
+                    self.idle += 1
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(5)
+
+    def collapsed(self) -> str:
+        """Pilhas colapsadas (uma por linha), mais frequentes primeiro"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfileSession:
+    """cProfile + amostrador de uma execução; grava os arquivos em stop()"""
+
+    def __init__(
+        self,
+        label: str,
+        stage: str,
+        output_dir: str = PROFILE_DIR,
+        sample_interval: float = PROFILE_SAMPLE_INTERVAL_MS / 1000,
+    ):
+        self.label = label
+        self.stage = stage
+        self.output_dir = output_dir
+        self.sampler = StackSampler(sample_interval)
+        self.calls = 0  # chamadas do pool de I/O perfiladas
+        self._profile = cProfile.Profile()
+        self._stats: Optional[pstats.Stats] = None
+        self._lock = threading.Lock()
+        self._started = 0.0
+
+    def start(self) -> "ProfileSession":
+        """Ligar o cProfile na thread atual e iniciar o amostrador"""
+        self._started = time.perf_counter()
+        self.sampler.start()
+        self._profile.enable()
+        return self
+
+    def wrap(self, func: Callable) -> Callable:
+        """Função que roda com cProfile próprio na thread do pool e soma à sessão"""
+
+        def profiled(*args, **kwargs):
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.disable()
+                self._add(profile)
+
+        return profiled
+
+    def _add(self, profile: cProfile.Profile) -> None:
+        with self._lock:
+            self.calls += 1
+            if self._stats is None:
+                self._stats = pstats.Stats(profile)
+            else:
+                self._stats.add(profile)
+
+    def stop(self) -> Dict[str, str]:
+        """Parar e gravar .prof, .collapsed e .txt; retorna os caminhos"""
+        self._profile.disable()
+        self.sampler.stop()
+        elapsed = time.perf_counter() - self._started
+        self._add(self._profile)
+        self.calls -= 1  # o perfil da própria thread não é chamada do pool
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"{self.label}_{self.stage}")
+        paths = {
+            "prof": f"{base}.prof",
+            "collapsed": f"{base}.collapsed",
+            "summary": f"{base}.txt",
+        }
+
+        with self._lock:
+            stats = self._stats
+        stats.dump_stats(paths["prof"])
+        with open(paths["collapsed"], "w", encoding="utf-8") as f:
+            f.write(self.sampler.collapsed())
+
+        summary = io.StringIO()
+        summary.write(
+            f"Execução: {self.label} | etapa: {self.stage} | {elapsed:.3f}s | "
+            f"chamadas do pool: {self.calls} | amostras: {self.sampler.samples} "
+            f"({self.sampler.idle} ociosas descartadas)\n\n"
+        )
+        stats.stream = summary
+        stats.sort_stats("cumulative").print_stats(PROFILE_SUMMARY_LINES)
+        with open(paths["summary"], "w", encoding="utf-8") as f:
+            f.write(summary.getvalue())
+
+        logger.info(f"🔬 Perfil de {self.label} ({self.stage}, {elapsed:.1f}s): {base}.*")
+        return paths
+
+
+class ExecutionProfiler:
+    """Controle do /profile: quantas das próximas execuções serão perfiladas"""
+
+    def __init__(self, armed: int = PROFILE_NEXT, output_dir: str = PROFILE_DIR):
+        self.output_dir = output_dir
+        self._armed = max(armed, 0)
+        self._active: Optional[ProfileSession] = None
+        self._lock = threading.Lock()
+        self.last: Optional[Dict[str, str]] = None
+
+    @property
+    def armed(self) -> int:
+        return self._armed
+
+    @property
+    def active(self) -> Optional[str]:
+        """Rótulo da execução sendo perfilada agora"""
+        session = self._active
+        return session.label if session else None
+
+    def arm(self, count: int = 1) -> int:
+        """Perfilar as próximas `count` execuções (soma às já armadas)"""
+        with self._lock:
+            self._armed += max(count, 0)
+            return self._armed
+
+    def disarm(self) -> None:
+        with self._lock:
+            self._armed = 0
+
+    def _take(self, stage: str) -> Optional[ProfileSession]:
+        # Uma sessão por vez: o cProfile da thread do loop não pode ser duplicado
+        with self._lock:
+            if self._armed <= 0 or self._active is not None:
+                return None
+            self._armed -= 1
+            self._active = ProfileSession("pending", stage, self.output_dir)
+            return self._active
+
+    @contextmanager
+    def profile(self, stage: str) -> Iterator[Optional[ProfileSession]]:
+        """
+        Perfilar o bloco se houver execução armada (yield None caso contrário)
+        O chamador define session.label (execution_id) antes de sair do bloco
+        """
+        session = self._take(stage)
+        if session is None:
+            yield None
+            return
+
+        token = _current_session.set(session)
+        session.start()
+        try:
+            yield session
+        finally:
+            _current_session.reset(token)
+            try:
+                self.last = session.stop()
+            except Exception as e:
+                logger.warning(f"⚠️ Falha ao gravar perfil de {session.label}: {e}")
+            finally:
+                with self._lock:
+                    self._active = None
+
+    def recent(self, limit: int = 5) -> List[str]:
+        """Arquivos .prof mais recentes"""
+        return list_profiles(self.output_dir)[:limit]
+
+
+def list_profiles(output_dir: str = PROFILE_DIR) -> List[str]:
+    """Arquivos .prof do diretório, mais recentes primeiro"""
+    if not os.path.isdir(output_dir):
+        return []
+    paths = [
+        os.path.join(output_dir, name)
+        for name in os.listdir(output_dir)
+        if name.endswith(".prof")
+    ]
+    return sorted(paths, key=os.path.getmtime, reverse=True)
+
+
+# Instância do processo (o worker de publicação perfila pelo flag do job)
+profiler = ExecutionProfiler()
+
+
+# Teste local
+if __name__ == "__main__":
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+
+    if command == "list":
+        limit = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+        for path in list_profiles()[:limit]:
+            print(f"{time.ctime(os.path.getmtime(path))}  {path}")
+        sys.exit(0)
+    if command == "show" and len(sys.argv) > 2:
+        lines = int(sys.argv[3]) if len(sys.argv) > 3 else PROFILE_SUMMARY_LINES
+        pstats.Stats(sys.argv[2]).sort_stats("cumulative").print_stats(lines)
+        sys.exit(0)
+    if command:
+        print("Uso: python -m app.profiler list [n]")
+        print("     python -m app.profiler show <arquivo.prof> [linhas]")
+        sys.exit(1)
+
+    def busy_parse(n: int) -> int:
+        """Trabalho de CPU no pool (como o parsing/GPT do pipeline)"""
+        total = 0
+        deadline = time.perf_counter() + 0.3
+        while time.perf_counter() < deadline:
+            total += sum(i * i for i in range(n))
+        return total
+
+    with tempfile.TemporaryDirectory() as tmp:
+        control = ExecutionProfiler(armed=0, output_dir=tmp)
+        with control.profile("process") as session:
+            skipped = session is None
+        control.arm(1)
+
+        pool = ThreadPoolExecutor(2, thread_name_prefix="pipeline-io")
+        with control.profile("process") as session:
+            session.label = "tg_teste"
+            # run_io copia o contexto: a chamada no pool entra na sessão
+            call = current_session().wrap(busy_parse)
+            pool.submit(contextvars.copy_context().run, call, 2000).result()
+        pool.shutdown()
+
+        paths = control.last
+        with open(paths["collapsed"], encoding="utf-8") as f:
+            collapsed = f.read()
+        with open(paths["summary"], encoding="utf-8") as f:
+            summary = f.read()
+        print(summary.splitlines()[0])
+        print(f"🔥 Pilha mais frequente: {collapsed.splitlines()[0][:120]}...")
+
+        ok = (
+            skipped
+            and control.armed == 0
+            and os.path.getsize(paths["prof"]) > 0
+            and "busy_parse" in summary
+            and any(
+                line.startswith("pipeline-io") and "busy_parse" in line
+                for line in collapsed.splitlines()
+            )
+        )
+    if not ok:
+        print("❌ Perfil não capturou o trabalho do pool")
+        sys.exit(1)
+    print("✅ cProfile e pilhas colapsadas gravados para a execução armada")
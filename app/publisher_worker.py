@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Publisher Worker - Publicação no LinkedIn em processo dedicado
+O bot envia jobs por uma fila local; o Selenium (get_driver/login/publish_post)
+roda em outro processo, então o bot continua respondendo e um crash do
+Chrome não derruba o bot
+"""
+import os
+import time
+import signal
+import uuid
+import tracemalloc
+import asyncio
+import threading
+from typing import Dict, List, Optional
+
+from .linkedin_poster import logger
+from .metrics import BROWSER_LAUNCHES, PUBLISH_RESULTS, WORKER_RESTARTS, observe_stage
+from .tracing import StatusCode, collect_local_spans, export_spans, extract, get_tracer
+from .profiler import ProfileSession
+from .executors import process_context
+
+# Intervalo de verificação do processo worker (segundos)
+WORKER_POLL_INTERVAL = 1.0
+
+# Tempo máximo aguardando uma publicação (segundos)
+PUBLISH_TIMEOUT = int(os.getenv("PUBLISH_TIMEOUT", "300"))
+
+
+def publisher_worker_main(jobs, results) -> None:
+    """
+    Loop do processo worker: um job (um navegador) por vez
+    Resultados vão por Pipe (escrita síncrona), para não se perderem se o
+    processo morrer logo depois
+    """
+    from .linkedin_poster import (
+        get_driver,
+        login,
+        observability,
+        publish_post,
+        use_direct_logging,
+    )
+
+    use_direct_logging()
+
+    # Grupo de processos próprio: chromedriver/Chromium morrem junto no killpg
+    os.setsid()
+    logger.info(f"🧑‍🏭 Worker de publicação iniciado (pid {os.getpid()})")
+
+    # Reinício após /memory trace on com PROCESS_START_METHOD=fork: herda o tracemalloc
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+    # Spans das etapas do navegador voltam ao bot junto com o resultado
+    tracer = get_tracer(__name__)
+    spans = collect_local_spans()
+
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+
+        job_id = job["job_id"]
+        execution_id = job["execution_id"]
+
+        # O bot já desistiu (timeout) e marcou o item para verificação: não publicar
+        if time.time() > job["deadline"]:
+            logger.warning(f"⏭️ Publicação expirada descartada: {execution_id}")
+            results.send(
+                {
+                    "type": "result",
+                    "job_id": job_id,
+                    "status": "error",
+                    "error": "Publicação expirada antes de iniciar",
+                    "error_type": "PublishExpired",
+                    "duration_ms": 0,
+                }
+            )
+            continue
+
+        start_time = time.time()
+        driver = None
+        # Duração por etapa (segundos), devolvida ao bot para as métricas
+        timings = {}
+        parent = extract(job.get("trace"))
+        attributes = {"execution_id": execution_id, "worker.pid": os.getpid()}
+        # Execução armada pelo /profile: navegador + login + publicação
+        session = None
+        if job.get("profile"):
+            session = ProfileSession(execution_id, "publish").start()
+        stage = "driver_start"
+        span = tracer.start_span(stage, parent, attributes)
+        try:
+            stage_start = time.perf_counter()
+            driver = get_driver()
+            timings["driver_start"] = time.perf_counter() - stage_start
+            span.end()
+
+            stage, stage_start = "login", time.perf_counter()
+            span = tracer.start_span(stage, parent, attributes)
+            login(driver, execution_id)
+            timings["login"] = time.perf_counter() - stage_start
+            span.end()
+
+            stage, stage_start = "publish", time.perf_counter()
+            span = tracer.start_span(stage, parent, attributes)
+            publish_post(driver, job["content"], execution_id)
+            timings["publish"] = time.perf_counter() - stage_start
+            span.end()
+
+            # Auditoria do job em disco antes do bot saber do resultado (recovery)
+            observability.flush_audit()
+            results.send(
+                {
+                    "type": "result",
+                    "job_id": job_id,
+                    "status": "published",
+                    "duration_ms": int((time.time() - start_time) * 1000),
+                    "timings": timings,
+                    "spans": spans.drain(),
+                }
+            )
+
+        except Exception as e:
+            timings[stage] = time.perf_counter() - stage_start
+            span.record_exception(e)
+            span.set_status(StatusCode.ERROR, str(e))
+            span.end()
+            observability.flush_audit()
+            results.send(
+                {
+                    "type": "result",
+                    "job_id": job_id,
+                    "status": "error",
+                    "error": str(e),
+                    "error_type": type(e).__name__,
+                    "duration_ms": int((time.time() - start_time) * 1000),
+                    "timings": timings,
+                    "failed_stage": stage,
+                    "spans": spans.drain(),
+                }
+            )
+
+        finally:
+            if driver:
+                try:
+                    driver.quit()
+                except Exception as e:
+                    logger.warning(f"⚠️ Falha ao encerrar navegador: {e}")
+            if session:
+                try:
+                    session.stop()
+                except Exception as e:
+                    logger.warning(f"⚠️ Falha ao gravar perfil de {execution_id}: {e}")
+
+    # Processo filho sai sem atexit: entregar alertas e auditoria pendentes
+    observability.shutdown()
+    logger.info("🏁 Worker de publicação finalizado")
+
+
+class PublisherClient:
+    """Lado do bot: envia jobs ao worker e devolve o resultado de forma assíncrona"""
+
+    def __init__(self):
+        # spawn (PROCESS_START_METHOD): processo limpo, sem locks herdados das threads do bot
+        self._ctx = process_context()
+        self._jobs = None
+        self._results = None
+        self._results_sender = None
+        self._process = None
+        self._reader = None
+        self._running = False
+        self._lock = threading.Lock()
+        self._pending: Dict[str, tuple] = {}  # job_id -> (loop, future)
+        # Jobs enviados ao worker e ainda sem resultado, na ordem da fila: o
+        # primeiro já foi (ou está para ser) retirado pelo worker
+        self._sent: List[str] = []
+        self.restarts = 0
+
+    def start(self) -> None:
+        """Iniciar processo worker e thread leitora de resultados"""
+        if self._running:
+            return
+
+        self._jobs = self._ctx.Queue()
+        self._results, self._results_sender = self._ctx.Pipe(duplex=False)
+        self._running = True
+        self._spawn_worker()
+
+        self._reader = threading.Thread(
+            target=self._read_results, name="publisher-results", daemon=True
+        )
+        self._reader.start()
+
+    def _spawn_worker(self) -> None:
+        self._process = self._ctx.Process(
+            target=publisher_worker_main,
+            args=(self._jobs, self._results_sender),
+            name="linkedin-publisher",
+            daemon=True,
+        )
+        self._process.start()
+
+    @property
+    def worker_pid(self) -> Optional[int]:
+        """PID do processo worker atual"""
+        return self._process.pid if self._process else None
+
+    async def submit(
+        self,
+        execution_id: str,
+        content: str,
+        trace: Optional[Dict] = None,
+        profile: bool = False,
+    ) -> Dict:
+        """
+        Enfileirar publicação e aguardar o resultado sem bloquear o event loop
+        trace: contexto do span pai (tracing.inject) para as etapas do navegador
+        profile: perfilar a publicação no worker (execução armada pelo /profile)
+        """
+        if not self._running:
+            self.start()
+
+        job_id = uuid.uuid4().hex
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        with self._lock:
+            self._pending[job_id] = (loop, future)
+            self._sent.append(job_id)
+
+        self._jobs.put(
+            {
+                "job_id": job_id,
+                "execution_id": execution_id,
+                "content": content,
+                "trace": trace,
+                "profile": profile,
+                "deadline": time.time() + PUBLISH_TIMEOUT,
+            }
+        )
+        logger.info(f"📮 Publicação enfileirada: {execution_id}")
+
+        try:
+            return await asyncio.wait_for(future, PUBLISH_TIMEOUT)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._pending.pop(job_id, None)
+                current = bool(self._sent) and self._sent[0] == job_id
+            # Atrás de outro job: o worker só o retira depois do deadline e
+            # descarta. Primeiro da fila: o navegador pode estar publicando,
+            # então o worker é encerrado (_check_worker reinicia) e o
+            # resultado fica desconhecido
+            if current:
+                logger.error(
+                    f"⏱️ Publicação {execution_id} excedeu {PUBLISH_TIMEOUT}s - "
+                    "encerrando worker"
+                )
+                self._kill_worker()
+            return {
+                "status": "error",
+                "error": f"Timeout de {PUBLISH_TIMEOUT}s aguardando o worker de publicação",
+                "error_type": "PublishTimeout",
+                "duration_ms": PUBLISH_TIMEOUT * 1000,
+                # Só o job em andamento pode ter publicado
+                "outcome_unknown": current,
+            }
+
+    def _read_results(self) -> None:
+        """Thread: receber resultados e vigiar o processo worker"""
+        while self._running:
+            try:
+                if not self._results.poll(WORKER_POLL_INTERVAL):
+                    self._check_worker()
+                    continue
+                message = self._results.recv()
+            except (EOFError, OSError):
+                break
+
+            with self._lock:
+                if message["job_id"] in self._sent:
+                    self._sent.remove(message["job_id"])
+            self._record_metrics(message)
+            export_spans(message.get("spans", []))
+            self._resolve(message["job_id"], message)
+
+    def _check_worker(self) -> None:
+        """Se o worker morreu (ex: crash do Chrome), falhar o job e reiniciar"""
+        if not self._running or self._process.is_alive():
+            return
+
+        exitcode = self._process.exitcode
+        logger.error(f"💥 Worker de publicação encerrou (exitcode {exitcode})")
+        # Navegador que sobrou do worker morto segura o diretório de perfil
+        self._kill_group(self._process.pid)
+
+        with self._lock:
+            in_flight = self._sent.pop(0) if self._sent else None
+        if in_flight:
+            # Morreu com o job retirado da fila: o post pode ter saído antes do crash
+            self._resolve(
+                in_flight,
+                {
+                    "status": "error",
+                    "error": f"Worker de publicação encerrou inesperadamente (exitcode {exitcode})",
+                    "error_type": "WorkerCrashed",
+                    "duration_ms": 0,
+                    "outcome_unknown": True,
+                },
+            )
+            PUBLISH_RESULTS.inc(status="error")
+
+        self.restarts += 1
+        WORKER_RESTARTS.inc()
+        self._spawn_worker()
+        logger.info(f"🔄 Worker de publicação reiniciado (pid {self._process.pid})")
+
+    def _kill_worker(self) -> None:
+        """Encerrar o worker e os processos do navegador (mesmo grupo)"""
+        if not self._kill_group(self._process.pid):
+            self._process.kill()
+
+    def _kill_group(self, pid: Optional[int]) -> bool:
+        """SIGKILL no grupo do worker (pgid = pid após o setsid); False se não existe"""
+        if not pid:
+            return False
+        try:
+            os.killpg(pid, signal.SIGKILL)
+            return True
+        except (ProcessLookupError, PermissionError):
+            return False
+
+    def _record_metrics(self, result: Dict) -> None:
+        """Durações das etapas do navegador medidas no worker"""
+        failed_stage = result.get("failed_stage")
+        for stage, seconds in result.get("timings", {}).items():
+            observe_stage(stage, seconds, error=stage == failed_stage)
+        if "driver_start" in result.get("timings", {}) and failed_stage != "driver_start":
+            BROWSER_LAUNCHES.inc()
+        PUBLISH_RESULTS.inc(status=result["status"])
+
+    def _resolve(self, job_id: str, result: Dict) -> None:
+        with self._lock:
+            entry = self._pending.pop(job_id, None)
+        if not entry:
+            return
+
+        loop, future = entry
+
+        def set_result():
+            if not future.done():
+                future.set_result(result)
+
+        loop.call_soon_threadsafe(set_result)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Encerrar worker (jobs pendentes recebem erro)"""
+        if not self._running:
+            return
+
+        self._running = False
+        try:
+            self._jobs.put(None)
+            self._process.join(timeout)
+        finally:
+            if self._process.is_alive():
+                self._process.terminate()
+            self._kill_group(self._process.pid)
+
+        with self._lock:
+            pending = list(self._pending)
+        for job_id in pending:
+            self._resolve(
+                job_id,
+                {
+                    "status": "error",
+                    "error": "Worker de publicação encerrado",
+                    "error_type": "WorkerStopped",
+                    "duration_ms": 0,
+                },
+            )
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Queue Index - Índice em memória das filas (pendentes, enviados, logs)
+Atualizado pelo pipeline a cada mudança e reconciliado com eventos do
+sistema de arquivos (inotify, com fallback por mtime do diretório), para que
+os comandos de fila não precisem de os.listdir a cada chamada
+"""
+import os
+import bisect
+import select
+import struct
+import ctypes
+import ctypes.util
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from .linkedin_poster import logger
+
+# Intervalo do fallback sem inotify (segundos)
+QUEUE_INDEX_POLL_INTERVAL = float(os.getenv("QUEUE_INDEX_POLL_INTERVAL", "5"))
+
+# Arquivos temporários não entram no índice
+IGNORED_PREFIXES = ("temp_", ".")
+
+# Constantes do inotify (linux/inotify.h)
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _insert(entries: List[str], filename: str) -> None:
+    i = bisect.bisect_left(entries, filename)
+    if i == len(entries) or entries[i] != filename:
+        entries.insert(i, filename)
+
+
+def _delete(entries: List[str], filename: str) -> None:
+    i = bisect.bisect_left(entries, filename)
+    if i < len(entries) and entries[i] == filename:
+        del entries[i]
+
+
+class QueueIndex:
+    """Listas ordenadas por fila: contagem O(1), primeiros/últimos k em O(k)"""
+
+    def __init__(self, queues: Dict[str, Tuple[str, str]]):
+        # {nome: (diretório, sufixo)}
+        self.queues = queues
+        self._entries: Dict[str, List[str]] = {name: [] for name in queues}
+        self._lock = threading.Lock()
+        # Reconstrução fora do _lock (scandir lento não trava o event loop);
+        # mudanças feitas durante a varredura ficam no diário e são reaplicadas
+        self._rebuild_lock = threading.Lock()
+        self._journal: Dict[str, List[Tuple[bool, str]]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._mtimes: Dict[str, int] = {}
+        self.mode = "stopped"
+        self.rebuild()
+
+    def _accepts(self, name: str, filename: str) -> bool:
+        suffix = self.queues[name][1]
+        return filename.endswith(suffix) and not filename.startswith(IGNORED_PREFIXES)
+
+    def rebuild(self, name: Optional[str] = None) -> None:
+        """Reconstruir a partir do disco (inicialização ou reconciliação)"""
+        with self._rebuild_lock:
+            for queue_name in [name] if name else list(self.queues):
+                self._rebuild_queue(queue_name)
+
+    def _rebuild_queue(self, name: str) -> None:
+        directory = self.queues[name][0]
+        with self._lock:
+            self._journal[name] = []
+        try:
+            self._mtimes[name] = os.stat(directory).st_mtime_ns
+            entries = sorted(
+                entry.name
+                for entry in os.scandir(directory)
+                if self._accepts(name, entry.name)
+            )
+        except FileNotFoundError:
+            entries = []
+        with self._lock:
+            # add/remove feitos durante a varredura valem sobre o que ela leu
+            for added, filename in self._journal.pop(name):
+                (_insert if added else _delete)(entries, filename)
+            self._entries[name] = entries
+
+    def add(self, name: str, filename: str) -> None:
+        """Adicionar arquivo à fila (idempotente)"""
+        filename = os.path.basename(filename)
+        if not self._accepts(name, filename):
+            return
+        with self._lock:
+            _insert(self._entries[name], filename)
+            if name in self._journal:
+                self._journal[name].append((True, filename))
+
+    def remove(self, name: str, filename: str) -> None:
+        """Remover arquivo da fila (idempotente)"""
+        filename = os.path.basename(filename)
+        with self._lock:
+            _delete(self._entries[name], filename)
+            if name in self._journal:
+                self._journal[name].append((False, filename))
+
+    def move(self, source: str, target: str, filename: str) -> None:
+        """Mover arquivo entre filas"""
+        self.remove(source, filename)
+        self.add(target, filename)
+
+    def count(self, name: str) -> int:
+        """Quantidade de arquivos na fila"""
+        return len(self._entries[name])
+
+    def head(self, name: str, k: int) -> List[str]:
+        """Primeiros k arquivos (mais antigos)"""
+        with self._lock:
+            return self._entries[name][:k]
+
+    def tail(self, name: str, k: int) -> List[str]:
+        """Últimos k arquivos (mais recentes primeiro)"""
+        with self._lock:
+            return self._entries[name][-k:][::-1] if k > 0 else []
+
+    def start_watching(self) -> None:
+        """Reconciliar com mudanças externas (inotify ou fallback por mtime)"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        watcher = self._setup_inotify()
+        if watcher:
+            self.mode = "inotify"
+            target, args = self._watch_inotify, watcher
+        else:
+            self.mode = "polling"
+            target, args = self._watch_polling, ()
+
+        self._thread = threading.Thread(
+            target=target, args=args, name="queue-index", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"👀 Índice de filas monitorando diretórios ({self.mode})")
+
+    def stop(self) -> None:
+        """Parar monitoramento"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+
+    def _setup_inotify(self) -> Optional[Tuple[int, Dict[int, str]]]:
+        """Criar watches inotify via libc; None se indisponível"""
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(IN_CLOEXEC)
+            if fd < 0:
+                return None
+
+            watches = {}
+            mask = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+            for name, (directory, _) in self.queues.items():
+                wd = libc.inotify_add_watch(fd, os.fsencode(directory), mask)
+                if wd < 0:
+                    os.close(fd)
+                    return None
+                watches[wd] = name
+            return fd, watches
+        except (OSError, AttributeError):
+            return None
+
+    def _watch_inotify(self, fd: int, watches: Dict[int, str]) -> None:
+        try:
+            while not self._stop.is_set():
+                ready, _, _ = select.select([fd], [], [], 1.0)
+                if not ready:
+                    continue
+
+                buffer = os.read(fd, 64 * 1024)
+                offset = 0
+                while offset < len(buffer):
+                    wd, mask, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+                    start = offset + _EVENT_HEADER.size
+                    filename = os.fsdecode(buffer[start : start + length].rstrip(b"\0"))
+                    offset = start + length
+
+                    if mask & IN_Q_OVERFLOW:
+                        self.rebuild()
+                        continue
+
+                    name = watches.get(wd)
+                    if not name or not filename:
+                        continue
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        self.add(name, filename)
+                    elif mask & (IN_DELETE | IN_MOVED_FROM):
+                        self.remove(name, filename)
+        except OSError as e:
+            logger.warning(f"⚠️ inotify falhou, usando polling: {e}")
+            self.mode = "polling"
+            self._watch_polling()
+        finally:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def _watch_polling(self) -> None:
+        """Fallback: um stat por diretório; reconstrói só se o mtime mudou"""
+        while not self._stop.wait(QUEUE_INDEX_POLL_INTERVAL):
+            for name, (directory, _) in self.queues.items():
+                try:
+                    mtime = os.stat(directory).st_mtime_ns
+                except FileNotFoundError:
+                    continue
+                if mtime != self._mtimes.get(name):
+                    self.rebuild(name)
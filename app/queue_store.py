@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Queue Store - Estado da fila de produção em SQLite (modo WAL)
+Substitui o read-modify-write dos arquivos .metadata.json: cada mudança de
+estado é uma transação; os corpos HTML continuam em disco
+"""
+import os
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+QUEUE_DB_PATH = os.getenv("QUEUE_DB_PATH", os.path.join("posts", "queue.db"))
+
+# Estados do pipeline (transition recusa qualquer outro)
+POST_STATUSES = (
+    "pendente",
+    "processando",
+    "aguardando_aprovacao",
+    "agendado",
+    "publicando",
+    "verificar",
+    "enviado",
+    "publicado",
+    "cancelado",
+    "erro",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    filename TEXT NOT NULL UNIQUE,
+    file_path TEXT NOT NULL,
+    queue TEXT NOT NULL,
+    status TEXT NOT NULL,
+    user_id INTEGER,
+    execution_id TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    metadata TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_posts_status ON posts(status);
+CREATE INDEX IF NOT EXISTS idx_posts_user ON posts(user_id);
+CREATE INDEX IF NOT EXISTS idx_posts_created ON posts(created_at);
+CREATE INDEX IF NOT EXISTS idx_posts_execution ON posts(execution_id);
+CREATE TABLE IF NOT EXISTS status_counters (
+    status TEXT PRIMARY KEY,
+    total INTEGER NOT NULL
+);
+"""
+
+
+class QueueStore:
+    """Armazenamento transacional dos itens da fila (uma conexão por thread)"""
+
+    def __init__(self, db_path: str = QUEUE_DB_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._local = threading.local()
+        self.connection.executescript(SCHEMA)
+
+        # Banco anterior aos contadores: calcular uma vez
+        has_counters = self.connection.execute(
+            "SELECT 1 FROM status_counters LIMIT 1"
+        ).fetchone()
+        if not has_counters and not self.is_empty():
+            self.rebuild_counters()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Conexão da thread atual (pools do pipeline usam threads diferentes)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _row_to_post(self, row: Optional[sqlite3.Row]) -> Optional[Dict]:
+        if row is None:
+            return None
+        post = dict(row)
+        post["metadata"] = json.loads(post["metadata"])
+        return post
+
+    def _bump_counter(self, conn: sqlite3.Connection, status: str, delta: int) -> None:
+        """Atualizar contador por estado (dentro da transação do chamador)"""
+        conn.execute(
+            """
+            INSERT INTO status_counters (status, total) VALUES (?, ?)
+            ON CONFLICT(status) DO UPDATE SET total = total + excluded.total
+            """,
+            (status, delta),
+        )
+
+    def _insert_post(
+        self,
+        filename: str,
+        file_path: str,
+        queue: str,
+        status: str,
+        user_id: Optional[int],
+        execution_id: Optional[str],
+        created_at: str,
+        metadata: Dict,
+    ) -> int:
+        """Inserir item e incrementar o contador do estado na mesma transação"""
+        return self._insert_posts(
+            [(filename, file_path, queue, status, user_id, execution_id, created_at, metadata)]
+        )[0]
+
+    def _insert_posts(self, rows: List[Tuple]) -> List[int]:
+        """Inserir vários itens (e seus contadores) em uma única transação"""
+        conn = self.connection
+        post_ids = []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for (
+                filename,
+                file_path,
+                queue,
+                status,
+                user_id,
+                execution_id,
+                created_at,
+                metadata,
+            ) in rows:
+                cursor = conn.execute(
+                    """
+                    INSERT INTO posts (filename, file_path, queue, status, user_id,
+                                       execution_id, created_at, updated_at, metadata)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        filename,
+                        file_path,
+                        queue,
+                        status,
+                        user_id,
+                        execution_id,
+                        created_at,
+                        datetime.now().isoformat(),
+                        json.dumps(metadata, ensure_ascii=False),
+                    ),
+                )
+                self._bump_counter(conn, status, 1)
+                post_ids.append(cursor.lastrowid)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return post_ids
+
+    def _post_row(self, file_path: str, metadata: Dict, user_id: int) -> Tuple:
+        processing = metadata.get("processing", {})
+        return (
+            os.path.basename(file_path),
+            file_path,
+            processing.get("queue", "pendentes"),
+            processing.get("status", "pendente"),
+            user_id,
+            processing.get("pipeline_id"),
+            datetime.now().isoformat(),
+            metadata,
+        )
+
+    def add_post(self, file_path: str, metadata: Dict, user_id: int) -> int:
+        """Registrar novo item na fila; retorna o ID"""
+        return self._insert_posts([self._post_row(file_path, metadata, user_id)])[0]
+
+    def add_posts(self, items: List[Tuple[str, Dict]], user_id: int) -> List[int]:
+        """Registrar lote [(file_path, metadata)] atomicamente; retorna os IDs"""
+        return self._insert_posts(
+            [self._post_row(file_path, metadata, user_id) for file_path, metadata in items]
+        )
+
+    def get_post(self, post_id: int) -> Optional[Dict]:
+        """Buscar item por ID"""
+        row = self.connection.execute(
+            "SELECT * FROM posts WHERE id = ?", (post_id,)
+        ).fetchone()
+        return self._row_to_post(row)
+
+    def get_by_filename(self, filename: str) -> Optional[Dict]:
+        """Buscar item pelo nome do arquivo HTML"""
+        row = self.connection.execute(
+            "SELECT * FROM posts WHERE filename = ?", (os.path.basename(filename),)
+        ).fetchone()
+        return self._row_to_post(row)
+
+    def transition(
+        self,
+        post_id: int,
+        processing: Optional[Dict] = None,
+        extra: Optional[Dict] = None,
+        queue: Optional[str] = None,
+        file_path: Optional[str] = None,
+    ) -> Optional[Dict]:
+        """
+        Mudança de estado atômica: atualiza processing/campos extras do metadata
+        e as colunas indexadas na mesma transação
+        """
+        processing = processing or {}
+        conn = self.connection
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT * FROM posts WHERE id = ?", (post_id,)
+            ).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                return None
+
+            post = self._row_to_post(row)
+            meta = post["metadata"]
+            meta.setdefault("processing", {}).update(processing)
+            meta.update(extra or {})
+            if queue:
+                meta["processing"]["queue"] = queue
+
+            status = meta["processing"].get("status", post["status"])
+            if status not in POST_STATUSES:
+                raise ValueError(f"Estado desconhecido para o item #{post_id}: {status}")
+            conn.execute(
+                """
+                UPDATE posts
+                SET status = ?, queue = ?, file_path = ?, execution_id = ?,
+                    updated_at = ?, metadata = ?
+                WHERE id = ?
+                """,
+                (
+                    status,
+                    queue or post["queue"],
+                    file_path or post["file_path"],
+                    meta["processing"].get("pipeline_id") or post["execution_id"],
+                    datetime.now().isoformat(),
+                    json.dumps(meta, ensure_ascii=False),
+                    post_id,
+                ),
+            )
+            if status != post["status"]:
+                self._bump_counter(conn, post["status"], -1)
+                self._bump_counter(conn, status, 1)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        post.update(
+            status=status,
+            queue=queue or post["queue"],
+            file_path=file_path or post["file_path"],
+            metadata=meta,
+        )
+        return post
+
+    def count_by_status(self) -> Dict[str, int]:
+        """Contagem de itens por estado (contadores mantidos a cada transição)"""
+        rows = self.connection.execute(
+            "SELECT status, total FROM status_counters WHERE total > 0"
+        ).fetchall()
+        return {row["status"]: row["total"] for row in rows}
+
+    def rebuild_counters(self) -> Dict[str, int]:
+        """Recalcular contadores a partir da tabela de itens (recuperação)"""
+        conn = self.connection
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM status_counters")
+            conn.execute(
+                """
+                INSERT INTO status_counters (status, total)
+                SELECT status, COUNT(*) FROM posts GROUP BY status
+                """
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return self.count_by_status()
+
+    def list_posts(
+        self,
+        statuses: Optional[Iterable[str]] = None,
+        user_id: Optional[int] = None,
+        limit: int = 50,
+    ) -> List[Dict]:
+        """Listar itens (mais antigos primeiro) filtrando por estado/usuário"""
+        query = "SELECT * FROM posts WHERE 1 = 1"
+        params: list = []
+        if statuses:
+            statuses = list(statuses)
+            query += f" AND status IN ({', '.join('?' * len(statuses))})"
+            params.extend(statuses)
+        if user_id is not None:
+            query += " AND user_id = ?"
+            params.append(user_id)
+        query += " ORDER BY created_at LIMIT ?"
+        params.append(limit)
+
+        rows = self.connection.execute(query, params).fetchall()
+        return [self._row_to_post(row) for row in rows]
+
+    def is_empty(self) -> bool:
+        """Verificar se ainda não há itens (ex: antes da migração)"""
+        return self.connection.execute("SELECT 1 FROM posts LIMIT 1").fetchone() is None
+
+    def import_sidecar(self, metadata_path: str, queue: str) -> Optional[int]:
+        """Importar um .metadata.json legado (ignora se já importado)"""
+        html_path = metadata_path.replace(".metadata.json", ".html")
+        filename = os.path.basename(html_path)
+        if self.get_by_filename(filename):
+            return None
+
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        processing = meta.setdefault("processing", {})
+        processing.setdefault("queue", queue)
+        processing.setdefault("status", "pendente")
+        telegram = meta.get("telegram", {})
+        created_at = (
+            telegram.get("received_at")
+            or meta.get("extracted_at")
+            or datetime.fromtimestamp(os.path.getmtime(metadata_path)).isoformat()
+        )
+
+        return self._insert_post(
+            filename,
+            html_path,
+            queue,
+            processing["status"],
+            telegram.get("user_id"),
+            processing.get("pipeline_id"),
+            created_at,
+            meta,
+        )
+
+    def migrate_sidecars(self, queue_dirs: Dict[str, str]) -> Dict[str, int]:
+        """Importar todos os .metadata.json das filas {queue: diretório}"""
+        summary = {"imported": 0, "skipped": 0, "errors": 0}
+        for queue, directory in queue_dirs.items():
+            if not os.path.isdir(directory):
+                continue
+            for name in sorted(os.listdir(directory)):
+                if not name.endswith(".metadata.json"):
+                    continue
+                try:
+                    imported = self.import_sidecar(os.path.join(directory, name), queue)
+                    summary["imported" if imported else "skipped"] += 1
+                except Exception as e:
+                    print(f"❌ Erro importando {name}: {e}")
+                    summary["errors"] += 1
+        return summary
+
+
+# Ferramenta de migração
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2 or sys.argv[1] != "migrate":
+        print("Uso: python -m app.queue_store migrate [posts_dir]")
+        sys.exit(1)
+
+    posts_dir = sys.argv[2] if len(sys.argv) > 2 else "posts"
+    store = QueueStore(
+        os.getenv("QUEUE_DB_PATH", os.path.join(posts_dir, "queue.db"))
+    )
+    result = store.migrate_sidecars(
+        {
+            "pendentes": os.path.join(posts_dir, "pendentes"),
+            "enviados": os.path.join(posts_dir, "enviados"),
+        }
+    )
+    print(
+        f"✅ Migração concluída: {result['imported']} importados, "
+        f"{result['skipped']} já existentes, {result['errors']} erros"
+    )
+    print(f"📦 Banco: {store.db_path}")
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Recovery - Retomada de itens interrompidos na inicialização
+Itens que ficaram em "pendente", "processando" ou "publicando" quando o bot
+morreu são reagendados com concorrência limitada: o processamento reaproveita o
+resultado GPT já gerado e a publicação só é refeita depois de verificar na
+auditoria (audit.db) que o post não chegou a ser publicado
+"""
+import os
+import asyncio
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional
+
+from .linkedin_poster import observability, logger
+
+# Itens retomados em paralelo
+RECOVERY_CONCURRENCY = int(os.getenv("RECOVERY_CONCURRENCY", "2"))
+
+# Republicar automaticamente quando o audit não registra sucesso (opt-in: o
+# post pode ter saído sem o audit registrar); por padrão volta para aprovação
+RECOVERY_REPUBLISH = os.getenv("RECOVERY_REPUBLISH", "false").lower() == "true"
+
+# "pendente" só existe entre gravar o arquivo e iniciar o processamento (ex:
+# resto de um lote); na inicialização nenhum handler está rodando ainda
+INTERRUPTED_STATUSES = ("pendente", "processando", "publicando")
+RECOVERY_SCAN_LIMIT = 500
+
+Notifier = Callable[[int, str], Awaitable[None]]
+
+
+class PipelineRecovery:
+    """Varredura de itens interrompidos e reagendamento (uma vez por inicialização)"""
+
+    def __init__(self, pipeline, concurrency: int = RECOVERY_CONCURRENCY):
+        self.pipeline = pipeline
+        self.concurrency = max(1, concurrency)
+        self.summary = {
+            "found": 0,
+            "reprocessed": 0,
+            "published": 0,
+            "scheduled": 0,
+            "verified": 0,
+            "awaiting_approval": 0,
+            "failed": 0,
+        }
+
+    async def run(self, notify: Optional[Notifier] = None) -> Dict[str, int]:
+        """Retomar todos os itens interrompidos; devolve o resumo"""
+        pipeline = self.pipeline
+        posts = await pipeline.executor.run_io(
+            pipeline.store.list_posts, INTERRUPTED_STATUSES, None, RECOVERY_SCAN_LIMIT
+        )
+        self.summary["found"] = len(posts)
+        if not posts:
+            return self.summary
+
+        pipeline.pipeline_logger.info(
+            f"♻️ Recuperação: {len(posts)} itens interrompidos encontrados"
+        )
+
+        # Uma consulta ao audit.db (índice por execution_id; o CSV é rotacionado
+        # e perde o histórico antigo) para todos os itens em "publicando"
+        publishing_ids = [
+            post["execution_id"]
+            for post in posts
+            if post["status"] == "publicando" and post["execution_id"]
+        ]
+        published = await pipeline.executor.run_io(
+            observability.audit.successful, publishing_ids, "publish_post"
+        )
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def recover(post: Dict) -> None:
+            async with semaphore:
+                try:
+                    if post["status"] == "publicando":
+                        message = await self._resume_publishing(
+                            post, post["execution_id"] in published
+                        )
+                    else:
+                        message = await self._resume_processing(post)
+                except Exception as e:
+                    self.summary["failed"] += 1
+                    message = f"❌ Falha ao retomar `#{post['id']}`: {e}"
+                    pipeline.pipeline_logger.error(
+                        f"💥 Recuperação do item #{post['id']} falhou: {e}"
+                    )
+
+                if notify and post["user_id"]:
+                    try:
+                        await notify(post["user_id"], message)
+                    except Exception as e:
+                        logger.warning(f"⚠️ Falha ao notificar recuperação: {e}")
+
+        await asyncio.gather(*(recover(post) for post in posts))
+
+        pipeline.pipeline_logger.info(f"♻️ Recuperação concluída: {self.summary}")
+        return self.summary
+
+    async def _resume_processing(self, post: Dict) -> str:
+        """Fazer ou refazer GPT/revisão (reaproveitando o resultado GPT salvo)"""
+        pipeline = self.pipeline
+        meta = post["metadata"]
+
+        if not os.path.exists(post["file_path"]):
+            await pipeline.executor.run_io(
+                pipeline.update_metadata,
+                post["id"],
+                {
+                    "status": "erro",
+                    "error": "Arquivo HTML não encontrado na recuperação",
+                    "error_at": datetime.now().isoformat(),
+                },
+            )
+            self.summary["failed"] += 1
+            return f"❌ `#{post['id']}` interrompido e o HTML não existe mais"
+
+        cached = meta.get("generated", {}).get("processed_content")
+        result = await pipeline.process_pipeline_with_review(
+            post["file_path"], post["user_id"], meta, post["id"], cached
+        )
+
+        if result["status"] != "awaiting_approval":
+            self.summary["failed"] += 1
+            return f"❌ `#{post['id']}` retomado após reinício, mas falhou: {result['error']}"
+
+        self.summary["reprocessed"] += 1
+        source = "conteúdo GPT reaproveitado" if cached else "processado novamente"
+        return (
+            f"♻️ `#{post['id']}` retomado após reinício ({source}).\n"
+            f"Aguardando aprovação: `/pending {post['id']}`"
+        )
+
+    async def _resume_publishing(self, post: Dict, already_published: bool) -> str:
+        """Confirmar no audit antes de publicar de novo"""
+        pipeline = self.pipeline
+        meta = post["metadata"]
+        approval = meta.get("approval", {})
+
+        if already_published:
+            await pipeline.executor.run_io(
+                pipeline.move_to_enviados,
+                post["file_path"],
+                post["id"],
+                {
+                    "status": "publicado",
+                    "published_at": datetime.now().isoformat(),
+                    "final_content": approval.get("processed_content", ""),
+                    "recovered": True,
+                },
+            )
+            await pipeline.executor.run_io(
+                pipeline.scheduler.complete, post["id"], "publicado"
+            )
+            self.summary["verified"] += 1
+            return f"✅ `#{post['id']}` já tinha sido publicado antes do reinício"
+
+        if not RECOVERY_REPUBLISH or not approval:
+            await pipeline.executor.run_io(
+                pipeline.update_metadata,
+                post["id"],
+                {
+                    "status": "aguardando_aprovacao",
+                    "recovered_at": datetime.now().isoformat(),
+                },
+            )
+            # Libera o slot "publicando" reservado antes do reinício
+            await pipeline.executor.run_io(pipeline.scheduler.complete, post["id"], "erro")
+            self.summary["awaiting_approval"] += 1
+            return (
+                f"⚠️ Publicação de `#{post['id']}` interrompida pelo reinício.\n"
+                f"Use `/approve {post['id']}` para publicar."
+            )
+
+        # Republicação passa pelo agendador (horário comercial e limite diário)
+        target = await pipeline.executor.run_io(
+            pipeline.scheduler.place, post["id"], post["user_id"], meta.get("title", "")
+        )
+        if target:
+            await pipeline.executor.run_io(
+                pipeline.update_metadata,
+                post["id"],
+                {
+                    "status": "agendado",
+                    "scheduled_for": target.isoformat(),
+                    "recovered_at": datetime.now().isoformat(),
+                },
+            )
+            self.summary["scheduled"] += 1
+            return (
+                f"📅 Publicação de `#{post['id']}` interrompida pelo reinício; "
+                f"reagendada para {target.strftime('%d/%m %H:%M')}.\n"
+                f"Use `/cancel {post['id']}` para cancelar."
+            )
+
+        pipeline.publishing.add(post["id"])
+        try:
+            result = await pipeline.publish_approved_content(post["user_id"], post["id"])
+        finally:
+            pipeline.publishing.discard(post["id"])
+
+        if result["status"] == "unknown":
+            self.summary["failed"] += 1
+            return (
+                f"❓ Republicação de `#{post['id']}` sem resultado confirmado: {result['error']}\n"
+                f"Confira no LinkedIn e use `/verify {post['id']} publicado|pendente`."
+            )
+
+        if result["status"] != "published":
+            self.summary["failed"] += 1
+            return (
+                f"❌ Republicação de `#{post['id']}` falhou: {result['error']}\n"
+                f"Use `/retry {post['id']}` para tentar novamente."
+            )
+
+        self.summary["published"] += 1
+        return f"✅ `#{post['id']}` publicado após reinício (não constava no audit)"
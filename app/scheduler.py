@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Scheduler - Agendamento de publicações em horários bons
+Posts aprovados fora do horário vão para o próximo slot livre; a fila é um
+heap por horário-alvo persistido no SQLite da fila (tabela schedule) e
+espelhado em memória para /agenda e para o despertar do publicador
+"""
+import os
+import heapq
+import threading
+from datetime import datetime, timedelta, time
+from typing import Dict, List, Optional, Tuple
+
+# Horários de publicação em dias úteis (HH:MM separados por vírgula)
+SCHEDULE_SLOTS = os.getenv("SCHEDULE_SLOTS", "09:00,12:30,17:30")
+
+# Máximo de publicações por conta por dia
+SCHEDULE_DAILY_CAP = int(os.getenv("SCHEDULE_DAILY_CAP", "2"))
+
+# Conta LinkedIn (limite diário é por conta)
+SCHEDULE_ACCOUNT = os.getenv("LINKEDIN_EMAIL") or "default"
+
+# Janela de publicação imediata (mesma do validate_posting_time)
+BUSINESS_START = time(8, 0)
+BUSINESS_END = time(18, 0)
+
+# Dias à frente procurados por um slot livre
+SCHEDULE_HORIZON_DAYS = 60
+
+# Estados que ocupam o limite diário ("verificar": pode ter sido publicado)
+CAP_STATUSES = ("agendado", "publicando", "publicado", "verificar")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS schedule (
+    post_id INTEGER PRIMARY KEY,
+    account TEXT NOT NULL,
+    user_id INTEGER,
+    title TEXT,
+    target_at TEXT NOT NULL,
+    status TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_schedule_target ON schedule(account, target_at);
+CREATE INDEX IF NOT EXISTS idx_schedule_status ON schedule(status);
+"""
+
+
+def parse_slots(value: str) -> List[time]:
+    """Converter "09:00,12:30" em horários ordenados"""
+    slots = set()
+    for part in value.split(","):
+        part = part.strip()
+        if part:
+            hour, minute = part.split(":")
+            slots.add(time(int(hour), int(minute)))
+    return sorted(slots)
+
+
+class PublishScheduler:
+    """Heap de publicações por horário-alvo com limite diário por conta"""
+
+    def __init__(
+        self,
+        store,
+        slots: Optional[List[time]] = None,
+        daily_cap: int = SCHEDULE_DAILY_CAP,
+        account: str = SCHEDULE_ACCOUNT,
+    ):
+        self.store = store
+        self.slots = slots or parse_slots(SCHEDULE_SLOTS)
+        self.daily_cap = daily_cap
+        self.account = account
+        self._lock = threading.Lock()
+        self._heap: List[Tuple[datetime, int]] = []
+        self._entries: Dict[int, Dict] = {}  # post_id -> entrada ativa
+        self.store.connection.executescript(SCHEMA)
+        self.load()
+
+    def load(self) -> None:
+        """Carregar agendamentos pendentes do banco (inicialização)"""
+        rows = self.store.connection.execute(
+            "SELECT * FROM schedule WHERE status = 'agendado' AND account = ?",
+            (self.account,),
+        ).fetchall()
+        with self._lock:
+            self._entries = {}
+            for row in rows:
+                self._entries[row["post_id"]] = {
+                    "post_id": row["post_id"],
+                    "user_id": row["user_id"],
+                    "title": row["title"],
+                    "target_at": datetime.fromisoformat(row["target_at"]),
+                }
+            self._heap = [
+                (entry["target_at"], post_id) for post_id, entry in self._entries.items()
+            ]
+            heapq.heapify(self._heap)
+
+    def _daily_usage(self, start: datetime) -> Dict[str, Dict]:
+        """Uso por dia a partir de start: {data: {"count", "slots"}}"""
+        rows = self.store.connection.execute(
+            f"""
+            SELECT target_at FROM schedule
+            WHERE account = ? AND target_at >= ?
+              AND status IN ({', '.join('?' * len(CAP_STATUSES))})
+            """,
+            (self.account, start.replace(hour=0, minute=0, second=0).isoformat(), *CAP_STATUSES),
+        ).fetchall()
+
+        usage: Dict[str, Dict] = {}
+        for row in rows:
+            target = datetime.fromisoformat(row["target_at"])
+            day = usage.setdefault(target.date().isoformat(), {"count": 0, "slots": set()})
+            day["count"] += 1
+            day["slots"].add(target.time().replace(second=0, microsecond=0))
+        return usage
+
+    def is_good_time(self, now: datetime) -> bool:
+        """Dia útil dentro do horário comercial"""
+        return now.weekday() < 5 and BUSINESS_START <= now.time() <= BUSINESS_END
+
+    def next_slot(self, now: Optional[datetime] = None) -> datetime:
+        """Próximo slot livre respeitando o limite diário da conta"""
+        now = now or datetime.now()
+        usage = self._daily_usage(now)
+
+        for offset in range(SCHEDULE_HORIZON_DAYS):
+            day = (now + timedelta(days=offset)).date()
+            if day.weekday() >= 5:
+                continue
+            used = usage.get(day.isoformat(), {"count": 0, "slots": set()})
+            if used["count"] >= self.daily_cap:
+                continue
+            for slot in self.slots:
+                target = datetime.combine(day, slot)
+                if target > now and slot not in used["slots"]:
+                    return target
+
+        raise RuntimeError(
+            f"Nenhum slot livre nos próximos {SCHEDULE_HORIZON_DAYS} dias"
+        )
+
+    def place(
+        self, post_id: int, user_id: int, title: str = "", now: Optional[datetime] = None
+    ) -> Optional[datetime]:
+        """
+        Decidir publicação de um post aprovado: None = publicar agora (bom
+        horário e limite do dia livre); senão, o horário agendado
+        """
+        now = now or datetime.now()
+        with self._lock:
+            if self.is_good_time(now):
+                today = self._daily_usage(now).get(now.date().isoformat())
+                if not today or today["count"] < self.daily_cap:
+                    self._upsert(post_id, user_id, title, now, "publicando")
+                    return None
+
+        return self.schedule(post_id, user_id, title, now=now)
+
+    def schedule(
+        self, post_id: int, user_id: int, title: str = "", now: Optional[datetime] = None
+    ) -> datetime:
+        """Agendar no próximo slot livre"""
+        with self._lock:
+            # Reagendar: liberar o slot anterior antes de procurar
+            if post_id in self._entries:
+                self._upsert(post_id, user_id, title, self._entries[post_id]["target_at"], "reagendado")
+                del self._entries[post_id]
+
+            target = self.next_slot(now)
+            self._upsert(post_id, user_id, title, target, "agendado")
+            self._entries[post_id] = {
+                "post_id": post_id,
+                "user_id": user_id,
+                "title": title,
+                "target_at": target,
+            }
+            heapq.heappush(self._heap, (target, post_id))
+            return target
+
+    def _upsert(
+        self, post_id: int, user_id: int, title: str, target: datetime, status: str
+    ) -> None:
+        self.store.connection.execute(
+            """
+            INSERT INTO schedule (post_id, account, user_id, title, target_at, status, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(post_id) DO UPDATE SET
+                account = excluded.account, user_id = excluded.user_id,
+                title = excluded.title, target_at = excluded.target_at,
+                status = excluded.status, updated_at = excluded.updated_at
+            """,
+            (
+                post_id,
+                self.account,
+                user_id,
+                title,
+                target.isoformat(),
+                status,
+                datetime.now().isoformat(),
+            ),
+        )
+
+    def pop_due(self, now: Optional[datetime] = None) -> List[Dict]:
+        """Retirar do heap os agendamentos vencidos (entradas obsoletas são ignoradas)"""
+        now = now or datetime.now()
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                target, post_id = heapq.heappop(self._heap)
+                entry = self._entries.get(post_id)
+                if entry and entry["target_at"] == target:
+                    due.append(self._entries.pop(post_id))
+        return due
+
+    def complete(self, post_id: int, status: str) -> None:
+        """Registrar resultado (publicado, erro, cancelado); no-op se não agendado"""
+        with self._lock:
+            self._entries.pop(post_id, None)
+            self.store.connection.execute(
+                "UPDATE schedule SET status = ?, updated_at = ? WHERE post_id = ?",
+                (status, datetime.now().isoformat(), post_id),
+            )
+
+    def next_wakeup(self) -> Optional[datetime]:
+        """Horário do próximo agendamento ativo"""
+        with self._lock:
+            while self._heap:
+                target, post_id = self._heap[0]
+                entry = self._entries.get(post_id)
+                if entry and entry["target_at"] == target:
+                    return target
+                heapq.heappop(self._heap)  # entrada obsoleta
+        return None
+
+    def agenda(self, user_id: Optional[int] = None, limit: int = 20) -> List[Dict]:
+        """Agendamentos ativos em ordem de horário (direto da memória)"""
+        with self._lock:
+            entries = [
+                dict(entry)
+                for entry in self._entries.values()
+                if user_id is None or entry["user_id"] == user_id
+            ]
+        return sorted(entries, key=lambda entry: entry["target_at"])[:limit]
+
+    def count(self) -> int:
+        """Quantidade de agendamentos ativos"""
+        return len(self._entries)
+
+
+# Teste local
+if __name__ == "__main__":
+    import sys
+    import tempfile
+
+    from app.queue_store import QueueStore
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = QueueStore(os.path.join(tmp, "queue.db"))
+        scheduler = PublishScheduler(store, parse_slots("09:00,17:30"), daily_cap=2)
+
+        saturday_night = datetime(2026, 10, 17, 22, 0)  # sábado
+        monday_morning = datetime(2026, 10, 19, 10, 0)
+
+        first = scheduler.place(1, 7, "Post 1", now=saturday_night)
+        second = scheduler.place(2, 7, "Post 2", now=saturday_night)
+        third = scheduler.place(3, 7, "Post 3", now=saturday_night)
+        immediate = scheduler.place(4, 7, "Post 4", now=monday_morning)
+
+        reloaded = PublishScheduler(store, parse_slots("09:00,17:30"), daily_cap=2)
+        due = reloaded.pop_due(datetime(2026, 10, 19, 9, 0))
+
+        print(f"📅 {first} | {second} | {third} | agora={immediate}")
+        checks = [
+            first == datetime(2026, 10, 19, 9, 0),
+            second == datetime(2026, 10, 19, 17, 30),
+            third == datetime(2026, 10, 20, 9, 0),
+            immediate == datetime(2026, 10, 20, 17, 30),  # limite de segunda atingido
+            [entry["post_id"] for entry in due] == [1],
+            reloaded.next_wakeup() == datetime(2026, 10, 19, 17, 30),
+        ]
+        if not all(checks):
+            print(f"❌ Falhas: {checks}")
+            sys.exit(1)
+        print("✅ Agendamento por slots e limite diário consistentes")
@@ -3,17 +3,22 @@
 Telegram Bot para receber arquivos HTML e iniciar pipeline de processamento
 Sistema de produção com filas (pendentes → enviados) e logs por data
 """
+import io
 import os
-import json
+import re
+import hashlib
+import secrets
+import tempfile
 import logging
 import asyncio
 from datetime import datetime, time
 from pathlib import Path
-from typing import Optional, Dict, Tuple
+from typing import Optional, Dict, List, Tuple
 
 from dotenv import load_dotenv
 import requests
 from telegram import Update, Document
+from telegram.error import BadRequest
 from telegram.ext import (
     Application,
     CommandHandler,
@@ -24,9 +29,35 @@ from telegram.ext import (
 
 # Importar módulos do projeto
 from .post_processor import PostProcessor
-from .html_parser import HTMLParser, validate_html_file
-from .linkedin_poster import observability, logger
-from .content_reviewer import ContentReviewer  # 🆕 Revisor de conteúdo
+from .html_parser import HTMLParser, analyze_html_bytes
+from .executors import PipelineExecutor, EventLoopLagMonitor
+from .publisher_worker import PublisherClient
+from .queue_store import QueueStore
+from .queue_index import QueueIndex
+from .audit_stats import AuditStats
+from .recovery import PipelineRecovery
+from .scheduler import PublishScheduler
+from .concurrency import PerUserUpdateProcessor, StageLimits, UserLocks
+from .outbound import OutboundScheduler
+from .batch_upload import MediaGroupCollector, extract_html_from_zip
+from .metrics import (
+    METRICS_ENABLED,
+    PROCESS_RSS,
+    QUEUE_DEPTH,
+    MetricsServer,
+    record_cache,
+    stage_timer,
+)
+from .tracing import StatusCode, extract, get_tracer, get_tracer_provider, inject
+from .profiler import current_session, profiler
+from .memory import MemoryMonitor, format_bytes
+from .linkedin_poster import (
+    observability,
+    logger,
+    DailyFileHandler,
+    start_queue_logging,
+)
+from .content_reviewer import ContentReviewer, ReviewBatch  # 🆕 Revisor de conteúdo
 
 # Carregar configurações
 load_dotenv()
@@ -35,12 +66,38 @@ load_dotenv()
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 
+# Recebimento de updates: polling (padrão) ou webhook (servidor HTTP embutido)
+TELEGRAM_MODE = os.getenv("TELEGRAM_MODE", "polling").lower()
+TELEGRAM_WEBHOOK_URL = os.getenv("TELEGRAM_WEBHOOK_URL")  # URL pública (https)
+TELEGRAM_WEBHOOK_LISTEN = os.getenv("TELEGRAM_WEBHOOK_LISTEN", "0.0.0.0")
+TELEGRAM_WEBHOOK_PORT = int(os.getenv("TELEGRAM_WEBHOOK_PORT", "8443"))
+TELEGRAM_WEBHOOK_PATH = os.getenv("TELEGRAM_WEBHOOK_PATH", "telegram")
+TELEGRAM_WEBHOOK_SECRET = os.getenv("TELEGRAM_WEBHOOK_SECRET")
+# Bot API alternativa (servidor local ou fake para testes)
+TELEGRAM_API_BASE_URL = os.getenv("TELEGRAM_API_BASE_URL")
+
 # Sistema de filas em produção
 POSTS_BASE_DIR = "posts"
 POSTS_PENDENTES_DIR = os.path.join(POSTS_BASE_DIR, "pendentes")
 POSTS_ENVIADOS_DIR = os.path.join(POSTS_BASE_DIR, "enviados")
 POSTS_LOGS_DIR = os.path.join(POSTS_BASE_DIR, "logs")
 
+# Estados em que o item aparece na fila de aprovações do usuário
+APPROVAL_STATUSES = ("aguardando_aprovacao", "agendado", "publicando")
+
+# Publicação com resultado desconhecido (timeout/crash do worker): /verify
+VERIFY_STATUS = "verificar"
+APPROVAL_LIST_LIMIT = 50
+
+# Linhas por seção no resumo de lote (limite de tamanho da mensagem)
+BATCH_SUMMARY_LINES = 25
+
+# Limite de download de arquivos da Bot API
+TELEGRAM_DOWNLOAD_LIMIT = 20 * 1024 * 1024
+
+# Trace de cada post: download → GPT → revisão → aprovação → publicação
+tracer = get_tracer(__name__)
+
 # Configurar diretórios de produção
 for directory in [
     POSTS_BASE_DIR,
@@ -51,38 +108,117 @@ for directory in [
     os.makedirs(directory, exist_ok=True)
 
 
+class HashingBuffer(io.BytesIO):
+    """Buffer em memória que calcula o SHA-256 enquanto o download é escrito"""
+
+    def __init__(self):
+        super().__init__()
+        self.sha256 = hashlib.sha256()
+
+    def write(self, data) -> int:
+        self.sha256.update(data)
+        return super().write(data)
+
+
 class TelegramPipeline:
     """Gerenciador do pipeline Telegram → GPT → Revisão → LinkedIn com sistema de filas de produção"""
 
     def __init__(self):
-        self.processor = PostProcessor()
+        # Selenium em processo dedicado (iniciado antes dos pools de threads)
+        self.publisher = PublisherClient()
+        self.publisher.start()
+
+        # Pools para trabalho bloqueante (parsing, OpenAI, arquivos)
+        self.executor = PipelineExecutor()
+        self.processor = PostProcessor(executor=self.executor)
         self.html_parser = HTMLParser()
         self.reviewer = ContentReviewer()  # 🆕 Revisor
+        self.stage_limits = StageLimits()  # Semáforos de GPT e navegador
+        self.user_locks = UserLocks()  # Mudanças de fila x comandos do usuário
+        self.outbound = OutboundScheduler()  # Limites de envio ao Telegram
         self.authorized_users = self._get_authorized_users()
         self.setup_daily_logger()
 
-        # 🆕 Sistema de aprovação temporária
-        self.pending_approvals = (
-            {}
-        )  # {user_id: {content, file_path, execution_id, etc}}
+        # Estado da fila em SQLite (importa sidecars legados na primeira execução)
+        self.store = QueueStore()
+        if self.store.is_empty():
+            migrated = self.store.migrate_sidecars(
+                {"pendentes": POSTS_PENDENTES_DIR, "enviados": POSTS_ENVIADOS_DIR}
+            )
+            if migrated["imported"]:
+                self.pipeline_logger.info(
+                    f"📦 {migrated['imported']} metadata.json importados para o SQLite"
+                )
+
+        self.lag_monitor = EventLoopLagMonitor(logger=self.pipeline_logger)
+
+        # Publicações agendadas por slot (heap persistido no mesmo SQLite)
+        self.scheduler = PublishScheduler(self.store)
+        self._wakeup_handle = None  # fallback sem JobQueue
+
+        # Contadores do CSV de auditoria (leitura incremental com checkpoint)
+        self.audit_stats = AuditStats(observability.csv_log_file)
+
+        # Índice em memória das filas (comandos de fila sem os.listdir)
+        self.index = QueueIndex(
+            {
+                "pendentes": (POSTS_PENDENTES_DIR, ".html"),
+                "enviados": (POSTS_ENVIADOS_DIR, ".html"),
+                "logs": (POSTS_LOGS_DIR, ".log"),
+            }
+        )
+        self.index.start_watching()
+
+        # Aprovações ficam no queue store (sobrevivem a reinícios); aqui só o
+        # que está sendo publicado neste processo
+        self.publishing = set()  # IDs de aprovação
+
+        # Usuários que pediram /edit sem texto: {user_id: approval_id}
+        self.awaiting_edits = {}
+
+        # Álbuns de arquivos HTML sendo recebidos (um lote por álbum)
+        self.media_groups = MediaGroupCollector()
+
+        # /metrics: profundidade das filas lida do SQLite a cada scrape
+        QUEUE_DEPTH.collect = self.queue_depths
+        self.metrics_server: Optional[MetricsServer] = None
+
+        # RSS do bot e dos filhos (worker, navegador, pool) + tracemalloc
+        self.memory = MemoryMonitor(roles=self.process_roles)
+        PROCESS_RSS.collect = lambda: {
+            (role,): rss for role, rss in self.memory.rss().items()
+        }
+
+    def process_roles(self) -> Dict[int, str]:
+        """Papéis dos processos filhos conhecidos (o resto vem da árvore)"""
+        roles = {pid: "parser_pool" for pid in self.executor.process_pids()}
+        if self.publisher.worker_pid:
+            roles[self.publisher.worker_pid] = "publisher_worker"
+        return roles
+
+    def queue_depths(self) -> Dict[Tuple[str], int]:
+        """Itens por estado (contadores transacionais) + álbuns em recebimento"""
+        depths = {(status,): total for status, total in self.store.count_by_status().items()}
+        depths[("album_recebendo",)] = self.media_groups.pending()
+        return depths
 
     def setup_daily_logger(self):
-        """Configurar logger por data (YYYY-MM-DD.log)"""
+        """Configurar logger por data (YYYY-MM-DD.log, troca à meia-noite)"""
         today = datetime.now().strftime("%Y-%m-%d")
-        log_file = os.path.join(POSTS_LOGS_DIR, f"{today}.log")
 
         # Configurar handler específico para o pipeline
-        self.pipeline_logger = logging.getLogger(f"pipeline_{today}")
+        self.pipeline_logger = logging.getLogger("pipeline")
         self.pipeline_logger.setLevel(logging.INFO)
 
         # Evitar duplicação de handlers
         if not self.pipeline_logger.handlers:
-            handler = logging.FileHandler(log_file, encoding="utf-8")
+            handler = DailyFileHandler(POSTS_LOGS_DIR)
             formatter = logging.Formatter(
                 "%(asctime)s - %(levelname)s - %(message)s", datefmt="%H:%M:%S"
             )
             handler.setFormatter(formatter)
-            self.pipeline_logger.addHandler(handler)
+            # Escrita em arquivo na thread do listener, fora do event loop
+            start_queue_logging(self.pipeline_logger, handler)
 
         self.pipeline_logger.info(f"📅 Pipeline iniciado - {today}")
 
@@ -141,7 +277,7 @@ class TelegramPipeline:
         return validation
 
     def create_standardized_filename(
-        self, document: Document, metadata: Dict
+        self, file_name: Optional[str], metadata: Dict
     ) -> Tuple[str, str]:
         """Criar nome de arquivo padronizado na fila de pendentes"""
 
@@ -150,9 +286,9 @@ class TelegramPipeline:
 
         # Slug do título
         title = metadata.get("title", "")
-        if not title and document.file_name:
+        if not title and file_name:
             # Usar nome do arquivo original como fallback
-            title = Path(document.file_name).stem
+            title = Path(file_name).stem
 
         slug = self.html_parser.create_slug(title) if title else "sem_titulo"
 
@@ -169,19 +305,71 @@ class TelegramPipeline:
 
         return filepath, filename
 
+    def store_pending_file(
+        self, data: bytes, file_name: Optional[str], metadata: Dict
+    ) -> Tuple[str, str]:
+        """
+        Gravar o HTML na fila de pendentes: arquivo temporário único (oculto
+        para o índice) publicado com link sem sobrescrita, então dois uploads
+        no mesmo segundo nunca disputam o mesmo nome
+        """
+        fd, temp_path = tempfile.mkstemp(
+            dir=POSTS_PENDENTES_DIR, prefix=".upload_", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+
+            while True:
+                final_path, filename = self.create_standardized_filename(
+                    file_name, metadata
+                )
+                try:
+                    os.link(temp_path, final_path)  # falha se o nome já existe
+                    return final_path, filename
+                except FileExistsError:
+                    continue  # outro upload ocupou o nome; tentar o próximo
+                except OSError:
+                    # Sistema de arquivos sem hard links: rename atômico
+                    os.replace(temp_path, final_path)
+                    return final_path, filename
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
     def save_metadata(
         self, filepath: str, metadata: Dict, document: Document, user_id: int
-    ) -> str:
-        """Salvar metadata.json junto com o arquivo HTML"""
+    ) -> Optional[int]:
+        """Registrar metadata do arquivo HTML no queue store; retorna o ID do item"""
+        full_metadata = self.build_item_metadata(
+            metadata,
+            {
+                "file_name": document.file_name,
+                "file_size": document.file_size,
+                "mime_type": document.mime_type,
+            },
+            user_id,
+        )
+
+        try:
+            post_id = self.store.add_post(filepath, full_metadata, user_id)
+
+            self.pipeline_logger.info(
+                f"📋 Metadata salvo: #{post_id} {os.path.basename(filepath)}"
+            )
+            return post_id
+
+        except Exception as e:
+            self.pipeline_logger.error(f"❌ Erro ao salvar metadata: {e}")
+            return None
 
-        # Criar metadata expandido
-        full_metadata = {
+    def build_item_metadata(self, metadata: Dict, file_info: Dict, user_id: int) -> Dict:
+        """Metadata expandido de um item novo da fila"""
+        return {
             **metadata,
             "telegram": {
                 "user_id": user_id,
-                "file_name": document.file_name,
-                "file_size": document.file_size,
-                "mime_type": document.mime_type,
+                **file_info,
                 "received_at": datetime.now().isoformat(),
             },
             "processing": {
@@ -202,103 +390,181 @@ class TelegramPipeline:
             },
         }
 
-        # Caminho do metadata
-        metadata_path = filepath.replace(".html", ".metadata.json")
-
-        try:
-            with open(metadata_path, "w", encoding="utf-8") as f:
-                json.dump(full_metadata, f, indent=2, ensure_ascii=False)
-
-            self.pipeline_logger.info(
-                f"📋 Metadata salvo: {os.path.basename(metadata_path)}"
-            )
-            return metadata_path
+    def update_metadata(
+        self, post_id: Optional[int], processing: Dict = None, extra: Dict = None
+    ) -> None:
+        """Mudança de estado transacional (processing e campos extras) no queue store"""
+        if post_id is None:
+            return
+        self.store.transition(post_id, processing, extra)
+
+    def _approval_from_post(self, post: Dict) -> Optional[Dict]:
+        """Montar dados da aprovação a partir do item persistido"""
+        meta = post["metadata"]
+        approval = meta.get("approval")
+        if not approval:
+            return None
+
+        return {
+            "id": post["id"],
+            "post_id": post["id"],
+            "execution_id": approval["execution_id"],
+            "file_path": post["file_path"],
+            "processed_content": approval["processed_content"],
+            "review": meta.get("content_review", {}),
+            "original_metadata": meta,
+            "created_at": approval["created_at"],
+            "profile": approval.get("profile", False),
+            "status": post["status"],
+            "scheduled_for": meta["processing"].get("scheduled_for"),
+            "publishing": post["status"] == "publicando"
+            or post["id"] in self.publishing,
+        }
 
-        except Exception as e:
-            self.pipeline_logger.error(f"❌ Erro ao salvar metadata: {e}")
-            return ""
+    def list_approvals(self, user_id: int) -> List[Dict]:
+        """Aprovações pendentes do usuário (mais antigas primeiro)"""
+        posts = self.store.list_posts(
+            APPROVAL_STATUSES, user_id=user_id, limit=APPROVAL_LIST_LIMIT
+        )
+        approvals = [self._approval_from_post(post) for post in posts]
+        return [approval for approval in approvals if approval]
+
+    def get_approval(self, user_id: int, approval_id: int) -> Optional[Dict]:
+        """Aprovação pelo ID, se pertencer ao usuário"""
+        post = self.store.get_post(approval_id)
+        if not post or post["user_id"] != user_id:
+            return None
+        if post["status"] not in APPROVAL_STATUSES:
+            return None
+        return self._approval_from_post(post)
 
     def get_queue_position(self) -> int:
         """Obter posição atual na fila de pendentes"""
-        try:
-            files = [f for f in os.listdir(POSTS_PENDENTES_DIR) if f.endswith(".html")]
-            return len(files) + 1
-        except:
-            return 1
+        return self.index.count("pendentes") + 1
 
     def move_to_enviados(
-        self, pendente_path: str, metadata_path: str
-    ) -> Tuple[str, str]:
-        """Mover arquivo processado de pendentes para enviados"""
-        try:
-            filename = os.path.basename(pendente_path)
-            metadata_filename = os.path.basename(metadata_path)
+        self, pendente_path: str, post_id: Optional[int], processing: Dict = None
+    ) -> str:
+        """
+        Mover arquivo processado de pendentes para enviados
+        O estado final (processing) é gravado na mesma transação da mudança de
+        fila; mover o arquivo é melhor esforço e não impede gravar o estado
+        """
+        filename = os.path.basename(pendente_path)
 
-            # Caminhos de destino
-            enviado_path = os.path.join(POSTS_ENVIADOS_DIR, filename)
-            enviado_metadata_path = os.path.join(POSTS_ENVIADOS_DIR, metadata_filename)
+        # Caminho de destino
+        enviado_path = os.path.join(POSTS_ENVIADOS_DIR, filename)
 
-            # Mover arquivos
+        # Mover arquivo
+        try:
             os.rename(pendente_path, enviado_path)
+            self.index.move("pendentes", "enviados", filename)
+            final_path = enviado_path
+        except OSError as e:
+            # Post já publicado: não pode continuar em "publicando" por causa do arquivo
+            self.pipeline_logger.warning(
+                f"⚠️ Arquivo mantido em pendentes ({filename}): {e}"
+            )
+            final_path = pendente_path
 
-            # Atualizar metadata antes de mover
-            if os.path.exists(metadata_path):
-                with open(metadata_path, "r") as f:
-                    meta = json.load(f)
-                meta["processing"]["status"] = "enviado"
-                meta["processing"]["queue"] = "enviados"
-                meta["processing"]["moved_to_enviados_at"] = datetime.now().isoformat()
-
-                with open(metadata_path, "w") as f:
-                    json.dump(meta, f, indent=2)
-
-                os.rename(metadata_path, enviado_metadata_path)
+        try:
+            if post_id is not None:
+                self.store.transition(
+                    post_id,
+                    {
+                        "status": "enviado",
+                        "moved_to_enviados_at": datetime.now().isoformat(),
+                        **(processing or {}),
+                    },
+                    queue="enviados" if final_path == enviado_path else None,
+                    file_path=final_path,
+                )
+        except Exception as e:
+            self.pipeline_logger.error(f"❌ Erro ao registrar envio: {e}")
+            return final_path
 
+        if final_path == enviado_path:
             self.pipeline_logger.info(f"📤 Movido para enviados: {filename}")
-            return enviado_path, enviado_metadata_path
+        return final_path
 
-        except Exception as e:
-            self.pipeline_logger.error(f"❌ Erro ao mover para enviados: {e}")
-            return pendente_path, metadata_path
+    def end_trace(
+        self, trace: Optional[Dict], outcome: str, attributes: Optional[Dict] = None
+    ) -> None:
+        """Finalizar o span raiz do post (aberto no upload) com o desfecho"""
+        root = tracer.resume_span("post", trace, {**(attributes or {}), "outcome": outcome})
+        if root:
+            root.set_status(StatusCode.OK)
+            root.end()
 
     async def download_and_validate_file(
         self, document: Document, context: ContextTypes.DEFAULT_TYPE, user_id: int
     ) -> Optional[Dict]:
-        """Baixar arquivo e fazer validação completa na fila de pendentes"""
+        """
+        Baixar arquivo em memória, validar e gravar uma vez na fila de pendentes
+        Abre o span raiz do post; o contexto fica no metadata (metadata["trace"])
+        e o span só é finalizado na publicação ou no cancelamento
+        """
+        root = tracer.start_span(
+            "post", attributes={"file_name": document.file_name, "user_id": user_id}
+        )
+        with tracer.start_as_current_span("download", root) as span:
+            result = await self._download_and_store(document, user_id, inject(root))
+            span.set_attribute("status", result["status"])
+            if result["status"] == "success":
+                span.set_attribute("post_id", result["post_id"])
+            else:
+                span.set_status(StatusCode.ERROR, result.get("error", "arquivo inválido"))
+
+        if result["status"] != "success":
+            root.set_status(StatusCode.ERROR, result["status"])
+            root.end()
+        return result
+
+    async def _download_and_store(
+        self, document: Document, user_id: int, trace: Dict
+    ) -> Dict:
+        """Download, validação e gravação (corpo de download_and_validate_file)"""
         try:
-            # 1. Baixar arquivo temporário primeiro
-            temp_path = f"{POSTS_PENDENTES_DIR}/temp_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
-
+            # 1. Baixar para memória calculando o hash durante a escrita
+            buffer = HashingBuffer()
             file = await document.get_file()
-            await file.download_to_drive(temp_path)
+            await file.download_to_memory(buffer)
+            data = buffer.getvalue()
+            content_sha256 = buffer.sha256.hexdigest()
 
             self.pipeline_logger.info(
-                f"📥 Arquivo temporário baixado: {os.path.basename(temp_path)}"
+                f"📥 Arquivo baixado em memória: {document.file_name} "
+                f"({len(data)} bytes, sha256 {content_sha256[:12]})"
             )
 
-            # 2. Validar conteúdo HTML
-            validation = validate_html_file(temp_path)
+            # 2. Validar e extrair metadados do buffer (um parse no pool de processos)
+            validation, metadata = await self.executor.run_cpu(
+                analyze_html_bytes, data, document.file_name or ""
+            )
 
             if not validation["valid"]:
-                # Remover arquivo temporário se inválido
-                os.remove(temp_path)
+                # Nada foi gravado em disco
                 self.pipeline_logger.warning(
-                    f"❌ Arquivo inválido removido: {document.file_name}"
+                    f"❌ Arquivo inválido descartado: {document.file_name}"
                 )
                 return {"status": "invalid", "validation": validation}
 
-            # 3. Extrair metadados
-            metadata = self.html_parser.extract_metadata(temp_path)
             metadata.update(validation)  # Incluir dados de validação
+            metadata["content_sha256"] = content_sha256
+            metadata["trace"] = trace
+
+            # 3. Gravar com nome padronizado (escrita única e atômica) e
+            # 4. registrar metadata no queue store; só aqui o lock do usuário
+            async with self.user_locks.hold(user_id):
+                final_path, filename = await self.executor.run_io(
+                    self.store_pending_file, data, document.file_name, metadata
+                )
+                metadata["file_path"] = final_path
+                self.index.add("pendentes", filename)
 
-            # 4. Criar nome de arquivo padronizado na fila
-            final_path, filename = self.create_standardized_filename(document, metadata)
-
-            # 5. Mover arquivo para nome final na fila de pendentes
-            os.rename(temp_path, final_path)
-
-            # 6. Salvar metadata.json
-            metadata_path = self.save_metadata(final_path, metadata, document, user_id)
+                post_id = await self.executor.run_io(
+                    self.save_metadata, final_path, metadata, document, user_id
+                )
 
             queue_position = (
                 self.get_queue_position() - 1
@@ -311,25 +577,184 @@ class TelegramPipeline:
                 "status": "success",
                 "file_path": final_path,
                 "filename": filename,
-                "metadata_path": metadata_path,
+                "post_id": post_id,
                 "metadata": metadata,
                 "validation": validation,
                 "queue_position": queue_position,
             }
 
         except Exception as e:
-            # Limpar arquivo temporário se existir
-            if "temp_path" in locals() and os.path.exists(temp_path):
-                os.remove(temp_path)
-
             self.pipeline_logger.error(f"❌ Erro ao processar arquivo: {e}")
             return {"status": "error", "error": str(e)}
 
+    async def ingest_batch(
+        self, files: List[Tuple[str, bytes]], user_id: int, source: str
+    ) -> Dict:
+        """
+        Validar um lote de HTML em paralelo (pool de processos) e registrar
+        todos os válidos na fila de pendentes em uma única transação
+        """
+        batch_started = int(datetime.now().timestamp() * 1e9)
+        analyses = await asyncio.gather(
+            *(
+                self.executor.run_cpu(analyze_html_bytes, data, name)
+                for name, data in files
+            )
+        )
+
+        valid, rejected, seen = [], [], {}
+        for (name, data), (validation, metadata) in zip(files, analyses):
+            if not validation["valid"]:
+                rejected.append({"name": name, "issues": validation["issues"]})
+                continue
+
+            content_sha256 = hashlib.sha256(data).hexdigest()
+            if content_sha256 in seen:
+                rejected.append(
+                    {"name": name, "issues": ["Conteúdo repetido no lote"]}
+                )
+                continue
+            seen[content_sha256] = name
+
+            metadata.update(validation)
+            metadata["content_sha256"] = content_sha256
+            valid.append((name, data, metadata))
+
+        # Um trace por post, começando junto com o lote
+        roots = []
+        for name, _, metadata in valid:
+            root = tracer.start_span(
+                "post",
+                context=None,
+                attributes={"file_name": name, "user_id": user_id, "batch": source},
+                start_time=batch_started,
+            )
+            metadata["trace"] = inject(root)
+            roots.append(root)
+
+        accepted = []
+        try:
+            if valid:
+                async with self.user_locks.hold(user_id):
+                    accepted = await self.executor.run_io(
+                        self.store_batch, valid, user_id, source
+                    )
+        except Exception:
+            for root in roots:
+                root.set_status(StatusCode.ERROR, "lote não registrado")
+                root.end()
+            raise
+
+        # Etapa de recebimento de cada post: o lote inteiro (análise + transação)
+        for root, item in zip(roots, accepted):
+            tracer.start_span(
+                "batch_ingest",
+                root,
+                {"post_id": item["post_id"], "source": source, "files": len(files)},
+                start_time=batch_started,
+            ).end()
+
+        self.pipeline_logger.info(
+            f"📦 Lote ({source}): {len(accepted)} na fila, {len(rejected)} rejeitados"
+        )
+        return {"accepted": accepted, "rejected": rejected}
+
+    def store_batch(
+        self, valid: List[Tuple[str, bytes, Dict]], user_id: int, source: str
+    ) -> List[Dict]:
+        """Gravar os HTML e registrar os itens numa transação (tudo ou nada)"""
+        written, items = [], []
+        try:
+            for name, data, metadata in valid:
+                final_path, _ = self.store_pending_file(data, name, metadata)
+                written.append(final_path)
+                metadata["file_path"] = final_path
+                file_info = {
+                    "file_name": name,
+                    "file_size": len(data),
+                    "mime_type": "text/html",
+                    "batch": source,
+                }
+                items.append(
+                    (final_path, self.build_item_metadata(metadata, file_info, user_id))
+                )
+
+            post_ids = self.store.add_posts(items, user_id)
+
+        except Exception:
+            for path in written:
+                if os.path.exists(path):
+                    os.remove(path)
+            raise
+
+        accepted = []
+        for (name, _, metadata), (final_path, _), post_id in zip(valid, items, post_ids):
+            filename = os.path.basename(final_path)
+            self.index.add("pendentes", filename)
+            accepted.append(
+                {
+                    "name": name,
+                    "post_id": post_id,
+                    "file_path": final_path,
+                    "filename": filename,
+                    "metadata": metadata,
+                }
+            )
+        return accepted
+
     async def process_pipeline_with_review(
-        self, file_path: str, user_id: int, metadata: Dict
+        self,
+        file_path: str,
+        user_id: int,
+        metadata: Dict,
+        post_id: int = None,
+        processed_content: Optional[str] = None,
+        review_batch: Optional[ReviewBatch] = None,
+    ) -> dict:
+        """
+        Executar pipeline com revisão pré-publicação
+        processed_content: resultado GPT já gerado (recuperação após reinício)
+        review_batch: revisão compartilhada com os outros itens do lote
+        """
+        # /profile next: cProfile + amostragem de pilhas só desta execução
+        with profiler.profile("process") as session, tracer.start_as_current_span(
+            "process",
+            extract(metadata.get("trace")),
+            {"user_id": user_id, "post_id": post_id, "resumed": bool(processed_content)},
+        ) as span:
+            try:
+                result = await self._process_pipeline_with_review(
+                    file_path, user_id, metadata, post_id, processed_content, review_batch
+                )
+            finally:
+                # Falha antes da revisão não pode segurar o resto do lote
+                if review_batch:
+                    review_batch.discard(str(post_id))
+            span.set_attribute("execution_id", result["execution_id"])
+            if result["status"] == "error":
+                span.set_status(StatusCode.ERROR, result["error"])
+            if session:
+                session.label = result["execution_id"]
+        return result
+
+    async def _process_pipeline_with_review(
+        self,
+        file_path: str,
+        user_id: int,
+        metadata: Dict,
+        post_id: Optional[int],
+        processed_content: Optional[str],
+        review_batch: Optional[ReviewBatch] = None,
     ) -> dict:
-        """Executar pipeline com revisão pré-publicação"""
-        execution_id = f"tg_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{user_id}"
+        """GPT + revisão (corpo de process_pipeline_with_review, dentro do span)"""
+        if post_id is None:
+            post = await self.executor.run_io(self.store.get_by_filename, file_path)
+            post_id = post["id"] if post else None
+
+        # ID do item no sufixo: vários uploads do mesmo usuário podem estar em andamento
+        execution_id = (
+            f"tg_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{user_id}_{post_id}"
+        )
         start_time = datetime.now()
 
         try:
@@ -339,55 +764,80 @@ class TelegramPipeline:
             )
 
             # 1. Atualizar metadata de status
-            metadata_path = file_path.replace(".html", ".metadata.json")
-            if os.path.exists(metadata_path):
-                with open(metadata_path, "r") as f:
-                    meta = json.load(f)
-                meta["processing"]["status"] = "processando"
-                meta["processing"]["pipeline_id"] = execution_id
-                with open(metadata_path, "w") as f:
-                    json.dump(meta, f, indent=2)
-
-            # 2. Processar com GPT
-            self.pipeline_logger.info("🤖 Processando conteúdo com GPT-4o-mini...")
-            processed_content = await self.processor.process_html_file(file_path)
+            await self.executor.run_io(
+                self.update_metadata,
+                post_id,
+                {"status": "processando", "pipeline_id": execution_id},
+            )
 
-            if not processed_content:
-                raise Exception("Falha no processamento GPT")
+            # 2. Processar com GPT (resultado guardado para retomar após crash)
+            if processed_content:
+                record_cache("gpt_result", hits=1)
+                self.pipeline_logger.info("♻️ Reaproveitando conteúdo GPT já gerado")
+            else:
+                record_cache("gpt_result", misses=1)
+                self.pipeline_logger.info("🤖 Processando conteúdo com GPT-4o-mini...")
+                async with self.stage_limits.gpt:
+                    processed_content = await self.processor.process_html_file(
+                        file_path
+                    )
+
+                if not processed_content:
+                    raise Exception("Falha no processamento GPT")
+
+                await self.executor.run_io(
+                    self.update_metadata,
+                    post_id,
+                    {"generated_at": datetime.now().isoformat()},
+                    {"generated": {"processed_content": processed_content}},
+                )
 
-            processing_time = int((datetime.now() - start_time).total_seconds() * 1000)
-            self.pipeline_logger.info(f"✅ GPT processado em {processing_time}ms")
+                processing_time = int(
+                    (datetime.now() - start_time).total_seconds() * 1000
+                )
+                self.pipeline_logger.info(f"✅ GPT processado em {processing_time}ms")
 
             # 3. 🆕 REVISÃO PRÉ-PUBLICAÇÃO
             self.pipeline_logger.info("📋 Iniciando revisão de conteúdo...")
-            review = self.reviewer.review_content(
-                processed_content, metadata.get("title", "")
-            )
+            if review_batch:
+                # Lote: uma revisão para todos (limite de GPT aplicado por requisição)
+                with stage_timer("review"):
+                    review = await review_batch.review(
+                        str(post_id), processed_content, metadata.get("title", "")
+                    )
+            else:
+                async with self.stage_limits.gpt:
+                    with stage_timer("review"):
+                        review = await self.executor.run_io(
+                            self.reviewer.review_content,
+                            processed_content,
+                            metadata.get("title", ""),
+                        )
 
             # Salvar review
-            review_path = self.reviewer.save_review(review, file_path)
+            review_path = await self.executor.run_io(
+                self.reviewer.save_review, review, file_path
+            )
             self.pipeline_logger.info(f"📋 Review salvo: {review_path}")
 
-            # Atualizar metadata com review
-            if os.path.exists(metadata_path):
-                with open(metadata_path, "r") as f:
-                    meta = json.load(f)
-                meta["processing"]["status"] = "aguardando_aprovacao"
-                meta["content_review"] = review
-                meta["review_path"] = review_path
-                with open(metadata_path, "w") as f:
-                    json.dump(meta, f, indent=2)
-
-            # 4. Armazenar para aprovação
-            self.pending_approvals[user_id] = {
-                "execution_id": execution_id,
-                "file_path": file_path,
-                "metadata_path": metadata_path,
-                "processed_content": processed_content,
-                "review": review,
-                "original_metadata": metadata,
-                "created_at": datetime.now().isoformat(),
-            }
+            # 4. Review e conteúdo gerado persistidos para aprovação (uma transação)
+            async with self.user_locks.hold(user_id):
+                await self.executor.run_io(
+                    self.update_metadata,
+                    post_id,
+                    {"status": "aguardando_aprovacao"},
+                    {
+                        "content_review": review,
+                        "review_path": review_path,
+                        "approval": {
+                            "execution_id": execution_id,
+                            "processed_content": processed_content,
+                            "created_at": datetime.now().isoformat(),
+                            # Publicação também perfilada no worker
+                            "profile": current_session() is not None,
+                        },
+                    },
+                )
 
             review_time = int((datetime.now() - start_time).total_seconds() * 1000)
             self.pipeline_logger.info(
@@ -396,6 +846,7 @@ class TelegramPipeline:
 
             return {
                 "status": "awaiting_approval",
+                "approval_id": post_id,
                 "execution_id": execution_id,
                 "processed_content": processed_content,
                 "review": review,
@@ -412,15 +863,15 @@ class TelegramPipeline:
             )
 
             # Atualizar metadata com erro
-            metadata_path = file_path.replace(".html", ".metadata.json")
-            if os.path.exists(metadata_path):
-                with open(metadata_path, "r") as f:
-                    meta = json.load(f)
-                meta["processing"]["status"] = "erro"
-                meta["processing"]["error"] = str(e)
-                meta["processing"]["error_at"] = datetime.now().isoformat()
-                with open(metadata_path, "w") as f:
-                    json.dump(meta, f, indent=2)
+            await self.executor.run_io(
+                self.update_metadata,
+                post_id,
+                {
+                    "status": "erro",
+                    "error": str(e),
+                    "error_at": datetime.now().isoformat(),
+                },
+            )
 
             return {
                 "status": "error",
@@ -429,75 +880,172 @@ class TelegramPipeline:
                 "duration_ms": error_time,
             }
 
-    async def publish_approved_content(self, user_id: int) -> dict:
+    async def revise_pending_content(
+        self, user_id: int, approval_id: int, revised_content: str
+    ) -> dict:
+        """Aplicar edição manual (/edit) com revisão incremental por sentença"""
+        approval_data = await self.executor.run_io(
+            self.get_approval, user_id, approval_id
+        )
+        if not approval_data:
+            return {"status": "error", "error": "Nenhum conteúdo aguardando aprovação"}
+
+        execution_id = approval_data["execution_id"]
+        post_id = approval_data["post_id"]
+        start_time = datetime.now()
+
+        try:
+            self.pipeline_logger.info(f"📝 Edição recebida: {execution_id}")
+            async with self.stage_limits.gpt:
+                with stage_timer(
+                    "review_edit", extract(approval_data["original_metadata"].get("trace"))
+                ):
+                    review = await self.executor.run_io(
+                        self.reviewer.review_revision,
+                        revised_content,
+                        approval_data["review"],
+                        approval_data["original_metadata"].get("title", ""),
+                    )
+
+            review_path = await self.executor.run_io(
+                self.reviewer.save_review, review, approval_data["file_path"]
+            )
+
+            await self.executor.run_io(
+                self.update_metadata,
+                post_id,
+                {
+                    "status": "aguardando_aprovacao",
+                    "edited_at": datetime.now().isoformat(),
+                    "scheduled_for": None,
+                },
+                {
+                    "content_review": review,
+                    "review_path": review_path,
+                    "approval": {
+                        "execution_id": execution_id,
+                        "processed_content": revised_content,
+                        "created_at": approval_data["created_at"],
+                        "profile": approval_data["profile"],
+                    },
+                },
+            )
+
+            # Conteúdo mudou: sai da agenda e precisa de nova aprovação
+            await self.executor.run_io(self.scheduler.complete, post_id, "editado")
+
+            duration_ms = int((datetime.now() - start_time).total_seconds() * 1000)
+            incremental = review["incremental"]
+            self.pipeline_logger.info(
+                f"🔁 Revisão incremental em {duration_ms}ms: "
+                f"{incremental['changed_sentences']} revisadas, "
+                f"{incremental['reused_sentences']} reaproveitadas"
+            )
+
+            return {
+                "status": "awaiting_approval",
+                "approval_id": approval_id,
+                "execution_id": execution_id,
+                "processed_content": revised_content,
+                "review": review,
+                "duration_ms": duration_ms,
+            }
+
+        except Exception as e:
+            duration_ms = int((datetime.now() - start_time).total_seconds() * 1000)
+            self.pipeline_logger.error(f"💥 Erro na edição {execution_id}: {e}")
+            return {
+                "status": "error",
+                "execution_id": execution_id,
+                "error": str(e),
+                "duration_ms": duration_ms,
+            }
+
+    async def publish_approved_content(self, user_id: int, approval_id: int) -> dict:
         """Publicar conteúdo aprovado pelo usuário"""
-        if user_id not in self.pending_approvals:
+        approval_data = await self.executor.run_io(
+            self.get_approval, user_id, approval_id
+        )
+        if not approval_data:
             return {"status": "error", "error": "Nenhum conteúdo aguardando aprovação"}
 
-        approval_data = self.pending_approvals[user_id]
         execution_id = approval_data["execution_id"]
         processed_content = approval_data["processed_content"]
         file_path = approval_data["file_path"]
-        metadata_path = approval_data["metadata_path"]
+        post_id = approval_data["post_id"]
+        trace = approval_data["original_metadata"].get("trace")
+        attributes = {"execution_id": execution_id, "post_id": post_id}
 
         start_time = datetime.now()
+        if trace:
+            # Tempo parado esperando o /approve (ou o horário agendado)
+            tracer.start_span(
+                "approval_wait",
+                extract(trace),
+                attributes,
+                start_time=int(
+                    datetime.fromisoformat(approval_data["created_at"]).timestamp() * 1e9
+                ),
+            ).end()
 
         try:
             # Atualizar status para publicando
-            if os.path.exists(metadata_path):
-                with open(metadata_path, "r") as f:
-                    meta = json.load(f)
-                meta["processing"]["status"] = "publicando"
-                meta["processing"]["approved_at"] = start_time.isoformat()
-                with open(metadata_path, "w") as f:
-                    json.dump(meta, f, indent=2)
-
-            # Publicar no LinkedIn
+            await self.executor.run_io(
+                self.update_metadata,
+                post_id,
+                {"status": "publicando", "approved_at": start_time.isoformat()},
+            )
+
+            # Publicar no LinkedIn (worker de publicação em outro processo)
             self.pipeline_logger.info(
                 f"🔗 Publicando conteúdo aprovado: {execution_id}"
             )
-            from .linkedin_poster import get_driver, login, publish_post
-
-            driver = None
-            try:
-                driver = get_driver()
-                login(driver, execution_id)
-                publish_post(driver, processed_content, execution_id)
-
-                # Mover para enviados após sucesso
-                enviado_path, enviado_metadata_path = self.move_to_enviados(
-                    file_path, metadata_path
-                )
-
-                # Atualizar metadata final
-                if os.path.exists(enviado_metadata_path):
-                    with open(enviado_metadata_path, "r") as f:
-                        meta = json.load(f)
-                    meta["processing"]["status"] = "publicado"
-                    meta["processing"]["published_at"] = datetime.now().isoformat()
-                    meta["processing"]["final_content"] = processed_content
-                    with open(enviado_metadata_path, "w") as f:
-                        json.dump(meta, f, indent=2)
-
-                # Limpar aprovação pendente
-                del self.pending_approvals[user_id]
-
-                total_time = int((datetime.now() - start_time).total_seconds() * 1000)
-                self.pipeline_logger.info(
-                    f"🎉 Publicação aprovada completa: {execution_id} em {total_time}ms"
+            # Timeout do worker só começa a contar com o navegador livre
+            with tracer.start_as_current_span(
+                "publish_job", extract(trace), attributes
+            ) as span:
+                async with self.stage_limits.browser:
+                    publish_result = await self.publisher.submit(
+                        execution_id,
+                        processed_content,
+                        inject(span),
+                        profile=approval_data["profile"],
+                    )
+                if publish_result["status"] != "published":
+                    span.set_status(StatusCode.ERROR, publish_result["error"])
+            if publish_result.get("outcome_unknown"):
+                return await self.mark_outcome_unknown(
+                    post_id, execution_id, publish_result, start_time
                 )
+            if publish_result["status"] != "published":
+                raise Exception(publish_result["error"])
+
+            # Mover para enviados e gravar estado final em uma transação
+            await self.executor.run_io(
+                self.move_to_enviados,
+                file_path,
+                post_id,
+                {
+                    "status": "publicado",
+                    "published_at": datetime.now().isoformat(),
+                    "final_content": processed_content,
+                },
+            )
+            await self.executor.run_io(self.scheduler.complete, post_id, "publicado")
+            self.end_trace(trace, "publicado", attributes)
 
-                return {
-                    "status": "published",
-                    "execution_id": execution_id,
-                    "processed_content": processed_content,
-                    "duration_ms": total_time,
-                    "moved_to": "enviados",
-                }
+            total_time = int((datetime.now() - start_time).total_seconds() * 1000)
+            self.pipeline_logger.info(
+                f"🎉 Publicação aprovada completa: {execution_id} em {total_time}ms"
+            )
 
-            finally:
-                if driver:
-                    driver.quit()
+            return {
+                "status": "published",
+                "execution_id": execution_id,
+                "processed_content": processed_content,
+                "duration_ms": total_time,
+                "moved_to": "enviados",
+            }
 
         except Exception as e:
             error_time = int((datetime.now() - start_time).total_seconds() * 1000)
@@ -507,6 +1055,17 @@ class TelegramPipeline:
 
             # Manter em pendentes com erro, mas não remover da aprovação
             # O usuário pode tentar novamente
+            await self.executor.run_io(
+                self.update_metadata,
+                post_id,
+                {
+                    "status": "aguardando_aprovacao",
+                    "publish_error": str(e),
+                    "error_at": datetime.now().isoformat(),
+                },
+            )
+            # Falha libera o slot/limite diário
+            await self.executor.run_io(self.scheduler.complete, post_id, "erro")
             return {
                 "status": "error",
                 "execution_id": execution_id,
@@ -515,8 +1074,53 @@ class TelegramPipeline:
             }
 
 
-# Instância global do pipeline
-pipeline = TelegramPipeline()
+    async def mark_outcome_unknown(
+        self, post_id: int, execution_id: str, publish_result: Dict, start_time: datetime
+    ) -> dict:
+        """
+        Timeout/crash com o navegador no meio da publicação: o post pode ter
+        saído. O item vai para "verificar" (fora da aprovação, segue contando
+        no limite diário) até o usuário confirmar com /verify
+        """
+        error = publish_result["error"]
+        self.pipeline_logger.error(
+            f"❓ Resultado desconhecido da publicação {execution_id}: {error}"
+        )
+        await self.executor.run_io(
+            self.update_metadata,
+            post_id,
+            {
+                "status": VERIFY_STATUS,
+                "publish_error": error,
+                "error_at": datetime.now().isoformat(),
+            },
+        )
+        await self.executor.run_io(self.scheduler.complete, post_id, VERIFY_STATUS)
+        return {
+            "status": "unknown",
+            "execution_id": execution_id,
+            "error": error,
+            "duration_ms": int((datetime.now() - start_time).total_seconds() * 1000),
+        }
+
+    def list_unverified(self, user_id: int) -> List[Dict]:
+        """Itens com resultado de publicação desconhecido, com a pista do audit"""
+        posts = self.store.list_posts(
+            (VERIFY_STATUS,), user_id=user_id, limit=APPROVAL_LIST_LIMIT
+        )
+        published = observability.audit.successful(
+            [post["execution_id"] for post in posts if post["execution_id"]],
+            "publish_post",
+        )
+        return [
+            {**post, "audit_published": post["execution_id"] in published}
+            for post in posts
+        ]
+
+
+# Instância global do pipeline, criada em main(): processos filhos (spawn)
+# reimportam este módulo como __mp_main__ e não podem iniciar outro pipeline
+pipeline: Optional[TelegramPipeline] = None
 
 
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -536,20 +1140,21 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         time_info += f"\n💡 {time_check['recommendations'][0]}"
 
     # Status da fila
-    pendentes = len([f for f in os.listdir(POSTS_PENDENTES_DIR) if f.endswith(".html")])
-    enviados = len([f for f in os.listdir(POSTS_ENVIADOS_DIR) if f.endswith(".html")])
+    pendentes = pipeline.index.count("pendentes")
+    enviados = pipeline.index.count("enviados")
 
-    # Verificar se tem aprovação pendente
+    # Verificar se tem aprovações pendentes
     approval_status = ""
-    if user_id in pipeline.pending_approvals:
+    approvals = await pipeline.executor.run_io(pipeline.list_approvals, user_id)
+    if approvals:
         approval_status = (
-            "\n🔔 **VOCÊ TEM CONTEÚDO AGUARDANDO APROVAÇÃO** - Use /pending"
+            f"\n🔔 **VOCÊ TEM {len(approvals)} CONTEÚDO(S) AGUARDANDO APROVAÇÃO** - Use /pending"
         )
 
     message = f"""
 🚀 **LinkedIn Content Pipeline Bot v2.6.1**
 
-Envie um arquivo HTML e eu vou:
+Envie um arquivo HTML (ou um .zip / álbum com vários) e eu vou:
 1. 📥 Adicionar à fila de **pendentes**
 2. 📋 Extrair metadados (título, descrição, etc.)
 3. 🤖 Processar com GPT-4o-mini
@@ -575,12 +1180,20 @@ Envie um arquivo HTML e eu vou:
 /queue - Status da fila
 /status - Ver status do sistema
 /stats - Estatísticas de uso
+/stats\\_rebuild - Recalcular contadores (recuperação)
+/profile next - Perfilar a próxima execução (`logs/profiles/`)
+/memory - Memória do bot, navegador e crescimento
 
 **📋 Comandos de aprovação:**
 /pending - Ver conteúdo aguardando aprovação
-/approve - Aprovar e publicar
-/cancel - Cancelar conteúdo
-/retry - Tentar publicar novamente
+/approve `<id>` - Aprovar e publicar
+/edit `<id>` - Enviar texto revisado (re-revisa só o que mudou)
+/cancel `<id>` - Cancelar conteúdo
+/retry `<id>` - Tentar publicar novamente
+/schedule `<id>` - Agendar no próximo horário livre
+/agenda - Ver publicações agendadas
+/verify - Resolver publicações com resultado desconhecido
+(com um único item pendente o ID é opcional)
 
 **Validações automáticas:**
 ✅ Conteúdo HTML válido
@@ -602,24 +1215,16 @@ async def queue_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         return
 
     try:
-        # Analisar fila de pendentes
-        pendentes_files = [
-            f for f in os.listdir(POSTS_PENDENTES_DIR) if f.endswith(".html")
-        ]
-        enviados_files = [
-            f for f in os.listdir(POSTS_ENVIADOS_DIR) if f.endswith(".html")
-        ]
-
-        # Próximos 3 na fila
-        next_in_queue = sorted(pendentes_files)[:3]
+        # Próximos 3 na fila (índice em memória)
+        next_in_queue = pipeline.index.head("pendentes", 3)
 
         # Últimos 3 enviados
-        last_sent = sorted(enviados_files, reverse=True)[:3]
+        last_sent = pipeline.index.tail("enviados", 3)
 
         queue_msg = f"""
 📊 **Status da Fila de Produção:**
 
-📂 **Pendentes: {len(pendentes_files)} arquivos**
+📂 **Pendentes: {pipeline.index.count("pendentes")} arquivos**
 """
 
         if next_in_queue:
@@ -631,7 +1236,7 @@ async def queue_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         else:
             queue_msg += "\n✅ Fila vazia\n"
 
-        queue_msg += f"\n📤 **Enviados: {len(enviados_files)} arquivos**"
+        queue_msg += f"\n📤 **Enviados: {pipeline.index.count('enviados')} arquivos**"
 
         if last_sent:
             queue_msg += "\n🎉 **Últimos enviados:**\n"
@@ -674,14 +1279,31 @@ async def status_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         status_msg += "❌ LinkedIn não configurado\n"
 
     # Verificar diretórios de produção
-    pendentes = len([f for f in os.listdir(POSTS_PENDENTES_DIR) if f.endswith(".html")])
-    enviados = len([f for f in os.listdir(POSTS_ENVIADOS_DIR) if f.endswith(".html")])
-    logs_count = len([f for f in os.listdir(POSTS_LOGS_DIR) if f.endswith(".log")])
+    pendentes = pipeline.index.count("pendentes")
+    enviados = pipeline.index.count("enviados")
+    logs_count = pipeline.index.count("logs")
 
     status_msg += f"📂 Pendentes: {pendentes}\n"
     status_msg += f"📤 Enviados: {enviados}\n"
     status_msg += f"📝 Logs diários: {logs_count}\n"
 
+    # Lag do event loop (trabalho bloqueante roda nos pools)
+    lag = pipeline.lag_monitor.stats()
+    status_msg += (
+        f"⏱️ Lag do event loop: p99 {lag['p99_ms']}ms, máx {lag['max_ms']}ms "
+        f"(alvo {lag['target_ms']:.0f}ms)\n"
+    )
+    stages = pipeline.stage_limits.stats()
+    status_msg += f"🚦 Etapas em uso: GPT {stages['gpt']}, navegador {stages['browser']}\n"
+    outbound = pipeline.outbound.stats()
+    status_msg += (
+        f"📨 Envios: {outbound['sent']} | edições juntadas {outbound['coalesced']}, "
+        f"descartadas {outbound['dropped']}, RetryAfter {outbound['retried']}\n"
+    )
+    if pipeline.metrics_server:
+        server = pipeline.metrics_server
+        status_msg += f"📈 Métricas: `http://{server.host}:{server.port}/metrics`\n"
+
     # Verificar horário atual
     time_check = pipeline.validate_posting_time()
     if time_check["warnings"]:
@@ -701,58 +1323,24 @@ async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         return
 
     try:
-        # Analisar arquivos metadata nas duas filas
-        pendentes_metadata = [
-            f for f in os.listdir(POSTS_PENDENTES_DIR) if f.endswith(".metadata.json")
-        ]
-        enviados_metadata = [
-            f for f in os.listdir(POSTS_ENVIADOS_DIR) if f.endswith(".metadata.json")
-        ]
-
-        published_count = 0
-        error_count = 0
-        processing_count = 0
-        pendente_count = 0
-
-        # Analisar pendentes
-        for meta_file in pendentes_metadata:
-            try:
-                with open(os.path.join(POSTS_PENDENTES_DIR, meta_file), "r") as f:
-                    meta = json.load(f)
-
-                status = meta.get("processing", {}).get("status", "unknown")
-                if status == "pendente":
-                    pendente_count += 1
-                elif status == "processando":
-                    processing_count += 1
-                elif status == "erro":
-                    error_count += 1
-            except:
-                continue
-
-        # Analisar enviados
-        for meta_file in enviados_metadata:
-            try:
-                with open(os.path.join(POSTS_ENVIADOS_DIR, meta_file), "r") as f:
-                    meta = json.load(f)
+        # Contagem por estado no queue store (coluna status indexada)
+        status_counts = await pipeline.executor.run_io(pipeline.store.count_by_status)
 
-                status = meta.get("processing", {}).get("status", "unknown")
-                if status in ["publicado", "enviado"]:
-                    published_count += 1
-            except:
-                continue
+        published_count = status_counts.get("publicado", 0) + status_counts.get(
+            "enviado", 0
+        )
+        error_count = status_counts.get("erro", 0)
+        processing_count = status_counts.get("processando", 0)
+        pendente_count = status_counts.get("pendente", 0)
 
-        # Ler estatísticas do CSV se existir
+        # Estatísticas do CSV: só as linhas novas desde o último checkpoint
         csv_stats = ""
-        csv_file = observability.csv_log_file
-        if os.path.exists(csv_file):
-            with open(csv_file, "r") as f:
-                lines = f.readlines()
-
-            total_records = len(lines) - 1  # -1 para header
-            telegram_pipelines = len([l for l in lines if "telegram_start" in l])
-            successes = len([l for l in lines if ",True," in l])
-            failures = len([l for l in lines if ",False," in l])
+        audit = await pipeline.executor.run_io(pipeline.audit_stats.refresh)
+        if audit["inode"] is not None:
+            total_records = audit["total_records"]
+            telegram_pipelines = audit["actions"].get("telegram_start", 0)
+            successes = audit["successes"]
+            failures = audit["failures"]
             success_rate = (
                 (successes * 100) // total_records if total_records > 0 else 0
             )
@@ -777,7 +1365,7 @@ async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
 
 📝 **Logs por Data:**
 • Log atual: `{datetime.now().strftime('%Y-%m-%d.log')}`
-• Total logs: {len([f for f in os.listdir(POSTS_LOGS_DIR) if f.endswith('.log')])}
+• Total logs: {pipeline.index.count("logs")}
 
 ⏰ **Horário atual:** {datetime.now().strftime('%H:%M - %A')}
 
@@ -791,87 +1379,430 @@ Para detalhes completos:
         await update.message.reply_text(f"❌ Erro ao obter estatísticas: {e}")
 
 
-async def approve_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Comando /approve - Aprovar conteúdo para publicação"""
+async def stats_rebuild_command(
+    update: Update, context: ContextTypes.DEFAULT_TYPE
+) -> None:
+    """Comando /stats_rebuild - Recalcular contadores do zero (recuperação)"""
     user_id = update.effective_user.id
 
     if not pipeline.is_authorized(user_id):
         await update.message.reply_text("❌ Usuário não autorizado")
         return
 
-    if user_id not in pipeline.pending_approvals:
-        await update.message.reply_text("❌ Nenhum conteúdo aguardando aprovação")
-        return
+    try:
+        status_counts = await pipeline.executor.run_io(pipeline.store.rebuild_counters)
+        audit = await pipeline.executor.run_io(pipeline.audit_stats.rebuild)
+        pipeline.pipeline_logger.info(
+            f"🔁 Contadores recalculados: {status_counts} | CSV {audit['total_records']} registros"
+        )
 
-    processing_msg = await update.message.reply_text(
-        "✅ Aprovado! Publicando no LinkedIn..."
-    )
+        await update.message.reply_text(
+            f"🔁 **Contadores recalculados**\n\n"
+            f"📋 Estados: {sum(status_counts.values())} itens\n"
+            f"📈 CSV Audit: {audit['total_records']} registros",
+            parse_mode="Markdown",
+        )
 
-    try:
-        # Publicar conteúdo aprovado
-        result = await pipeline.publish_approved_content(user_id)
+    except Exception as e:
+        await update.message.reply_text(f"❌ Erro ao recalcular estatísticas: {e}")
 
-        if result["status"] == "published":
-            success_msg = f"""
-✅ **PUBLICADO COM SUCESSO!**
 
-🆔 **ID:** `{result["execution_id"]}`
-⏱️ **Tempo:** {result["duration_ms"]}ms
-📤 **Status:** Movido para enviados
-🔗 **LinkedIn:** Post publicado!
+async def profile_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Comando /profile [next [n] | off] - Perfilar as próximas execuções"""
+    user_id = update.effective_user.id
 
-📝 **Log:** `{datetime.now().strftime('%Y-%m-%d.log')}`
-"""
-            await processing_msg.edit_text(success_msg, parse_mode="Markdown")
-        else:
-            error_msg = f"""
-❌ **Erro na publicação**
+    if not pipeline.is_authorized(user_id):
+        await update.message.reply_text("❌ Usuário não autorizado")
+        return
 
-🆔 **ID:** `{result["execution_id"]}`
-🚨 **Erro:** {result["error"]}
-⏱️ **Tempo:** {result["duration_ms"]}ms
+    args = [arg.lower() for arg in context.args or []]
+    if args and args[0] == "next":
+        count = int(args[1]) if len(args) > 1 and args[1].isdigit() else 1
+        armed = profiler.arm(count)
+        pipeline.pipeline_logger.info(f"🔬 Profiling armado por {user_id}: {armed}")
+        await update.message.reply_text(
+            f"🔬 Próxima(s) {armed} execução(ões) serão perfiladas "
+            "(processamento e publicação)"
+        )
+        return
+    if args and args[0] == "off":
+        profiler.disarm()
+        await update.message.reply_text("🔬 Profiling desarmado")
+        return
+    if args:
+        await update.message.reply_text("Uso: /profile [next [n] | off]")
+        return
 
-O conteúdo permanece aguardando aprovação.
-Use /retry para tentar novamente.
-"""
-            await processing_msg.edit_text(error_msg, parse_mode="Markdown")
+    message = f"🔬 **Profiling:** {profiler.armed} execução(ões) armada(s)\n"
+    if profiler.active:
+        message += f"⏳ Perfilando agora: `{profiler.active}`\n"
+    recent = await pipeline.executor.run_io(profiler.recent)
+    if recent:
+        message += "\n**Perfis recentes:**\n"
+        message += "\n".join(f"`{path}`" for path in recent)
+    await update.message.reply_text(message, parse_mode="Markdown")
 
-    except Exception as e:
-        await processing_msg.edit_text(f"❌ Erro inesperado na aprovação: {e}")
 
+def format_growth(growth: List[Tuple[str, int, int]], in_bytes: bool) -> str:
+    """Linhas do top de crescimento (tracemalloc em bytes, tipos em objetos)"""
+    lines = []
+    for name, delta, total in growth:
+        if in_bytes:
+            # Só pasta/arquivo:linha (caminhos completos estouram a mensagem)
+            location = "/".join(name.split(os.sep)[-2:])
+            lines.append(f"`{location}` +{format_bytes(delta)}")
+        else:
+            lines.append(f"`{name}` +{delta} ({total})")
+    return "\n".join(lines)
 
-async def cancel_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Comando /cancel - Cancelar conteúdo pendente"""
+
+async def memory_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Comando /memory [diff | trace on|off] - Memória e crescimento"""
     user_id = update.effective_user.id
 
     if not pipeline.is_authorized(user_id):
         await update.message.reply_text("❌ Usuário não autorizado")
         return
 
-    if user_id not in pipeline.pending_approvals:
-        await update.message.reply_text("❌ Nenhum conteúdo aguardando aprovação")
+    monitor = pipeline.memory
+    args = [arg.lower() for arg in context.args or []]
+    if args[:1] == ["trace"] and args[1:] in (["on"], ["off"]):
+        if args[1] == "on":
+            await pipeline.executor.run_io(monitor.start_tracing)
+            text = "🔍 tracemalloc ligado - use `/memory diff` para ver o crescimento"
+        else:
+            await pipeline.executor.run_io(monitor.stop_tracing)
+            text = "🔍 tracemalloc desligado"
+        await update.message.reply_text(text, parse_mode="Markdown")
+        return
+    if args and args != ["diff"]:
+        await update.message.reply_text("Uso: /memory [diff | trace on|off]")
         return
 
-    # Pegar dados da aprovação
-    approval_data = pipeline.pending_approvals[user_id]
-    execution_id = approval_data["execution_id"]
-    file_path = approval_data["file_path"]
-    metadata_path = approval_data["metadata_path"]
+    # Amostra nova (gc + tracemalloc) fora do event loop
+    if args == ["diff"] or monitor.baseline is None:
+        await pipeline.executor.run_io(monitor.sample)
+    summary = await pipeline.executor.run_io(monitor.summary)
 
-    # Atualizar metadata como cancelado
-    try:
-        if os.path.exists(metadata_path):
-            with open(metadata_path, "r") as f:
-                meta = json.load(f)
-            meta["processing"]["status"] = "cancelado"
-            meta["processing"]["cancelled_at"] = datetime.now().isoformat()
-            with open(metadata_path, "w") as f:
-                json.dump(meta, f, indent=2)
+    rss = summary["rss"]
+    if not rss:
+        await update.message.reply_text("❌ /proc indisponível: sem leitura de RSS")
+        return
 
-        # Remover da lista de aprovações
-        del pipeline.pending_approvals[user_id]
+    baseline = summary["baseline"]["rss"]
+    message = "🧠 **Memória (RSS):**\n\n"
+    for role, size in sorted(rss.items(), key=lambda item: -item[1]):
+        processes = sum(1 for process in summary["tree"] if process["role"] == role)
+        line = f"• `{role}`: {format_bytes(size)}"
+        if processes > 1:
+            line += f" ({processes} processos)"
+        if role in baseline:
+            line += f" | {format_bytes(size - baseline[role])} desde o início"
+        message += line + "\n"
+    message += (
+        f"📦 Total: {format_bytes(sum(rss.values()))} | pico do bot "
+        f"{format_bytes(max(summary['peak_bot'], rss.get('bot', 0)))}\n"
+        f"🕒 Amostras desde {summary['baseline']['timestamp']}: {summary['samples']}\n"
+    )
 
-        # Log do cancelamento
+    if summary["type_growth"]:
+        message += "\n🧩 **Objetos que mais cresceram:**\n"
+        message += format_growth(summary["type_growth"][:5], in_bytes=False) + "\n"
+
+    if summary["traced"]:
+        current, peak = summary["traced"]
+        message += (
+            f"\n🔍 **tracemalloc:** {format_bytes(current)} (pico {format_bytes(peak)})\n"
+        )
+        if summary["trace_total_growth"]:
+            message += format_growth(summary["trace_total_growth"][:5], in_bytes=True)
+    else:
+        message += "\n🔍 tracemalloc desligado (`/memory trace on`)"
+
+    await update.message.reply_text(message, parse_mode="Markdown")
+
+
+def parse_approval_id(token: str) -> Optional[int]:
+    """ID de aprovação em argumentos de comando ("12" ou "#12")"""
+    token = token.strip().lstrip("#")
+    return int(token) if token.isdigit() else None
+
+
+def format_approval_list(approvals: List[Dict], command: str) -> str:
+    """Lista curta das aprovações pendentes do usuário"""
+    lines = [f"📋 **Aprovações pendentes ({len(approvals)}):**", ""]
+    for approval in approvals:
+        title = approval["original_metadata"].get("title", "N/A")
+        state = " ⏳ publicando" if approval["publishing"] else ""
+        lines.append(f"• `#{approval['id']}` {title}{state}")
+    lines.append("")
+    lines.append(f"Informe o ID: `/{command} <id>`")
+    return "\n".join(lines)
+
+
+async def resolve_approval(
+    update: Update, user_id: int, approval_id: Optional[int], command: str
+) -> Optional[Dict]:
+    """
+    Escolher a aprovação alvo do comando: a do ID informado, ou a única
+    pendente; com várias e sem ID, mostra a lista e retorna None
+    """
+    if approval_id is not None:
+        approval = await pipeline.executor.run_io(
+            pipeline.get_approval, user_id, approval_id
+        )
+        if not approval:
+            await update.message.reply_text(
+                f"❌ Aprovação #{approval_id} não encontrada"
+            )
+        return approval
+
+    approvals = await pipeline.executor.run_io(pipeline.list_approvals, user_id)
+    if not approvals:
+        await update.message.reply_text("❌ Nenhum conteúdo aguardando aprovação")
+        return None
+
+    if len(approvals) == 1:
+        return approvals[0]
+
+    await update.message.reply_text(
+        format_approval_list(approvals, command), parse_mode="Markdown"
+    )
+    return None
+
+
+def command_approval_id(context: ContextTypes.DEFAULT_TYPE) -> Optional[int]:
+    """ID informado como primeiro argumento do comando, se houver"""
+    return parse_approval_id(context.args[0]) if context.args else None
+
+
+async def approve_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Comando /approve [id] - Aprovar conteúdo para publicação"""
+    user_id = update.effective_user.id
+
+    if not pipeline.is_authorized(user_id):
+        await update.message.reply_text("❌ Usuário não autorizado")
+        return
+
+    approval = await resolve_approval(
+        update, user_id, command_approval_id(context), "approve"
+    )
+    if not approval:
+        return
+
+    if approval["publishing"]:
+        await update.message.reply_text("⏳ Publicação já em andamento")
+        return
+
+    if approval["status"] == "agendado":
+        await update.message.reply_text(
+            f"📅 `#{approval['id']}` já está agendado para {approval['scheduled_for']}\n"
+            f"Use `/cancel {approval['id']}` para cancelar.",
+            parse_mode="Markdown",
+        )
+        return
+
+    if await place_approval(update, context, approval, user_id):
+        return
+
+    pipeline.publishing.add(approval["id"])
+    processing_msg = await update.message.reply_text(
+        f"✅ Aprovado `#{approval['id']}`! Publicando no LinkedIn...\n"
+        "⏳ O resultado chega aqui quando o navegador terminar.",
+        parse_mode="Markdown",
+    )
+
+    # Publicação roda no worker; o handler retorna e o bot segue atendendo
+    context.application.create_task(
+        publish_and_report(processing_msg, user_id, approval["id"], retry=False)
+    )
+
+
+async def publish_and_report(
+    processing_msg, user_id: int, approval_id: int, retry: bool
+) -> None:
+    """Aguardar o worker de publicação e editar a mensagem com o resultado"""
+    try:
+        # Publicar conteúdo aprovado
+        result = await pipeline.publish_approved_content(user_id, approval_id)
+
+        if result["status"] == "published" and not retry:
+            success_msg = f"""
+✅ **PUBLICADO COM SUCESSO!**
+
+🆔 **ID:** `{result["execution_id"]}`
+⏱️ **Tempo:** {result["duration_ms"]}ms
+📤 **Status:** Movido para enviados
+🔗 **LinkedIn:** Post publicado!
+
+📝 **Log:** `{datetime.now().strftime('%Y-%m-%d.log')}`
+"""
+            await processing_msg.edit_text(success_msg, parse_mode="Markdown")
+        elif result["status"] == "published":
+            success_msg = f"""
+✅ **PUBLICADO COM SUCESSO!** (retry)
+
+🆔 **ID:** `{result["execution_id"]}`
+⏱️ **Tempo:** {result["duration_ms"]}ms
+📤 **Status:** Movido para enviados
+🔗 **LinkedIn:** Post publicado!
+"""
+            await processing_msg.edit_text(success_msg, parse_mode="Markdown")
+        elif result["status"] == "unknown":
+            await processing_msg.edit_text(
+                format_unknown_outcome(approval_id, result), parse_mode="Markdown"
+            )
+        elif not retry:
+            error_msg = f"""
+❌ **Erro na publicação**
+
+🆔 **ID:** `{result.get("execution_id", approval_id)}`
+🚨 **Erro:** {result["error"]}
+⏱️ **Tempo:** {result.get("duration_ms", 0)}ms
+
+O conteúdo permanece aguardando aprovação.
+Use `/retry {approval_id}` para tentar novamente.
+"""
+            await processing_msg.edit_text(error_msg, parse_mode="Markdown")
+        else:
+            error_msg = f"""
+❌ **Retry falhou**
+
+🚨 **Erro:** {result["error"]}
+⏱️ **Tempo:** {result.get("duration_ms", 0)}ms
+
+Use `/cancel {approval_id}` para desistir ou `/retry {approval_id}` para tentar novamente.
+"""
+            await processing_msg.edit_text(error_msg, parse_mode="Markdown")
+
+    except Exception as e:
+        label = "no retry" if retry else "inesperado na aprovação"
+        await processing_msg.edit_text(f"❌ Erro {label}: {e}")
+
+    finally:
+        pipeline.publishing.discard(approval_id)
+
+
+def format_unknown_outcome(approval_id: int, result: Dict) -> str:
+    """Mensagem de publicação com resultado desconhecido (não volta à aprovação)"""
+    return f"""
+❓ **Resultado da publicação desconhecido**
+
+🆔 **ID:** `{result.get("execution_id", approval_id)}`
+🚨 **Erro:** {result["error"]}
+
+O navegador pode ter publicado antes de falhar. Confira no LinkedIn e use
+`/verify {approval_id} publicado` ou `/verify {approval_id} pendente` (volta para aprovação).
+"""
+
+
+async def verify_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Comando /verify [id publicado|pendente] - Resolver publicação desconhecida"""
+    user_id = update.effective_user.id
+
+    if not pipeline.is_authorized(user_id):
+        await update.message.reply_text("❌ Usuário não autorizado")
+        return
+
+    args = context.args or []
+    if not args:
+        posts = await pipeline.executor.run_io(pipeline.list_unverified, user_id)
+        if not posts:
+            await update.message.reply_text("✅ Nenhuma publicação a verificar")
+            return
+        lines = [
+            f"• `#{post['id']}` {post['metadata'].get('title', 'N/A')} - "
+            + ("audit registra sucesso" if post["audit_published"] else "sem registro no audit")
+            for post in posts
+        ]
+        await update.message.reply_text(
+            "❓ **Publicações com resultado desconhecido:**\n\n"
+            + "\n".join(lines)
+            + "\n\nUse `/verify <id> publicado` ou `/verify <id> pendente`.",
+            parse_mode="Markdown",
+        )
+        return
+
+    post_id = parse_approval_id(args[0])
+    outcome = args[1].lower() if len(args) > 1 else ""
+    post = None
+    if post_id is not None:
+        post = await pipeline.executor.run_io(pipeline.store.get_post, post_id)
+    if (
+        not post
+        or post["user_id"] != user_id
+        or post["status"] != VERIFY_STATUS
+        or outcome not in ("publicado", "pendente")
+    ):
+        await update.message.reply_text("Uso: /verify <id> publicado|pendente")
+        return
+
+    if outcome == "publicado":
+        approval = post["metadata"].get("approval", {})
+        await pipeline.executor.run_io(
+            pipeline.move_to_enviados,
+            post["file_path"],
+            post_id,
+            {
+                "status": "publicado",
+                "published_at": datetime.now().isoformat(),
+                "final_content": approval.get("processed_content", ""),
+                "verified": True,
+            },
+        )
+        await pipeline.executor.run_io(pipeline.scheduler.complete, post_id, "publicado")
+        text = f"✅ `#{post_id}` confirmado como publicado e movido para enviados"
+    else:
+        await pipeline.executor.run_io(
+            pipeline.update_metadata,
+            post_id,
+            {"status": "aguardando_aprovacao", "verified_at": datetime.now().isoformat()},
+        )
+        # Não publicado: libera o limite diário
+        await pipeline.executor.run_io(pipeline.scheduler.complete, post_id, "erro")
+        text = f"↩️ `#{post_id}` voltou para aprovação. Use `/approve {post_id}` para publicar."
+
+    pipeline.pipeline_logger.info(f"❓ Verificação de #{post_id}: {outcome}")
+    await update.message.reply_text(text, parse_mode="Markdown")
+
+
+async def cancel_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Comando /cancel [id] - Cancelar conteúdo pendente"""
+    user_id = update.effective_user.id
+
+    if not pipeline.is_authorized(user_id):
+        await update.message.reply_text("❌ Usuário não autorizado")
+        return
+
+    approval_data = await resolve_approval(
+        update, user_id, command_approval_id(context), "cancel"
+    )
+    if not approval_data:
+        return
+
+    if approval_data["publishing"]:
+        await update.message.reply_text("⏳ Publicação em andamento - aguarde o resultado")
+        return
+
+    # Pegar dados da aprovação
+    execution_id = approval_data["execution_id"]
+    post_id = approval_data["post_id"]
+
+    # Atualizar metadata como cancelado (sai da fila de aprovações)
+    try:
+        await pipeline.executor.run_io(
+            pipeline.update_metadata,
+            post_id,
+            {"status": "cancelado", "cancelled_at": datetime.now().isoformat()},
+        )
+        await pipeline.executor.run_io(pipeline.scheduler.complete, post_id, "cancelado")
+        pipeline.end_trace(
+            approval_data["original_metadata"].get("trace"),
+            "cancelado",
+            {"execution_id": execution_id, "post_id": post_id},
+        )
+
+        # Log do cancelamento
         pipeline.pipeline_logger.info(
             f"🚫 Conteúdo cancelado pelo usuário: {execution_id}"
         )
@@ -880,11 +1811,9 @@ async def cancel_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             f"""
 🚫 **Conteúdo cancelado**
 
-🆔 **ID:** `{execution_id}`
+🆔 **ID:** `{execution_id}` (`#{post_id}`)
 📁 **Status:** Cancelado (mantido em pendentes)
 📝 **Log:** `{datetime.now().strftime('%Y-%m-%d.log')}`
-
-Você pode enviar um novo arquivo quando desejar.
 """,
             parse_mode="Markdown",
         )
@@ -894,70 +1823,323 @@ Você pode enviar um novo arquivo quando desejar.
 
 
 async def pending_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Comando /pending - Ver conteúdo aguardando aprovação"""
+    """Comando /pending [id] - Ver conteúdo aguardando aprovação"""
     user_id = update.effective_user.id
 
     if not pipeline.is_authorized(user_id):
         await update.message.reply_text("❌ Usuário não autorizado")
         return
 
-    if user_id not in pipeline.pending_approvals:
-        await update.message.reply_text("✅ Nenhum conteúdo aguardando aprovação")
-        return
+    approval_id = command_approval_id(context)
+    if approval_id is None:
+        approvals = await pipeline.executor.run_io(pipeline.list_approvals, user_id)
+        if not approvals:
+            await update.message.reply_text("✅ Nenhum conteúdo aguardando aprovação")
+            return
+        if len(approvals) > 1:
+            await update.message.reply_text(
+                format_approval_list(approvals, "pending"), parse_mode="Markdown"
+            )
+            return
+        approval_data = approvals[0]
+    else:
+        approval_data = await resolve_approval(update, user_id, approval_id, "pending")
+        if not approval_data:
+            return
 
     # Mostrar conteúdo pendente
-    approval_data = pipeline.pending_approvals[user_id]
     review = approval_data["review"]
     content = approval_data["processed_content"]
 
     # Formatar para Telegram
     review_message = pipeline.reviewer.format_review_for_telegram(review, content)
 
-    await update.message.reply_text(review_message, parse_mode="Markdown")
+    await update.message.reply_text(
+        f"🆔 **Aprovação:** `#{approval_data['id']}`\n{review_message}",
+        parse_mode="Markdown",
+    )
+
+
+async def place_approval(
+    update: Update, context: ContextTypes.DEFAULT_TYPE, approval: Dict, user_id: int
+) -> bool:
+    """
+    Passar a publicação pelo agendador: fora do horário ou com o limite diário
+    atingido vai para o próximo slot (True); False = publicar agora
+    """
+    title = approval["original_metadata"].get("title", "")
+    target = await pipeline.executor.run_io(
+        pipeline.scheduler.place, approval["id"], user_id, title
+    )
+    if not target:
+        return False
+    await schedule_approval(update, context, approval, target)
+    return True
+
+
+async def schedule_approval(
+    update: Update, context: ContextTypes.DEFAULT_TYPE, approval: Dict, target: datetime
+) -> None:
+    """Marcar item como agendado, rearmar o despertador e avisar o usuário"""
+    await pipeline.executor.run_io(
+        pipeline.update_metadata,
+        approval["id"],
+        {"status": "agendado", "scheduled_for": target.isoformat()},
+    )
+    arm_scheduler(context.application)
+
+    pipeline.pipeline_logger.info(
+        f"📅 {approval['execution_id']} agendado para {target.isoformat()}"
+    )
+    await update.message.reply_text(
+        f"""
+📅 **Agendado!**
+
+🆔 **Aprovação:** `#{approval['id']}`
+⏰ **Publicação:** {target.strftime('%d/%m %H:%M (%A)')}
+📊 **Limite diário:** {pipeline.scheduler.daily_cap} posts por conta
+
+Use /agenda para ver a fila ou `/cancel {approval['id']}` para cancelar.
+""",
+        parse_mode="Markdown",
+    )
+
+
+async def schedule_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Comando /schedule [id] - Agendar no próximo horário livre"""
+    user_id = update.effective_user.id
+
+    if not pipeline.is_authorized(user_id):
+        await update.message.reply_text("❌ Usuário não autorizado")
+        return
+
+    approval = await resolve_approval(
+        update, user_id, command_approval_id(context), "schedule"
+    )
+    if not approval:
+        return
+
+    if approval["publishing"]:
+        await update.message.reply_text("⏳ Publicação já em andamento")
+        return
+
+    try:
+        title = approval["original_metadata"].get("title", "")
+        target = await pipeline.executor.run_io(
+            pipeline.scheduler.schedule, approval["id"], user_id, title
+        )
+        await schedule_approval(update, context, approval, target)
+
+    except Exception as e:
+        await update.message.reply_text(f"❌ Erro ao agendar: {e}")
+
+
+async def agenda_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Comando /agenda - Publicações agendadas (índice em memória)"""
+    user_id = update.effective_user.id
+
+    if not pipeline.is_authorized(user_id):
+        await update.message.reply_text("❌ Usuário não autorizado")
+        return
+
+    entries = pipeline.scheduler.agenda(user_id)
+    if not entries:
+        await update.message.reply_text("📅 Nenhuma publicação agendada")
+        return
+
+    lines = [f"📅 **Agenda de publicações ({pipeline.scheduler.count()}):**", ""]
+    for entry in entries:
+        lines.append(
+            f"• {entry['target_at'].strftime('%d/%m %H:%M')} — "
+            f"`#{entry['post_id']}` {entry['title'] or 'N/A'}"
+        )
+    lines.append("")
+    lines.append(
+        f"⏰ Slots: {', '.join(slot.strftime('%H:%M') for slot in pipeline.scheduler.slots)}"
+        f" | Limite: {pipeline.scheduler.daily_cap}/dia"
+    )
+
+    await update.message.reply_text("\n".join(lines), parse_mode="Markdown")
+
+
+async def run_due_publications(application: Application) -> None:
+    """Publicar itens agendados vencidos e rearmar para o próximo"""
+    due = await pipeline.executor.run_io(pipeline.scheduler.pop_due)
+
+    for entry in due:
+        post_id, user_id = entry["post_id"], entry["user_id"]
+        approval = await pipeline.executor.run_io(
+            pipeline.get_approval, user_id, post_id
+        )
+
+        # Editado/cancelado depois de agendado: não publicar
+        if not approval or approval["status"] != "agendado" or approval["publishing"]:
+            await pipeline.executor.run_io(
+                pipeline.scheduler.complete, post_id, "cancelado"
+            )
+            continue
+
+        pipeline.publishing.add(post_id)
+        processing_msg = await application.bot.send_message(
+            user_id,
+            f"⏰ Publicando `#{post_id}` agendado no LinkedIn...",
+            parse_mode="Markdown",
+        )
+        application.create_task(
+            publish_and_report(processing_msg, user_id, post_id, retry=False)
+        )
+
+    arm_scheduler(application)
+
+
+async def scheduled_publish_job(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Callback do JobQueue"""
+    await run_due_publications(context.application)
+
+
+def arm_scheduler(application: Application) -> None:
+    """Rearmar um único despertar para o próximo horário do heap"""
+    next_at = pipeline.scheduler.next_wakeup()
+    # Atraso em segundos: datetime sem fuso seria lido como UTC pelo JobQueue
+    delay = max(0.0, (next_at - datetime.now()).total_seconds()) if next_at else None
+    job_queue = application.job_queue
+
+    if job_queue is not None:
+        for job in job_queue.get_jobs_by_name("publish_scheduler"):
+            job.schedule_removal()
+        if next_at:
+            job_queue.run_once(scheduled_publish_job, when=delay, name="publish_scheduler")
+        return
+
+    # Sem python-telegram-bot[job-queue]: timer do próprio event loop
+    if pipeline._wakeup_handle:
+        pipeline._wakeup_handle.cancel()
+        pipeline._wakeup_handle = None
+    if next_at:
+        pipeline._wakeup_handle = asyncio.get_running_loop().call_later(
+            delay, lambda: application.create_task(run_due_publications(application))
+        )
 
 
 async def retry_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Comando /retry - Tentar publicar novamente"""
+    """Comando /retry [id] - Tentar publicar novamente"""
     user_id = update.effective_user.id
 
     if not pipeline.is_authorized(user_id):
         await update.message.reply_text("❌ Usuário não autorizado")
         return
 
-    if user_id not in pipeline.pending_approvals:
-        await update.message.reply_text("❌ Nenhum conteúdo aguardando aprovação")
+    approval = await resolve_approval(
+        update, user_id, command_approval_id(context), "retry"
+    )
+    if not approval:
         return
 
+    if approval["publishing"]:
+        await update.message.reply_text("⏳ Publicação já em andamento")
+        return
+
+    if approval["status"] == "agendado":
+        await update.message.reply_text(
+            f"📅 `#{approval['id']}` já está agendado para {approval['scheduled_for']}\n"
+            f"Use `/cancel {approval['id']}` para cancelar.",
+            parse_mode="Markdown",
+        )
+        return
+
+    # Nova tentativa também respeita horário e limite diário
+    if await place_approval(update, context, approval, user_id):
+        return
+
+    pipeline.publishing.add(approval["id"])
     processing_msg = await update.message.reply_text(
         "🔄 Tentando publicar novamente..."
     )
 
-    try:
-        result = await pipeline.publish_approved_content(user_id)
+    context.application.create_task(
+        publish_and_report(processing_msg, user_id, approval["id"], retry=True)
+    )
 
-        if result["status"] == "published":
-            success_msg = f"""
-✅ **PUBLICADO COM SUCESSO!** (retry)
 
-🆔 **ID:** `{result["execution_id"]}`
-⏱️ **Tempo:** {result["duration_ms"]}ms
-📤 **Status:** Movido para enviados
-🔗 **LinkedIn:** Post publicado!
-"""
-            await processing_msg.edit_text(success_msg, parse_mode="Markdown")
-        else:
-            error_msg = f"""
-❌ **Retry falhou**
+async def edit_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Comando /edit [id] - Substituir conteúdo pendente por texto revisado"""
+    user_id = update.effective_user.id
 
-🚨 **Erro:** {result["error"]}
+    if not pipeline.is_authorized(user_id):
+        await update.message.reply_text("❌ Usuário não autorizado")
+        return
+
+    # Preservar quebras de linha: usar o texto bruto após o comando
+    parts = update.message.text.split(maxsplit=1)
+    revised_content = parts[1].strip() if len(parts) > 1 else ""
+
+    # ID opcional como primeiro token ("/edit #12 texto"); número sem "#" só
+    # conta como ID se for uma aprovação do usuário (o texto pode começar com número)
+    approval_id = None
+    match = re.match(r"(#?)(\d+)(?:\s+|$)", revised_content)
+    if match:
+        candidate = int(match.group(2))
+        if match.group(1) or await pipeline.executor.run_io(
+            pipeline.get_approval, user_id, candidate
+        ):
+            approval_id = candidate
+            revised_content = revised_content[match.end() :].strip()
+
+    approval = await resolve_approval(update, user_id, approval_id, "edit")
+    if not approval:
+        return
+
+    if approval["publishing"]:
+        await update.message.reply_text("⏳ Publicação em andamento - aguarde o resultado")
+        return
+
+    if not revised_content:
+        pipeline.awaiting_edits[user_id] = approval["id"]
+        await update.message.reply_text(
+            f"📝 Envie o texto revisado para `#{approval['id']}` na próxima mensagem.\n"
+            "Apenas as sentenças alteradas serão revisadas novamente.",
+            parse_mode="Markdown",
+        )
+        return
+
+    await apply_edit(update, user_id, approval["id"], revised_content)
+
+
+async def apply_edit(
+    update: Update, user_id: int, approval_id: int, revised_content: str
+) -> None:
+    """Executar revisão incremental e mostrar o resultado"""
+    pipeline.awaiting_edits.pop(user_id, None)
+
+    processing_msg = await update.message.reply_text(
+        "🔁 Revisando apenas as sentenças alteradas..."
+    )
+
+    try:
+        result = await pipeline.revise_pending_content(
+            user_id, approval_id, revised_content
+        )
+
+        if result["status"] == "awaiting_approval":
+            review_message = pipeline.reviewer.format_review_for_telegram(
+                result["review"], result["processed_content"]
+            )
+            await processing_msg.edit_text(
+                f"""
+✏️ **Edição aplicada - AGUARDANDO APROVAÇÃO**
+
+🆔 **ID:** `{result["execution_id"]}` (`#{approval_id}`)
 ⏱️ **Tempo:** {result["duration_ms"]}ms
 
-Use /cancel para desistir ou /retry para tentar novamente.
-"""
-            await processing_msg.edit_text(error_msg, parse_mode="Markdown")
+{review_message}
+""",
+                parse_mode="Markdown",
+            )
+        else:
+            await processing_msg.edit_text(f"❌ Erro na edição: {result['error']}")
 
     except Exception as e:
-        await processing_msg.edit_text(f"❌ Erro no retry: {e}")
+        await processing_msg.edit_text(f"❌ Erro inesperado na edição: {e}")
 
 
 async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -968,29 +2150,31 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         await update.message.reply_text("❌ Usuário não autorizado")
         return
 
-    # Verificar se já tem conteúdo aguardando aprovação
-    if user_id in pipeline.pending_approvals:
-        await update.message.reply_text(
-            """
-⚠️ **Você tem conteúdo aguardando aprovação**
+    document = update.message.document
+    file_name = (document.file_name or "").lower()
 
-Use um destes comandos primeiro:
-• /pending - Ver conteúdo aguardando
-• /approve - Aprovar e publicar
-• /cancel - Cancelar conteúdo atual
+    # Lotes: .zip ou álbum de arquivos
+    if file_name.endswith(".zip"):
+        await handle_archive(update, document, user_id)
+        return
 
-Depois envie o novo arquivo.
-""",
-            parse_mode="Markdown",
+    if update.message.media_group_id:
+        first = pipeline.media_groups.add(
+            user_id,
+            update.message.media_group_id,
+            (update.message, document),
+            process_media_group,
         )
+        if first:
+            pipeline.pipeline_logger.info(
+                f"📦 Recebendo álbum {update.message.media_group_id} de {user_id}"
+            )
         return
 
-    document = update.message.document
-
     # Verificar se é arquivo HTML
-    if not document.file_name or not document.file_name.lower().endswith(".html"):
+    if not file_name.endswith(".html"):
         await update.message.reply_text(
-            "❌ Por favor, envie apenas arquivos HTML (.html)"
+            "❌ Por favor, envie arquivos HTML (.html) ou um .zip com eles"
         )
         return
 
@@ -1057,7 +2241,7 @@ Por favor, envie um arquivo HTML válido.
 
         # 3. Executar pipeline com revisão
         pipeline_result = await pipeline.process_pipeline_with_review(
-            result["file_path"], user_id, metadata
+            result["file_path"], user_id, metadata, result["post_id"]
         )
 
         if pipeline_result["status"] == "awaiting_approval":
@@ -1072,6 +2256,7 @@ Por favor, envie um arquivo HTML válido.
 ✅ **Processamento completo - AGUARDANDO APROVAÇÃO**
 
 🆔 **ID:** `{pipeline_result["execution_id"]}`
+✅ **Aprovação:** `#{pipeline_result["approval_id"]}`
 ⏱️ **Tempo:** {pipeline_result["duration_ms"]}ms
 📁 **Status:** pendentes → aguardando aprovação
 
@@ -1096,6 +2281,166 @@ Por favor, envie um arquivo HTML válido.
         await processing_msg.edit_text(f"❌ Erro inesperado: {e}")
 
 
+def format_batch_summary(
+    source: str, accepted: List[Dict], outcomes: List, rejected: List[Dict]
+) -> str:
+    """Resumo único de um lote: aguardando aprovação, falhas e rejeitados"""
+    ready, failed = [], []
+    for item, outcome in zip(accepted, outcomes):
+        title = item["metadata"].get("title") or item["name"]
+        if isinstance(outcome, Exception):
+            failed.append(f"• `#{item['post_id']}` {title}: {outcome}")
+        elif outcome["status"] != "awaiting_approval":
+            failed.append(f"• `#{item['post_id']}` {title}: {outcome['error']}")
+        else:
+            recommendation = outcome["review"].get("final_recommendation", "")
+            mark = "✅" if recommendation == "APPROVE" else "⚠️"
+            ready.append(f"• `#{outcome['approval_id']}` {title} {mark}")
+
+    def section(header: str, lines: List[str]) -> List[str]:
+        if not lines:
+            return []
+        shown = lines[:BATCH_SUMMARY_LINES]
+        if len(lines) > len(shown):
+            shown.append(f"… e mais {len(lines) - len(shown)}")
+        return ["", header, *shown]
+
+    parts = [
+        f"📦 **Lote processado** ({source})",
+        "",
+        f"✅ Aguardando aprovação: {len(ready)}",
+        f"❌ Falharam no processamento: {len(failed)}",
+        f"🚫 Rejeitados: {len(rejected)}",
+    ]
+    parts += section("**Aguardando aprovação:**", ready)
+    parts += section("**Falhas (mantidos em pendentes):**", failed)
+    parts += section(
+        "**Rejeitados:**",
+        [f"• `{item['name']}`: {'; '.join(item['issues'])}" for item in rejected],
+    )
+    if ready:
+        parts += ["", "Use `/pending <id>` para revisar e `/approve <id>` para publicar."]
+    return "\n".join(parts)
+
+
+async def process_batch(
+    processing_msg, user_id: int, files: List[Tuple[str, bytes]], skipped: List[Dict], source: str
+) -> None:
+    """Colocar um lote na fila, processar com revisão e responder com um resumo"""
+    if not files:
+        reasons = "\n".join(
+            f"• `{item['name']}`: {'; '.join(item['issues'])}" for item in skipped
+        )
+        await processing_msg.edit_text(
+            f"❌ Nenhum arquivo HTML válido no lote ({source})\n{reasons}",
+            parse_mode="Markdown",
+        )
+        return
+
+    result = await pipeline.ingest_batch(files, user_id, source)
+    accepted = result["accepted"]
+    rejected = skipped + result["rejected"]
+
+    await processing_msg.edit_text(
+        f"📦 Lote ({source}): {len(accepted)} na fila de pendentes, "
+        f"{len(rejected)} rejeitados\n🤖 Processando com revisão..."
+    )
+
+    # Rascunhos do lote revisados juntos (review_many), pelo pool de threads
+    # e sob o limite de GPT
+    review_batch = ReviewBatch(
+        pipeline.reviewer,
+        [str(item["post_id"]) for item in accepted],
+        run_io=pipeline.executor.run_io,
+        limit=pipeline.stage_limits.gpt,
+    )
+    outcomes = await asyncio.gather(
+        *(
+            pipeline.process_pipeline_with_review(
+                item["file_path"],
+                user_id,
+                item["metadata"],
+                item["post_id"],
+                review_batch=review_batch,
+            )
+            for item in accepted
+        ),
+        return_exceptions=True,
+    )
+
+    summary = format_batch_summary(source, accepted, outcomes, rejected)
+    try:
+        await processing_msg.edit_text(summary, parse_mode="Markdown")
+    except BadRequest:
+        # Título ou erro com caracteres de Markdown: enviar sem formatação
+        await processing_msg.edit_text(summary)
+
+
+async def handle_archive(update: Update, document: Document, user_id: int) -> None:
+    """Receber um .zip com vários HTML"""
+    if document.file_size and document.file_size > TELEGRAM_DOWNLOAD_LIMIT:
+        await update.message.reply_text("❌ Arquivo .zip muito grande. Máximo: 20MB")
+        return
+
+    processing_msg = await update.message.reply_text(
+        f"📦 Recebido: `{document.file_name}`\n🔄 Extraindo e validando o lote...",
+        parse_mode="Markdown",
+    )
+
+    try:
+        buffer = io.BytesIO()
+        file = await document.get_file()
+        await file.download_to_memory(buffer)
+
+        try:
+            files, skipped = await pipeline.executor.run_cpu(
+                extract_html_from_zip, buffer.getvalue()
+            )
+        except ValueError as e:
+            await processing_msg.edit_text(f"❌ {e}")
+            return
+
+        await process_batch(
+            processing_msg, user_id, files, skipped, f"zip {document.file_name}"
+        )
+
+    except Exception as e:
+        pipeline.pipeline_logger.error(f"❌ Erro no lote {document.file_name}: {e}")
+        await processing_msg.edit_text(f"❌ Erro inesperado no lote: {e}")
+
+
+async def process_media_group(user_id: int, items: List[Tuple]) -> None:
+    """Álbum completo: baixar os HTML em paralelo e processar como um lote"""
+    first_message = items[0][0]
+    processing_msg = await first_message.reply_text(
+        f"📦 Álbum com {len(items)} arquivos recebido\n🔄 Baixando e validando..."
+    )
+
+    try:
+        skipped, documents = [], []
+        for _, document in items:
+            name = document.file_name or "sem_nome"
+            if not name.lower().endswith(".html"):
+                skipped.append({"name": name, "issues": ["Não é um arquivo .html"]})
+            elif document.file_size and document.file_size > 10 * 1024 * 1024:
+                skipped.append({"name": name, "issues": ["Arquivo muito grande (máx. 10MB)"]})
+            else:
+                documents.append(document)
+
+        async def download(document: Document) -> Tuple[str, bytes]:
+            buffer = io.BytesIO()
+            file = await document.get_file()
+            await file.download_to_memory(buffer)
+            return document.file_name, buffer.getvalue()
+
+        files = await asyncio.gather(*(download(document) for document in documents))
+        await process_batch(processing_msg, user_id, list(files), skipped, "álbum")
+
+    except Exception as e:
+        pipeline.pipeline_logger.error(f"❌ Erro no álbum: {e}")
+        await processing_msg.edit_text(f"❌ Erro inesperado no lote: {e}")
+
+
 async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Processar mensagem de texto"""
     user_id = update.effective_user.id
@@ -1103,12 +2448,59 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
     if not pipeline.is_authorized(user_id):
         return
 
+    # Texto revisado após /edit sem argumentos
+    if user_id in pipeline.awaiting_edits:
+        approval_id = pipeline.awaiting_edits[user_id]
+        await apply_edit(update, user_id, approval_id, update.message.text.strip())
+        return
+
     await update.message.reply_text(
         "📄 Por favor, envie um arquivo HTML para adicionar à fila.\n"
         "Use /queue para ver o status da fila ou /start para instruções."
     )
 
 
+async def post_init(application: Application) -> None:
+    """Inicialização dentro do event loop"""
+    pipeline.lag_monitor.start()
+    pipeline.memory.start()
+
+    # Retomar itens interrompidos (processando/publicando) sem atrasar o polling
+    async def notify(user_id: int, text: str) -> None:
+        await application.bot.send_message(user_id, text, parse_mode="Markdown")
+
+    async def recover() -> None:
+        summary = await PipelineRecovery(pipeline).run(notify)
+        # Republicações que caíram fora do horário/limite entraram na agenda
+        if summary["scheduled"]:
+            arm_scheduler(application)
+
+    application.create_task(recover())
+
+    # Despertar do publicador para o próximo agendamento (vencidos saem na hora)
+    arm_scheduler(application)
+
+    if METRICS_ENABLED:
+        try:
+            pipeline.metrics_server = MetricsServer()
+            pipeline.metrics_server.start()
+        except OSError as e:
+            pipeline.metrics_server = None
+            logger.warning(f"⚠️ Servidor de métricas não iniciado: {e}")
+
+
+async def post_shutdown(application: Application) -> None:
+    """Encerramento: parar monitor, worker de publicação e pools"""
+    await pipeline.lag_monitor.stop()
+    pipeline.memory.stop()
+    if pipeline.metrics_server:
+        pipeline.metrics_server.stop()
+    pipeline.index.stop()
+    pipeline.publisher.stop()
+    pipeline.executor.shutdown()
+    get_tracer_provider().shutdown()
+
+
 def main():
     """Função principal do bot"""
     if not TELEGRAM_BOT_TOKEN:
@@ -1117,18 +2509,42 @@ def main():
 
     logger.info("🚀 Iniciando Telegram Bot v2.6.1 com Revisão de Conteúdo...")
 
+    global pipeline
+    pipeline = TelegramPipeline()
+
     # Criar aplicação
-    application = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
+    # Updates em paralelo entre usuários, em ordem para cada usuário
+    builder = (
+        Application.builder()
+        .token(TELEGRAM_BOT_TOKEN)
+        .concurrent_updates(PerUserUpdateProcessor(locks=pipeline.user_locks))
+        .rate_limiter(pipeline.outbound)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+    )
+    if TELEGRAM_API_BASE_URL:
+        base_url = TELEGRAM_API_BASE_URL.rstrip("/")
+        builder = builder.base_url(f"{base_url}/bot").base_file_url(
+            f"{base_url}/file/bot"
+        )
+    application = builder.build()
 
     # Registrar handlers
     application.add_handler(CommandHandler("start", start_command))
     application.add_handler(CommandHandler("status", status_command))
     application.add_handler(CommandHandler("stats", stats_command))
+    application.add_handler(CommandHandler("stats_rebuild", stats_rebuild_command))
     application.add_handler(CommandHandler("queue", queue_command))
     application.add_handler(CommandHandler("approve", approve_command))
     application.add_handler(CommandHandler("cancel", cancel_command))
     application.add_handler(CommandHandler("pending", pending_command))
     application.add_handler(CommandHandler("retry", retry_command))
+    application.add_handler(CommandHandler("edit", edit_command))
+    application.add_handler(CommandHandler("schedule", schedule_command))
+    application.add_handler(CommandHandler("agenda", agenda_command))
+    application.add_handler(CommandHandler("verify", verify_command))
+    application.add_handler(CommandHandler("profile", profile_command))
+    application.add_handler(CommandHandler("memory", memory_command))
     application.add_handler(MessageHandler(filters.Document.ALL, handle_document))
     application.add_handler(
         MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text)
@@ -1136,11 +2552,44 @@ def main():
 
     logger.info("✅ Telegram Bot v2.6.1 iniciado com Sistema de Revisão")
     logger.info(
-        "📋 Comandos de aprovação disponíveis: /approve, /cancel, /pending, /retry"
+        "📋 Comandos de aprovação disponíveis: /approve, /cancel, /pending, /retry, /edit, /schedule, /agenda"
     )
 
     # Executar bot
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    if TELEGRAM_MODE == "webhook":
+        run_webhook(application)
+    else:
+        application.run_polling(allowed_updates=Update.ALL_TYPES)
+
+
+def run_webhook(application: Application) -> None:
+    """Receber updates por webhook (push) em vez de long-polling"""
+    if not TELEGRAM_WEBHOOK_URL:
+        logger.error("❌ TELEGRAM_WEBHOOK_URL não configurado para o modo webhook")
+        return
+
+    # Telegram envia o segredo no header X-Telegram-Bot-Api-Secret-Token
+    secret_token = TELEGRAM_WEBHOOK_SECRET
+    if not secret_token:
+        secret_token = secrets.token_urlsafe(32)
+        logger.warning(
+            "⚠️ TELEGRAM_WEBHOOK_SECRET não configurado - usando segredo aleatório"
+        )
+
+    webhook_url = f"{TELEGRAM_WEBHOOK_URL.rstrip('/')}/{TELEGRAM_WEBHOOK_PATH}"
+    logger.info(
+        f"🌐 Webhook em {TELEGRAM_WEBHOOK_LISTEN}:{TELEGRAM_WEBHOOK_PORT}"
+        f"/{TELEGRAM_WEBHOOK_PATH} → {webhook_url}"
+    )
+
+    application.run_webhook(
+        listen=TELEGRAM_WEBHOOK_LISTEN,
+        port=TELEGRAM_WEBHOOK_PORT,
+        url_path=TELEGRAM_WEBHOOK_PATH,
+        webhook_url=webhook_url,
+        secret_token=secret_token,
+        allowed_updates=Update.ALL_TYPES,
+    )
 
 
 if __name__ == "__main__":
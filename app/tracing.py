@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+"""
+Tracing - Rastreamento ponta a ponta de cada post
+API no formato do OpenTelemetry (get_tracer, start_as_current_span,
+set_attribute, record_exception, traceparent W3C) com exportador local em
+JSONL. Um trace cobre download → parse → GPT → revisão → espera de
+aprovação → navegador → login → publicação; o contexto fica salvo no
+metadata do item e vai junto no job do worker de publicação
+
+Consulta: python -m app.tracing show <execution_id|trace_id|#post_id>
+          python -m app.tracing list [n]
+          python -m app.tracing stats
+"""
+import os
+import json
+import time
+import queue
+import secrets
+import threading
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, NamedTuple, Optional, Union
+
+# Mesmo diretório dos logs do linkedin_poster
+LOG_DIR = "/logs" if os.path.exists("/.dockerenv") else "logs"
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+TRACE_FILE = os.getenv("TRACE_FILE", os.path.join(LOG_DIR, "traces.jsonl"))
+SERVICE_NAME = "publicador-linkedin"
+
+
+class StatusCode:
+    UNSET = "UNSET"
+    OK = "OK"
+    ERROR = "ERROR"
+
+
+class SpanContext(NamedTuple):
+    trace_id: str  # 32 hex
+    span_id: str  # 16 hex
+
+
+class Span:
+    """Span em andamento; exportado uma vez ao chamar end()"""
+
+    def __init__(
+        self,
+        name: str,
+        context: SpanContext,
+        parent_id: Optional[str],
+        attributes: Optional[Dict] = None,
+        start_time: Optional[int] = None,
+        processor=None,
+    ):
+        self.name = name
+        self.context = context
+        self.parent_id = parent_id
+        self.attributes: Dict = dict(attributes or {})
+        self.events: List[Dict] = []
+        self.status = {"code": StatusCode.UNSET}
+        self.start_time = start_time or time.time_ns()
+        self.end_time: Optional[int] = None
+        self._processor = processor
+
+    def get_span_context(self) -> SpanContext:
+        return self.context
+
+    def is_recording(self) -> bool:
+        return self.end_time is None
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict) -> None:
+        self.attributes.update(attributes)
+
+    def add_event(self, name: str, attributes: Optional[Dict] = None) -> None:
+        self.events.append(
+            {"name": name, "time_unix_nano": time.time_ns(), "attributes": attributes or {}}
+        )
+
+    def set_status(self, code: str, description: Optional[str] = None) -> None:
+        self.status = {"code": code}
+        if description:
+            self.status["description"] = description
+
+    def record_exception(self, exception: BaseException) -> None:
+        self.add_event(
+            "exception",
+            {"exception.type": type(exception).__name__, "exception.message": str(exception)},
+        )
+
+    def end(self, end_time: Optional[int] = None) -> None:
+        if self.end_time is not None:
+            return
+        self.end_time = end_time or time.time_ns()
+        if self._processor:
+            self._processor.on_end(self.to_dict())
+
+    def to_dict(self) -> Dict:
+        end_time = self.end_time or time.time_ns()
+        return {
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "start_time_unix_nano": self.start_time,
+            "end_time_unix_nano": end_time,
+            "duration_ms": round((end_time - self.start_time) / 1e6, 3),
+            "attributes": self.attributes,
+            "events": self.events,
+            "status": self.status,
+            "resource": {"service.name": SERVICE_NAME, "process.pid": os.getpid()},
+        }
+
+
+# Span atual (contextvars: acompanha tasks asyncio)
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+ParentType = Union[Span, SpanContext, None]
+
+
+def get_current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def _parent_context(parent: ParentType) -> Optional[SpanContext]:
+    if isinstance(parent, Span):
+        return parent.get_span_context()
+    return parent
+
+
+class JsonlSpanExporter:
+    """Uma linha JSON por span finalizado"""
+
+    def __init__(self, path: str = TRACE_FILE):
+        self.path = path
+
+    def export(self, spans: List[Dict]) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span, ensure_ascii=False, default=str) + "\n")
+
+
+class InMemorySpanExporter:
+    """Guarda spans em memória (worker de publicação devolve ao bot)"""
+
+    def __init__(self):
+        self.spans: List[Dict] = []
+
+    def export(self, spans: List[Dict]) -> None:
+        self.spans.extend(spans)
+
+    def drain(self) -> List[Dict]:
+        spans, self.spans = self.spans, []
+        return spans
+
+
+class SimpleSpanProcessor:
+    """Exporta cada span na hora, na thread que o finalizou"""
+
+    def __init__(self, exporter):
+        self.exporter = exporter
+
+    def on_end(self, span: Dict) -> None:
+        self.exporter.export([span])
+
+    def shutdown(self) -> None:
+        pass
+
+
+class BatchSpanProcessor:
+    """Fila + thread de escrita: end() não faz I/O no event loop"""
+
+    def __init__(self, exporter, flush_interval: float = 1.0):
+        self.exporter = exporter
+        self.flush_interval = flush_interval
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="trace-export", daemon=True)
+        self._thread.start()
+
+    def on_end(self, span: Dict) -> None:
+        self._queue.put(span)
+
+    def _run(self) -> None:
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            if first is None:
+                return
+            batch = [first]
+            stop = False
+            while True:
+                try:
+                    span = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if span is None:
+                    stop = True
+                    break
+                batch.append(span)
+            try:
+                self.exporter.export(batch)
+            except Exception as e:
+                print(f"⚠️ Falha ao exportar spans: {e}")
+            if stop:
+                return
+
+    def shutdown(self) -> None:
+        """Gravar o que falta e parar a thread"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(5)
+
+
+class _NoopProcessor:
+    def on_end(self, span: Dict) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+
+class Tracer:
+    def __init__(self, name: str, provider: "TracerProvider"):
+        self.name = name
+        self.provider = provider
+
+    def start_span(
+        self,
+        name: str,
+        context: ParentType = None,
+        attributes: Optional[Dict] = None,
+        start_time: Optional[int] = None,
+    ) -> Span:
+        """Novo span filho de `context` (ou do span atual); sem pai, inicia um trace"""
+        parent = _parent_context(context) if context is not None else None
+        if parent is None and context is None:
+            current = get_current_span()
+            parent = current.get_span_context() if current else None
+
+        trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        span_context = SpanContext(trace_id, secrets.token_hex(8))
+        return Span(
+            name,
+            span_context,
+            parent.span_id if parent else None,
+            attributes,
+            start_time,
+            self.provider.processor,
+        )
+
+    @contextmanager
+    def start_as_current_span(
+        self,
+        name: str,
+        context: ParentType = None,
+        attributes: Optional[Dict] = None,
+        start_time: Optional[int] = None,
+        end_on_exit: bool = True,
+    ) -> Iterator[Span]:
+        """Span como atual dentro do bloco; exceções viram status ERROR"""
+        span = self.start_span(name, context, attributes, start_time)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            span.set_status(StatusCode.ERROR, str(e))
+            raise
+        finally:
+            _current_span.reset(token)
+            if end_on_exit:
+                span.end()
+
+    def resume_span(self, name: str, carrier: Optional[Dict], attributes: Optional[Dict] = None) -> Optional[Span]:
+        """
+        Recriar um span iniciado antes (ex: raiz do post, aberta no upload e
+        finalizada na publicação) a partir do contexto salvo por inject()
+        """
+        context = extract(carrier)
+        if context is None:
+            return None
+        return Span(
+            name,
+            context,
+            carrier.get("parent_span_id"),
+            attributes,
+            carrier.get("start_time_unix_nano"),
+            self.provider.processor,
+        )
+
+
+class TracerProvider:
+    def __init__(self, processor=None):
+        self.processor = processor or _NoopProcessor()
+
+    def get_tracer(self, name: str) -> Tracer:
+        return Tracer(name, self)
+
+    def set_processor(self, processor) -> None:
+        old, self.processor = self.processor, processor
+        old.shutdown()
+
+    def shutdown(self) -> None:
+        self.processor.shutdown()
+
+
+_provider = TracerProvider(
+    BatchSpanProcessor(JsonlSpanExporter()) if TRACING_ENABLED else None
+)
+
+
+def get_tracer(name: str) -> Tracer:
+    return Tracer(name, _provider)
+
+
+def get_tracer_provider() -> TracerProvider:
+    return _provider
+
+
+def inject(span: Optional[Span] = None) -> Dict:
+    """Contexto W3C (traceparent) do span, para metadata e jobs do worker"""
+    span = span or get_current_span()
+    if span is None:
+        return {}
+    context = span.get_span_context()
+    return {
+        "traceparent": f"00-{context.trace_id}-{context.span_id}-01",
+        "start_time_unix_nano": span.start_time,
+        "parent_span_id": span.parent_id,
+    }
+
+
+def extract(carrier: Optional[Dict]) -> Optional[SpanContext]:
+    """SpanContext a partir do traceparent salvo"""
+    if not carrier or not carrier.get("traceparent"):
+        return None
+    try:
+        _, trace_id, span_id, _ = carrier["traceparent"].split("-")
+    except ValueError:
+        return None
+    return SpanContext(trace_id, span_id)
+
+
+def export_spans(spans: List[Dict]) -> None:
+    """Exportar spans finalizados em outro processo (worker de publicação)"""
+    for span in spans:
+        _provider.processor.on_end(span)
+
+
+def collect_local_spans() -> InMemorySpanExporter:
+    """
+    No processo filho: spans passam a ficar em memória para serem devolvidos
+    ao bot junto com o resultado do job
+    """
+    exporter = InMemorySpanExporter()
+    if TRACING_ENABLED:
+        # A thread de exportação do pai não existe no filho: não chamar shutdown
+        _provider.processor = SimpleSpanProcessor(exporter)
+    return exporter
+
+
+def shutdown() -> None:
+    """Gravar spans pendentes (encerramento do bot)"""
+    _provider.shutdown()
+
+
+# === Consulta (CLI) ===
+def load_spans(path: str = TRACE_FILE) -> List[Dict]:
+    spans = []
+    if not os.path.exists(path):
+        return spans
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                spans.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # linha parcial (escrita em andamento)
+    return spans
+
+
+def find_trace_id(spans: List[Dict], key: str) -> Optional[str]:
+    """trace_id a partir de trace_id, execution_id ou #post_id"""
+    key = key.strip()
+    post_id = key.lstrip("#") if key.lstrip("#").isdigit() else None
+    for span in reversed(spans):
+        attributes = span.get("attributes", {})
+        if span["trace_id"] == key or attributes.get("execution_id") == key:
+            return span["trace_id"]
+        if post_id is not None and str(attributes.get("post_id")) == post_id:
+            return span["trace_id"]
+    return None
+
+
+def format_trace(spans: List[Dict], trace_id: str) -> str:
+    """Cascata de um trace: início relativo, duração e hierarquia"""
+    trace = [span for span in spans if span["trace_id"] == trace_id]
+    if not trace:
+        return f"Trace {trace_id} não encontrado"
+
+    # Spans regravados (raiz finalizada mais de uma vez): fica o mais recente
+    by_id = {span["span_id"]: span for span in trace}
+    children: Dict[Optional[str], List[Dict]] = {}
+    for span in by_id.values():
+        parent = span["parent_span_id"] if span["parent_span_id"] in by_id else None
+        children.setdefault(parent, []).append(span)
+
+    start = min(span["start_time_unix_nano"] for span in by_id.values())
+    end = max(span["end_time_unix_nano"] for span in by_id.values())
+    lines = [
+        f"🧵 Trace {trace_id} ({len(by_id)} spans, {(end - start) / 1e6:.0f}ms)",
+        f"{'início':>10} {'duração':>10}  etapa",
+    ]
+
+    def walk(parent: Optional[str], depth: int) -> None:
+        for span in sorted(children.get(parent, []), key=lambda s: s["start_time_unix_nano"]):
+            offset = (span["start_time_unix_nano"] - start) / 1e6
+            mark = " ❌" if span["status"]["code"] == StatusCode.ERROR else ""
+            lines.append(
+                f"{offset:>8.0f}ms {span['duration_ms']:>8.0f}ms  {'  ' * depth}{span['name']}{mark}"
+            )
+            walk(span["span_id"], depth + 1)
+
+    walk(None, 0)
+    return "\n".join(lines)
+
+
+def list_traces(spans: List[Dict], limit: int = 20) -> List[Dict]:
+    """Traces mais recentes com post, execução e duração total"""
+    traces: Dict[str, Dict] = {}
+    for span in spans:
+        entry = traces.setdefault(
+            span["trace_id"],
+            {"trace_id": span["trace_id"], "start": span["start_time_unix_nano"], "end": 0,
+             "post_id": None, "execution_id": None, "spans": 0, "errors": 0},
+        )
+        entry["start"] = min(entry["start"], span["start_time_unix_nano"])
+        entry["end"] = max(entry["end"], span["end_time_unix_nano"])
+        entry["spans"] += 1
+        entry["errors"] += span["status"]["code"] == StatusCode.ERROR
+        attributes = span.get("attributes", {})
+        entry["post_id"] = entry["post_id"] or attributes.get("post_id")
+        entry["execution_id"] = entry["execution_id"] or attributes.get("execution_id")
+    ordered = sorted(traces.values(), key=lambda entry: entry["start"], reverse=True)
+    return ordered[:limit]
+
+
+def stage_stats(spans: List[Dict]) -> Dict[str, Dict]:
+    """p50/p95/máx por nome de span"""
+    durations: Dict[str, List[float]] = {}
+    for span in spans:
+        durations.setdefault(span["name"], []).append(span["duration_ms"])
+    stats = {}
+    for name, values in durations.items():
+        values.sort()
+        stats[name] = {
+            "count": len(values),
+            "p50_ms": values[len(values) // 2],
+            "p95_ms": values[min(len(values) - 1, int(len(values) * 0.95))],
+            "max_ms": values[-1],
+        }
+    return stats
+
+
+if __name__ == "__main__":
+    import sys
+
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    spans = load_spans()
+
+    if command == "show" and len(sys.argv) > 2:
+        trace_id = find_trace_id(spans, sys.argv[2])
+        print(format_trace(spans, trace_id) if trace_id else f"❌ Nada encontrado para {sys.argv[2]}")
+    elif command == "list":
+        limit = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+        for entry in list_traces(spans, limit):
+            started = datetime.fromtimestamp(entry["start"] / 1e9).strftime("%Y-%m-%d %H:%M:%S")
+            errors = f" ❌{entry['errors']}" if entry["errors"] else ""
+            print(
+                f"{started}  #{entry['post_id'] or '-':<5} {entry['trace_id']}  "
+                f"{(entry['end'] - entry['start']) / 1e6:>9.0f}ms  "
+                f"{entry['spans']} spans{errors}  {entry['execution_id'] or ''}"
+            )
+    elif command == "stats":
+        print(f"{'etapa':<16} {'n':>5} {'p50':>10} {'p95':>10} {'máx':>10}")
+        for name, stats in sorted(stage_stats(spans).items()):
+            print(
+                f"{name:<16} {stats['count']:>5} {stats['p50_ms']:>8.0f}ms "
+                f"{stats['p95_ms']:>8.0f}ms {stats['max_ms']:>8.0f}ms"
+            )
+    else:
+        print("Uso: python -m app.tracing show <execution_id|trace_id|#post_id>")
+        print("     python -m app.tracing list [n]")
+        print("     python -m app.tracing stats")
+        print(f"📄 Arquivo: {TRACE_FILE}")
+        sys.exit(1)
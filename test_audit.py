@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Teste da escrita de auditoria em lote (AuditWriter)
+Verifica escrita concorrente de vários processos com rotação por tamanho e
+mede o custo por evento: CSV aberto a cada evento (antigo) vs. buffer com
+thread de gravação em cada política de fsync
+"""
+import os
+import sys
+import csv
+import time
+import shutil
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.audit_log import AuditLog  # noqa: E402
+from app.audit_writer import AuditWriter, rotated_paths  # noqa: E402
+
+HEADER = [
+    "timestamp",
+    "execution_id",
+    "action",
+    "success",
+    "post_text",
+    "current_url",
+    "error_type",
+    "error_msg",
+    "screenshot_path",
+    "duration_ms",
+]
+EVENTS = 2000
+PROCESSES = 4
+EVENTS_PER_PROCESS = 500
+
+
+def make_row(i: int, prefix: str = "e") -> list:
+    return [
+        f"2026-01-01T00:00:{i % 60:02d}",
+        f"{prefix}{i}",
+        "publish_post",
+        i % 7 != 0,
+        "Texto do post com, vírgula e \"aspas\"\nem duas linhas",
+        "https://www.linkedin.com/feed/",
+        "" if i % 7 else "TimeoutException",
+        "" if i % 7 else "Botão Publicar não encontrado",
+        "",
+        1234,
+    ]
+
+
+def legacy_append(path: str, row: list) -> None:
+    """Escrita antiga: abre o CSV e cria um csv.writer a cada evento"""
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerow(row)
+
+
+def concurrent_writer(path: str, index: int) -> None:
+    writer = AuditWriter(path, HEADER, flush_interval=0.01, max_bytes=64 * 1024, backup_count=50)
+    for i in range(EVENTS_PER_PROCESS):
+        writer.append(make_row(i, prefix=f"p{index}_"))
+    writer.close()
+
+
+def test_concurrent_rotation(tmp: str) -> bool:
+    print(f"🔄 Testando {PROCESSES} processos escrevendo com rotação...")
+    path = os.path.join(tmp, "linkedin_audit.csv")
+    ctx = multiprocessing.get_context("fork")
+    processes = [
+        ctx.Process(target=concurrent_writer, args=(path, i)) for i in range(PROCESSES)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    files = rotated_paths(path, 50) + [path]
+    ids = []
+    ok = True
+    for name in files:
+        with open(name, newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        ok = ok and rows[0] == HEADER and all(len(row) == len(HEADER) for row in rows)
+        ids.extend(row[1] for row in rows[1:])
+
+    expected = PROCESSES * EVENTS_PER_PROCESS
+    ok = ok and len(ids) == expected and len(set(ids)) == expected
+    print(f"{'✅' if ok else '❌'} {len(ids)}/{expected} eventos em {len(files)} arquivos")
+    return ok
+
+
+def test_audit_db(tmp: str) -> bool:
+    print("🗄️ Testando lote no audit.db...")
+    audit = AuditLog(os.path.join(tmp, "audit.db"))
+    writer = AuditWriter(os.path.join(tmp, "db.csv"), HEADER, audit, flush_interval=0.05)
+    for i in range(100):
+        row = make_row(i)
+        writer.append(row, dict(zip(HEADER, row)))
+    writer.close()
+    stats = audit.duration_stats(days=36500)
+    ok = stats.get("publish_post", {}).get("count") == 100
+    print(f"{'✅' if ok else '❌'} {stats}")
+    return ok
+
+
+def test_import_csv(tmp: str) -> bool:
+    print("📥 Testando import-csv num audit.db já em uso...")
+    path = os.path.join(tmp, "import", "linkedin_audit.csv")
+    os.makedirs(os.path.dirname(path))
+    # Histórico anterior ao audit.db (só CSV, com rotação)
+    writer = AuditWriter(path, HEADER, flush_interval=0.01, max_bytes=4 * 1024)
+    for i in range(50):
+        writer.append(make_row(i, prefix="old_"))
+    writer.close()
+    # Bot já gravando nos dois
+    audit = AuditLog(os.path.join(tmp, "import", "audit.db"))
+    writer = AuditWriter(path, HEADER, audit, flush_interval=0.01, max_bytes=4 * 1024)
+    for i in range(20):
+        row = make_row(i, prefix="new_")
+        writer.append(row, dict(zip(HEADER, row)))
+    writer.close()
+
+    imported = audit.import_csv(path)
+    again = audit.import_csv(path)
+    total = audit.connection.execute("SELECT COUNT(*) FROM audit_events").fetchone()[0]
+    ok = len(rotated_paths(path)) > 0 and imported == 50 and again == 0 and total == 70
+    print(
+        f"{'✅' if ok else '❌'} {imported} importados de {len(rotated_paths(path)) + 1} "
+        f"arquivos, reimportação: {again}, total: {total}"
+    )
+    return ok
+
+
+def measure(append) -> dict:
+    samples = []
+    for i in range(EVENTS):
+        row = make_row(i)
+        start = time.perf_counter()
+        append(row)
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    samples.sort()
+    return {
+        "p50_us": samples[len(samples) // 2],
+        "p99_us": samples[int(len(samples) * 0.99)],
+        "max_us": samples[-1],
+    }
+
+
+def benchmark(tmp: str) -> dict:
+    results = {}
+    path = os.path.join(tmp, "legacy.csv")
+    results["abre a cada evento"] = measure(lambda row: legacy_append(path, row))
+
+    for fsync in ("never", "batch", "always"):
+        writer = AuditWriter(os.path.join(tmp, f"buffer_{fsync}.csv"), HEADER, fsync=fsync)
+        results[f"buffer fsync={fsync}"] = measure(writer.append)
+        writer.close()
+    return results
+
+
+def main():
+    print("🧾 Teste da auditoria em lote")
+    print("=" * 50)
+
+    tmp = tempfile.mkdtemp(prefix="audit_test_")
+    try:
+        results = {
+            "rotacao_concorrente": test_concurrent_rotation(os.path.join(tmp, "concurrent")),
+            "audit_db": test_audit_db(tmp),
+            "import_csv": test_import_csv(tmp),
+        }
+
+        print(f"\n⏱️ Custo por evento ({EVENTS} eventos):")
+        for label, stats in benchmark(tmp).items():
+            print(
+                f"  {label:<20} p50={stats['p50_us']:8.1f}µs "
+                f"p99={stats['p99_us']:9.1f}µs max={stats['max_us']:9.1f}µs"
+            )
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print("\n📊 Resultados dos testes:")
+    print("=" * 50)
+    for name, success in results.items():
+        status = "✅ OK" if success else "❌ FALHOU"
+        print(f"{name:<20}: {status}")
+
+    return all(results.values())
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
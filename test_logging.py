@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Teste do logging assíncrono (QueueHandler/QueueListener)
+Verifica a troca de arquivo à meia-noite e mede o custo de uma chamada de
+log com escrita direta vs. fila, com disco normal e com disco lento
+"""
+import os
+import sys
+import time
+import shutil
+import logging
+import tempfile
+import threading
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.linkedin_poster import (  # noqa: E402
+    DailyFileHandler,
+    MidnightRotatingFileHandler,
+    start_queue_logging,
+    stop_queue_logging,
+)
+
+CALLS = 5000
+BACKGROUND_THREADS = 4
+BACKGROUND_INTERVAL_S = 0.002
+SLOW_WRITE_MS = 1.0
+
+
+class SlowDailyFileHandler(DailyFileHandler):
+    """Simula disco lento (flush com latência fixa)"""
+
+    def flush(self):
+        time.sleep(SLOW_WRITE_MS / 1000)
+        super().flush()
+
+
+def test_daily_rollover(tmp: str) -> bool:
+    print("🔄 Testando troca de arquivo à meia-noite...")
+    handler = DailyFileHandler(tmp)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+
+    def record(message: str, created: float) -> logging.LogRecord:
+        entry = logging.LogRecord("x", logging.INFO, __file__, 0, message, None, None)
+        entry.created = created
+        return entry
+
+    handler.handle(record("dia 1", time.time()))
+    # Registro depois da meia-noite: handler passa para o arquivo do novo dia
+    handler._today = lambda: "2099-01-01"
+    handler.handle(record("dia 2", handler.rollover_at + 1))
+    handler.close()
+
+    today = datetime.now().strftime("%Y-%m-%d")
+    files = sorted(os.listdir(tmp))
+    ok = files == sorted([f"{today}.log", "2099-01-01.log"])
+    with open(os.path.join(tmp, "2099-01-01.log"), encoding="utf-8") as f:
+        ok = ok and f.read().strip() == "dia 2"
+    print(f"{'✅' if ok else '❌'} Arquivos: {files}")
+    return ok
+
+
+def test_rotation_by_other_process(tmp: str) -> bool:
+    print("🔄 Testando rotação já feita por outro processo...")
+    os.makedirs(tmp, exist_ok=True)
+    path = os.path.join(tmp, "poster.log")
+    first = MidnightRotatingFileHandler(path)
+    second = MidnightRotatingFileHandler(path)
+    record = logging.LogRecord("x", logging.INFO, __file__, 0, "antes", None, None)
+    first.emit(record)
+    second.emit(record)
+
+    first.doRollover()  # "bot" rotaciona
+    second.doRollover()  # "worker" percebe e só reabre
+    record.msg = "depois"
+    second.emit(record)
+    first.close()
+    second.close()
+
+    files = sorted(os.listdir(tmp))
+    with open(path, encoding="utf-8") as f:
+        current = f.read()
+    ok = len(files) == 2 and current.strip() == "depois"
+    print(f"{'✅' if ok else '❌'} Arquivos: {files}")
+    return ok
+
+
+def measure(logger: logging.Logger) -> dict:
+    """Latência das chamadas de log com threads de carga logando junto"""
+    stop = threading.Event()
+
+    def background():
+        while not stop.is_set():
+            logger.info("carga de fundo %s", threading.get_ident())
+            time.sleep(BACKGROUND_INTERVAL_S)
+
+    threads = [threading.Thread(target=background) for _ in range(BACKGROUND_THREADS)]
+    for thread in threads:
+        thread.start()
+
+    samples = []
+    for i in range(CALLS):
+        start = time.perf_counter()
+        logger.info("📥 Arquivo recebido %d", i)
+        samples.append((time.perf_counter() - start) * 1_000_000)
+
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    samples.sort()
+    return {
+        "p50_us": samples[len(samples) // 2],
+        "p99_us": samples[int(len(samples) * 0.99)],
+        "max_us": samples[-1],
+    }
+
+
+def benchmark(tmp: str) -> dict:
+    results = {}
+    for label, handler_class in (
+        ("disco normal", DailyFileHandler),
+        ("disco lento", SlowDailyFileHandler),
+    ):
+        for mode in ("direto", "fila"):
+            directory = os.path.join(tmp, f"{label}_{mode}".replace(" ", "_"))
+            logger = logging.getLogger(f"bench_{label}_{mode}")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            handler = handler_class(directory)
+            handler.setFormatter(logging.Formatter("%(asctime)s - %(message)s"))
+            if mode == "fila":
+                start_queue_logging(logger, handler)
+            else:
+                logger.addHandler(handler)
+
+            results[(label, mode)] = measure(logger)
+            stop_queue_logging(logger)
+            logger.removeHandler(handler)
+            handler.close()
+    return results
+
+
+def main():
+    print("🪵 Teste do logging assíncrono")
+    print("=" * 50)
+
+    tmp = tempfile.mkdtemp(prefix="logging_test_")
+    try:
+        results = {
+            "rotacao_diaria": test_daily_rollover(os.path.join(tmp, "daily")),
+            "rotacao_concorrente": test_rotation_by_other_process(
+                os.path.join(tmp, "poster")
+            ),
+        }
+
+        print(f"\n⏱️ Custo por chamada ({CALLS} chamadas, {BACKGROUND_THREADS} threads de carga):")
+        for (label, mode), stats in benchmark(tmp).items():
+            print(
+                f"  {label:<13} {mode:<7} p50={stats['p50_us']:8.1f}µs "
+                f"p99={stats['p99_us']:9.1f}µs max={stats['max_us']:9.1f}µs"
+            )
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print("\n📊 Resultados dos testes:")
+    print("=" * 50)
+    for name, success in results.items():
+        status = "✅ OK" if success else "❌ FALHOU"
+        print(f"{name:<20}: {status}")
+
+    return all(results.values())
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
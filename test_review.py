@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Teste da revisão de conteúdo no pipeline do bot
+Um lote de uploads precisa ser revisado numa única requisição (review_many),
+pelo pool de threads do executor e sob o limite de GPT; no /edit só as
+sentenças alteradas voltam para o modelo
+"""
+import os
+import re
+import sys
+import json
+import shutil
+import asyncio
+import tempfile
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+
+USER_ID = 7
+
+ARTICLE = """<html><head><title>{title}</title></head><body>
+<h1>{title}</h1>
+<p>{body}</p>
+</body></html>"""
+
+
+class FakeMessage:
+    """Mensagem de progresso do lote (só guarda as edições)"""
+
+    def __init__(self):
+        self.edits = []
+
+    async def edit_text(self, text, **kwargs):
+        self.edits.append(text)
+
+
+class FakeCompletions:
+    """
+    OpenAI falsa: responde a revisão em lote com um item por ID do prompt e a
+    revisão por sentença (/edit) com um veredito por sentença numerada
+    """
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        self.calls = []
+        self.sentences = []
+
+    def create(self, **kwargs):
+        prompt = kwargs["messages"][-1]["content"]
+        if "SENTENÇAS:" in prompt:
+            numbered = prompt.split("SENTENÇAS:")[1].split("RESPONDER")[0]
+            sent = re.findall(r"^\d+\. (.+)$", numbered, re.MULTILINE)
+            self.sentences.append(sent)
+            verdicts = [{"index": i, "issues": []} for i in range(1, len(sent) + 1)]
+            message = SimpleNamespace(content=json.dumps({"sentences": verdicts}))
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+        ids = re.findall(r"### ID: (\S+)", prompt)
+        self.calls.append(
+            {"ids": ids, "gpt": self.pipeline.stage_limits.stats()["gpt"]}
+        )
+        reviews = [
+            {"id": draft_id, "approved": True, "final_recommendation": "APPROVE"}
+            for draft_id in ids
+        ]
+        message = SimpleNamespace(content=json.dumps({"reviews": reviews}))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+async def run_checks(tb) -> dict:
+    pipeline = tb.pipeline
+    completions = FakeCompletions(pipeline)
+    pipeline.reviewer.client = SimpleNamespace(
+        chat=SimpleNamespace(completions=completions)
+    )
+
+    single_reviews = []
+    review_content = pipeline.reviewer.review_content
+
+    def counted_review_content(*args, **kwargs):
+        single_reviews.append(args)
+        return review_content(*args, **kwargs)
+
+    pipeline.reviewer.review_content = counted_review_content
+
+    async def process_html_file(file_path):
+        # Um dos rascunhos falha no GPT e não pode segurar o lote
+        if "falha" in file_path:
+            return None
+        name = os.path.basename(file_path)
+        return f"Post gerado para {name}. Segunda frase do texto. Fechamento do post."
+
+    pipeline.processor.process_html_file = process_html_file
+
+    threaded = []
+    run_io = pipeline.executor.run_io
+
+    async def counted_run_io(func, *args, **kwargs):
+        threaded.append(getattr(func, "__name__", ""))
+        return await run_io(func, *args, **kwargs)
+
+    pipeline.executor.run_io = counted_run_io
+
+    body = "Texto do artigo com informação suficiente para a validação. " * 10
+    files = [
+        (f"{name}.html", ARTICLE.format(title=name, body=f"{name} {body}").encode())
+        for name in ("post_um", "post_dois", "post_tres", "post_falha")
+    ]
+
+    print("📦 Processando lote de 4 arquivos (1 falha no GPT)...")
+    message = FakeMessage()
+    await asyncio.wait_for(
+        tb.process_batch(message, USER_ID, files, [], "teste"), timeout=60
+    )
+    print(f"  requisições de revisão: {completions.calls}")
+
+    posts = pipeline.store.list_posts(None, USER_ID)
+    statuses = sorted(post["status"] for post in posts)
+    print(f"  estados: {statuses}")
+
+    print("📝 Testando /edit de uma sentença (revisão anterior local, após reinício)...")
+    post = next(post for post in posts if post["status"] == "aguardando_aprovacao")
+    content = post["metadata"]["approval"]["processed_content"]
+    # Revisão salva veio das regras locais (IA fora do ar) e o cache se perdeu
+    pipeline.update_metadata(
+        post["id"],
+        {"status": "aguardando_aprovacao"},
+        {"content_review": pipeline.reviewer._local_review(content)},
+    )
+    pipeline.reviewer.sentence_verdicts.clear()
+    revised = content.replace("Segunda frase do texto.", "Segunda frase reescrita.")
+    edit = await pipeline.revise_pending_content(USER_ID, post["id"], revised)
+    incremental = edit["review"]["incremental"]
+    print(f"  sentenças enviadas: {completions.sentences} | {incremental}")
+
+    return {
+        "uma_requisicao": len(completions.calls) == 1
+        and len(completions.calls[0]["ids"]) == 3,
+        "sem_revisao_individual": not single_reviews,
+        "pool_do_executor": "_review_batch" in threaded,
+        "limite_de_gpt": completions.calls
+        and completions.calls[0]["gpt"].startswith("1/"),
+        "falha_nao_trava": statuses
+        == ["aguardando_aprovacao"] * 3 + ["erro"],
+        "edit_so_alteradas": completions.sentences == [["Segunda frase reescrita."]]
+        and incremental["reused_sentences"] == 2,
+    }
+
+
+def main():
+    print("📋 Teste da revisão de conteúdo")
+    print("=" * 50)
+
+    tmp = tempfile.mkdtemp(prefix="review_test_")
+    cwd = os.getcwd()
+    os.chdir(tmp)  # posts/ e queue.db do bot dentro do diretório temporário
+    try:
+        import app.telegram_bot as tb
+
+        tb.pipeline = tb.TelegramPipeline()
+        try:
+            results = asyncio.run(run_checks(tb))
+        finally:
+            tb.pipeline.publisher.stop()
+            tb.pipeline.index.stop()
+            tb.pipeline.executor.shutdown()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print("\n📊 Resultados dos testes:")
+    print("=" * 50)
+    for name, success in results.items():
+        status = "✅ OK" if success else "❌ FALHOU"
+        print(f"{name:<24}: {status}")
+
+    return all(results.values())
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Teste do agendamento de novas tentativas
+Com o limite diário da conta atingido, /retry e a republicação da
+recuperação na inicialização precisam cair na agenda (próximo slot) em vez
+de publicar na hora
+"""
+import os
+import sys
+import shutil
+import asyncio
+import tempfile
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+
+USER_ID = 7
+
+
+class FakeMessage:
+    """Mensagem do Telegram que só guarda as respostas"""
+
+    def __init__(self, replies: list):
+        self.replies = replies
+
+    async def reply_text(self, text, **kwargs):
+        self.replies.append(text)
+        return self
+
+    async def edit_text(self, text, **kwargs):
+        self.replies.append(text)
+
+
+class FakeUpdate:
+    def __init__(self, replies: list):
+        self.effective_user = type("User", (), {"id": USER_ID})()
+        self.message = FakeMessage(replies)
+
+
+class FakeApplication:
+    job_queue = None  # despertador pelo event loop
+
+    def create_task(self, coroutine):
+        return asyncio.get_running_loop().create_task(coroutine)
+
+
+class FakeContext:
+    def __init__(self, args):
+        self.args = list(args)
+        self.application = FakeApplication()
+
+
+def add_approval(pipeline, status: str) -> int:
+    """Item com conteúdo aprovado no estado informado"""
+    path = os.path.join("posts", "pendentes", f"post_{datetime.now():%H%M%S%f}.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("<h1>Post</h1>")
+    post_id = pipeline.store.add_post(
+        path, {"title": f"Post {status}", "processing": {"status": "pendente"}}, USER_ID
+    )
+    pipeline.store.transition(
+        post_id,
+        {"status": status, "pipeline_id": f"tg_teste_{post_id}"},
+        {
+            "approval": {
+                "execution_id": f"tg_teste_{post_id}",
+                "processed_content": "Conteúdo aprovado",
+                "created_at": datetime.now().isoformat(),
+            }
+        },
+    )
+    return post_id
+
+
+async def run_checks(tb, recovery) -> dict:
+    pipeline = tb.pipeline
+    published = []
+
+    async def submit(execution_id, content, trace=None, profile=False):
+        published.append(execution_id)
+        return {"status": "published", "duration_ms": 0}
+
+    pipeline.publisher.submit = submit
+
+    # Horário comercial, mas o limite diário (1) já foi usado
+    pipeline.scheduler.is_good_time = lambda now: True
+    pipeline.scheduler.daily_cap = 1
+    done = add_approval(pipeline, "aguardando_aprovacao")
+    pipeline.scheduler.place(done, USER_ID, "Publicado hoje")
+    pipeline.scheduler.complete(done, "publicado")
+
+    print("🔄 Testando /retry com o limite diário atingido...")
+    retry_id = add_approval(pipeline, "aguardando_aprovacao")
+    replies = []
+    await tb.retry_command(FakeUpdate(replies), FakeContext([str(retry_id)]))
+    retry_status = pipeline.store.get_post(retry_id)["status"]
+    print(f"  estado: {retry_status} | resposta: {replies[-1].strip().splitlines()[0]}")
+
+    print("🔄 Testando republicação da recuperação com o limite atingido...")
+    recovery.RECOVERY_REPUBLISH = True
+    resumed_id = add_approval(pipeline, "publicando")
+    summary = await recovery.PipelineRecovery(pipeline).run()
+    resumed_status = pipeline.store.get_post(resumed_id)["status"]
+    print(f"  estado: {resumed_status} | resumo: {summary}")
+
+    agenda = [entry["post_id"] for entry in pipeline.scheduler.agenda(USER_ID)]
+    return {
+        "retry_agendado": retry_status == "agendado" and retry_id in agenda,
+        "recuperacao_agendada": resumed_status == "agendado"
+        and summary["scheduled"] == 1
+        and resumed_id in agenda,
+        "nada_publicado": not published,
+    }
+
+
+def main():
+    print("📅 Teste do agendamento de novas tentativas")
+    print("=" * 50)
+
+    tmp = tempfile.mkdtemp(prefix="scheduling_test_")
+    cwd = os.getcwd()
+    os.chdir(tmp)  # posts/ e queue.db do bot dentro do diretório temporário
+    try:
+        import app.telegram_bot as tb
+        import app.recovery as recovery
+
+        tb.pipeline = tb.TelegramPipeline()
+        try:
+            results = asyncio.run(run_checks(tb, recovery))
+        finally:
+            tb.pipeline.publisher.stop()
+            tb.pipeline.index.stop()
+            tb.pipeline.executor.shutdown()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print("\n📊 Resultados dos testes:")
+    print("=" * 50)
+    for name, success in results.items():
+        status = "✅ OK" if success else "❌ FALHOU"
+        print(f"{name:<20}: {status}")
+
+    return all(results.values())
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
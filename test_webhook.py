@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Teste do modo webhook com um Telegram falso local
+Sobe uma Bot API fake (getMe/setWebhook/sendMessage...), inicia o bot com
+TELEGRAM_MODE=webhook apontando para ela e envia updates assinados para o
+servidor HTTP embutido do bot
+"""
+import os
+import sys
+import json
+import time
+import socket
+import shutil
+import signal
+import tempfile
+import threading
+import subprocess
+import urllib.error
+import urllib.request
+from urllib.parse import parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+TOKEN = "123456:fake-token"
+SECRET = "segredo-de-teste"
+USER_ID = 42
+STARTUP_TIMEOUT = 90
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class FakeTelegramAPI(BaseHTTPRequestHandler):
+    """Bot API mínima: registra chamadas e devolve respostas válidas"""
+
+    calls = []
+    message_id = 0
+
+    def do_POST(self):
+        method = self.path.rsplit("/", 1)[-1]
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        params = self._parse(body)
+        FakeTelegramAPI.calls.append((method, params, time.time()))
+
+        result = True
+        if method == "getMe":
+            result = {
+                "id": 1,
+                "is_bot": True,
+                "first_name": "Fake",
+                "username": "fake_bot",
+            }
+        elif method in ("sendMessage", "editMessageText"):
+            FakeTelegramAPI.message_id += 1
+            result = {
+                "message_id": FakeTelegramAPI.message_id,
+                "date": int(time.time()),
+                "chat": {"id": int(params.get("chat_id", USER_ID)), "type": "private"},
+                "text": params.get("text", ""),
+            }
+
+        payload = json.dumps({"ok": True, "result": result}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _parse(self, body: bytes) -> dict:
+        content_type = self.headers.get("Content-Type", "")
+        if "json" in content_type:
+            return json.loads(body or b"{}")
+        return {key: values[0] for key, values in parse_qs(body.decode()).items()}
+
+    def log_message(self, format, *args):
+        pass
+
+
+def wait_for_port(port: int, timeout: float) -> bool:
+    """Aguardar o servidor do webhook aceitar conexões"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.05)
+    return False
+
+
+def wait_for_call(method: str, since: float, timeout: float, chat_id: int = None):
+    """Aguardar chamada à Bot API fake feita depois de `since`"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        for name, params, at in list(FakeTelegramAPI.calls):
+            if name != method or at < since:
+                continue
+            if chat_id is None or str(params.get("chat_id")) == str(chat_id):
+                return params, at
+        time.sleep(0.05)
+    return None, None
+
+
+def send_update(webhook_url: str, text: str, user_id: int, secret: str) -> int:
+    """Enviar update de mensagem ao webhook do bot; retorna o status HTTP"""
+    send_update.update_id += 1
+    update = {
+        "update_id": send_update.update_id,
+        "message": {
+            "message_id": send_update.update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "Teste"},
+            "text": text,
+            "entities": [
+                {"type": "bot_command", "offset": 0, "length": len(text.split()[0])}
+            ]
+            if text.startswith("/")
+            else [],
+        },
+    }
+    request = urllib.request.Request(
+        webhook_url,
+        data=json.dumps(update).encode(),
+        headers={
+            "Content-Type": "application/json",
+            "X-Telegram-Bot-Api-Secret-Token": secret,
+        },
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+send_update.update_id = 0
+
+
+def test_secret_rejected(webhook_url: str) -> bool:
+    print("🔄 Testando rejeição de segredo inválido...")
+    status = send_update(webhook_url, "/start", USER_ID, "segredo-errado")
+    print(f"{'✅' if status == 403 else '❌'} Segredo inválido → HTTP {status}")
+    return status == 403
+
+
+def test_start_command(webhook_url: str) -> bool:
+    print("🔄 Testando /start via webhook...")
+    sent_at = time.time()
+    status = send_update(webhook_url, "/start", USER_ID, SECRET)
+    params, answered_at = wait_for_call("sendMessage", sent_at, 15, USER_ID)
+    if status != 200 or not params:
+        print(f"❌ Sem resposta ao /start (HTTP {status})")
+        return False
+    print(f"✅ Resposta em {(answered_at - sent_at) * 1000:.0f}ms")
+    return "LinkedIn Content Pipeline" in params.get("text", "")
+
+
+def test_unauthorized_user(webhook_url: str) -> bool:
+    print("🔄 Testando usuário não autorizado...")
+    sent_at = time.time()
+    send_update(webhook_url, "/status", 7, SECRET)
+    params, _ = wait_for_call("sendMessage", sent_at, 15, 7)
+    ok = bool(params) and "não autorizado" in params.get("text", "")
+    print(f"{'✅' if ok else '❌'} Usuário não autorizado bloqueado")
+    return ok
+
+
+def main():
+    print("🌐 Teste do modo webhook (Telegram fake local)")
+    print("=" * 50)
+
+    api = ThreadingHTTPServer(("127.0.0.1", free_port()), FakeTelegramAPI)
+    threading.Thread(target=api.serve_forever, daemon=True).start()
+    api_url = f"http://127.0.0.1:{api.server_address[1]}"
+
+    webhook_port = free_port()
+    webhook_url = f"http://127.0.0.1:{webhook_port}/telegram"
+
+    workdir = tempfile.mkdtemp(prefix="webhook_test_")
+    env = {
+        **os.environ,
+        "PYTHONPATH": REPO_DIR,
+        "TELEGRAM_BOT_TOKEN": TOKEN,
+        "TELEGRAM_AUTHORIZED_USERS": str(USER_ID),
+        "TELEGRAM_MODE": "webhook",
+        "TELEGRAM_WEBHOOK_URL": f"http://127.0.0.1:{webhook_port}",
+        "TELEGRAM_WEBHOOK_LISTEN": "127.0.0.1",
+        "TELEGRAM_WEBHOOK_PORT": str(webhook_port),
+        "TELEGRAM_WEBHOOK_PATH": "telegram",
+        "TELEGRAM_WEBHOOK_SECRET": SECRET,
+        "TELEGRAM_API_BASE_URL": api_url,
+        "QUEUE_DB_PATH": os.path.join(workdir, "queue.db"),
+    }
+
+    bot = subprocess.Popen(
+        [sys.executable, "-m", "app.telegram_bot"],
+        cwd=workdir,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    results = {}
+    try:
+        params, _ = wait_for_call("setWebhook", 0, STARTUP_TIMEOUT)
+        if not params:
+            print("💥 Bot não registrou o webhook")
+            return False
+        print(f"✅ setWebhook: {params.get('url')}")
+        results["webhook_registrado"] = params.get(
+            "secret_token"
+        ) == SECRET and wait_for_port(webhook_port, 10)
+
+        results["segredo_invalido"] = test_secret_rejected(webhook_url)
+        results["start"] = test_start_command(webhook_url)
+        results["nao_autorizado"] = test_unauthorized_user(webhook_url)
+
+    finally:
+        bot.send_signal(signal.SIGINT)
+        try:
+            bot.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            bot.kill()
+        api.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print("\n📊 Resultados dos testes:")
+    print("=" * 50)
+    for name, success in results.items():
+        status = "✅ OK" if success else "❌ FALHOU"
+        print(f"{name:<20}: {status}")
+
+    return all(results.values())
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)